@@ -16,7 +16,21 @@ class NautobotSparePartsConfig(NautobotAppConfig):
     required_settings = []
     min_version = "2.0.0"
     max_version = "3.9999"
-    default_settings = {}
+    default_settings = {
+        "low_stock_summary_cache_timeout": 60,
+        "transaction_retention_days": None,
+        "low_stock_alert_window": 30,
+        "low_stock_alert_backends": [
+            {"backend": "nautobot_spare_parts.alerts.LogBackend"},
+        ],
+        "forecast_history_days": 182,
+        "forecast_period_days": 7,
+        "forecast_lead_time_days": 14,
+        "forecast_cover_days": 30,
+        "forecast_service_factor": 1.65,
+        "forecast_workers": 1,
+        "reservation_default_days": 7,
+    }
 
     def ready(self):
         """Register signals when Django app is ready."""
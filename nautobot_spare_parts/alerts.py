@@ -0,0 +1,287 @@
+"""Low stock alerts for Spare Parts Inventory plugin.
+
+Inventory saves and stock movements hand low stock *transitions* (healthy to low, and low back to recovered) to
+the module-level ``dispatcher``. Queuing an alert is a dictionary update; delivery happens later, from a timer
+thread, once the alert window has passed. Alerts for the same inventory record inside one window are coalesced
+into the latest state, and a record that goes low and recovers again within the window produces no alert at all.
+The batch is then handed to every configured backend.
+
+Backends are configured with the ``low_stock_alert_backends`` plugin setting, a list of dictionaries naming a
+backend class by dotted path plus its keyword arguments::
+
+    "low_stock_alert_backends": [
+        {"backend": "nautobot_spare_parts.alerts.LogBackend"},
+        {"backend": "nautobot_spare_parts.alerts.WebhookBackend", "url": "https://alerts.example.com/hook"},
+    ]
+
+Each Nautobot worker process runs its own dispatcher, so alerts are batched per process.
+"""
+
+import atexit
+import logging
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.db import connection
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from nautobot.extras.models import Job, JobResult
+import requests
+
+from nautobot_spare_parts.utils import get_plugin_setting
+
+logger = logging.getLogger(__name__)
+
+LOW = "low"
+RECOVERED = "recovered"
+
+
+class LowStockAlert:
+    """A snapshot of one inventory record at the moment it crossed its minimum stock level."""
+
+    def __init__(self, inventory):
+        """Capture the state of ``inventory``."""
+        self.inventory_id = inventory.pk
+        self.spare_part_type = str(inventory.spare_part_type)
+        self.location = str(inventory.location)
+        self.state = LOW if inventory.is_low_stock else RECOVERED
+        self.quantity_available = inventory.quantity_available
+        self.minimum_quantity = inventory.minimum_quantity
+        self.reorder_quantity = inventory.reorder_quantity
+        self.needs_reorder = inventory.needs_reorder
+        self.timestamp = timezone.now()
+
+    def __str__(self):
+        """Return a one-line description of the alert."""
+        if self.state == LOW:
+            return (
+                f"Low stock alert: {self.spare_part_type} at {self.location} "
+                f"- Available: {self.quantity_available}, Minimum: {self.minimum_quantity}"
+            )
+        return (
+            f"Stock recovered: {self.spare_part_type} at {self.location} "
+            f"- Available: {self.quantity_available}, Minimum: {self.minimum_quantity}"
+        )
+
+    def as_dict(self):
+        """Return the alert as JSON-serializable data."""
+        return {
+            "inventory": str(self.inventory_id),
+            "spare_part_type": self.spare_part_type,
+            "location": self.location,
+            "state": self.state,
+            "quantity_available": self.quantity_available,
+            "minimum_quantity": self.minimum_quantity,
+            "reorder_quantity": self.reorder_quantity,
+            "needs_reorder": self.needs_reorder,
+            "timestamp": self.timestamp.isoformat(),
+        }
+
+
+def get_transition_alert(inventory):
+    """Return a LowStockAlert if ``inventory`` crossed its minimum stock level since it was last seen, else None.
+
+    The previous state is the ``is_low_stock`` value the record was loaded with (records that were never saved
+    count as healthy). It is moved forward on every call, so repeated saves of a record that stays low only alert
+    once.
+    """
+    previous = getattr(inventory, "_loaded_is_low_stock", False)
+    inventory._loaded_is_low_stock = inventory.is_low_stock
+    if previous == inventory.is_low_stock:
+        return None
+    return LowStockAlert(inventory)
+
+
+class AlertBackend:
+    """Base class for alert delivery backends."""
+
+    def send(self, alerts):
+        """Deliver a batch of LowStockAlerts."""
+        raise NotImplementedError
+
+
+class LogBackend(AlertBackend):
+    """Write alerts to the plugin's log."""
+
+    def send(self, alerts):
+        """Log each alert; low stock as a warning, recoveries as info."""
+        for alert in alerts:
+            logger.log(logging.WARNING if alert.state == LOW else logging.INFO, str(alert))
+
+
+class WebhookBackend(AlertBackend):
+    """POST each batch of alerts as JSON to a URL."""
+
+    def __init__(self, url, headers=None, timeout=10, verify_ssl=True):
+        """Store the webhook target."""
+        self.url = url
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.verify_ssl = verify_ssl
+
+    def send(self, alerts):
+        """Send ``{"alerts": [...]}`` to the webhook."""
+        response = requests.post(
+            self.url,
+            json={"alerts": [alert.as_dict() for alert in alerts]},
+            headers=self.headers,
+            timeout=self.timeout,
+            verify=self.verify_ssl,
+        )
+        response.raise_for_status()
+
+
+class EmailBackend(AlertBackend):
+    """Email each batch of alerts through Django's configured mail backend."""
+
+    def __init__(self, recipients, from_email=None, subject="Spare parts low stock alerts"):
+        """Store the recipients; ``from_email`` defaults to DEFAULT_FROM_EMAIL."""
+        self.recipients = recipients
+        self.from_email = from_email
+        self.subject = subject
+
+    def send(self, alerts):
+        """Send one email listing every alert in the batch."""
+        send_mail(
+            f"{self.subject} ({len(alerts)})",
+            "\n".join(str(alert) for alert in alerts),
+            self.from_email,
+            self.recipients,
+        )
+
+
+class JobBackend(AlertBackend):
+    """Run a Nautobot Job for each batch of alerts.
+
+    The job is enqueued as ``username`` and receives the alerts as an ``alerts`` keyword argument holding a list
+    of dictionaries, so it should declare ``alerts = JSONVar()``.
+    """
+
+    def __init__(self, job, username):
+        """Store the job class path and the user to run it as."""
+        self.job = job
+        self.username = username
+
+    def send(self, alerts):
+        """Enqueue the job."""
+        job_model = Job.objects.get_for_class_path(self.job)
+        user = get_user_model().objects.get(username=self.username)
+        JobResult.enqueue_job(job_model, user, alerts=[alert.as_dict() for alert in alerts])
+
+
+class MemoryBackend(AlertBackend):
+    """Keep delivered alerts in memory, for tests and local development."""
+
+    def __init__(self):
+        """Start with no delivered alerts."""
+        self.batches = []
+
+    @property
+    def alerts(self):
+        """Return every alert delivered so far, in order."""
+        return [alert for batch in self.batches for alert in batch]
+
+    def send(self, alerts):
+        """Record the batch."""
+        self.batches.append(list(alerts))
+
+    def clear(self):
+        """Forget delivered alerts."""
+        self.batches = []
+
+
+def load_backends(configs):
+    """Instantiate backends from a list of ``{"backend": "dotted.path", **kwargs}`` dictionaries."""
+    backends = []
+    for config in configs:
+        config = dict(config)
+        backend_class = import_string(config.pop("backend"))
+        backends.append(backend_class(**config))
+    return backends
+
+
+class AlertDispatcher:
+    """Coalesce low stock alerts per inventory record and deliver them in batches."""
+
+    def __init__(self, backends=None, window=None):
+        """Create a dispatcher; backends and window default to the plugin settings on first use."""
+        self._backends = backends
+        self._window = window
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @property
+    def backends(self):
+        """Return the delivery backends."""
+        if self._backends is None:
+            self._backends = load_backends(get_plugin_setting("low_stock_alert_backends"))
+        return self._backends
+
+    @property
+    def window(self):
+        """Return the number of seconds alerts are held before delivery."""
+        if self._window is None:
+            self._window = get_plugin_setting("low_stock_alert_window")
+        return self._window
+
+    def configure(self, backends=None, window=None):
+        """Replace the backends and/or window, dropping anything still pending."""
+        with self._lock:
+            self._cancel_timer()
+            self._pending = {}
+            self._backends = backends
+            self._window = window
+
+    def enqueue(self, alert):
+        """Queue an alert for delivery at the end of the current window."""
+        with self._lock:
+            pending = self._pending.get(alert.inventory_id)
+            if pending is not None and pending.state != alert.state:
+                # The record went back to the state it was in before the window opened, so nothing changed.
+                del self._pending[alert.inventory_id]
+            else:
+                self._pending[alert.inventory_id] = alert
+
+            if self.window <= 0:
+                flush_now = True
+            else:
+                flush_now = False
+                if self._pending and self._timer is None:
+                    self._timer = threading.Timer(self.window, self._flush_from_timer)
+                    self._timer.daemon = True
+                    self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def flush(self):
+        """Deliver every pending alert now, returning the batch that was sent."""
+        with self._lock:
+            self._cancel_timer()
+            alerts = sorted(self._pending.values(), key=lambda alert: alert.timestamp)
+            self._pending = {}
+        if alerts:
+            for backend in self.backends:
+                try:
+                    backend.send(alerts)
+                except Exception:
+                    logger.exception("Failed to deliver %d low stock alert(s) via %s", len(alerts), backend)
+        return alerts
+
+    def _flush_from_timer(self):
+        """Flush from the timer thread, closing the thread's database connection afterwards."""
+        try:
+            self.flush()
+        finally:
+            connection.close()
+
+    def _cancel_timer(self):
+        """Stop the pending timer; the caller holds the lock."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+
+dispatcher = AlertDispatcher()
+atexit.register(dispatcher.flush)
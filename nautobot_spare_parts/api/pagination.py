@@ -0,0 +1,110 @@
+"""Keyset (cursor) pagination for the Spare Parts API."""
+
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+KEYSET_PARAMS = ("cursor", "ascending")
+
+
+class KeysetPagination(BasePagination):
+    """Paginate by position in a unique ordering, e.g. ``(timestamp, id)``, instead of by offset.
+
+    Opted into with ``?cursor=`` (empty for the first page, newest first; add ``&ascending=true`` for oldest
+    first); each response's ``next`` link carries the cursor for the following page. A page is read with a range
+    condition on the ordering's index, so every page costs the same however deep it is, and rows added or removed
+    while paging don't cause duplicates or skips. Page size follows the usual ``?limit=``.
+    """
+
+    def __init__(self, ordering):
+        """Paginate on the model fields ``ordering``, the last of which must be unique."""
+        self.ordering = ordering
+        self.request = None
+        self.next_cursor = None
+
+    @staticmethod
+    def requested(request):
+        """Return whether ``request`` asks for keyset pagination."""
+        return request is not None and "cursor" in request.query_params
+
+    def get_limit(self, request):
+        """Return the page size, using the default pagination's ``limit`` handling."""
+        pagination_class = api_settings.DEFAULT_PAGINATION_CLASS or LimitOffsetPagination
+        return pagination_class().get_limit(request) or api_settings.PAGE_SIZE or 50
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return the page of ``queryset`` after the request's cursor."""
+        self.request = request
+        limit = self.get_limit(request)
+        cursor = request.query_params.get("cursor", "")
+        if cursor:
+            ascending, position = self.decode_cursor(queryset.model, cursor)
+        else:
+            ascending = request.query_params.get("ascending", "").lower() in ("true", "1")
+            position = None
+
+        queryset = queryset.order_by(*(field if ascending else f"-{field}" for field in self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self.after(position, ascending))
+        page = list(queryset[: limit + 1])
+        if len(page) > limit:
+            page = page[:limit]
+            self.next_cursor = self.encode_cursor(ascending, [getattr(page[-1], field) for field in self.ordering])
+        return page
+
+    def after(self, position, ascending):
+        """Return the condition selecting rows beyond ``position`` in the ordering."""
+        lookup = "gt" if ascending else "lt"
+        # The bound on the leading field alone lets the database use a plain index range scan.
+        condition = Q(**{f"{self.ordering[0]}__{lookup}e": position[0]})
+        beyond = Q()
+        for index, field in enumerate(self.ordering):
+            equal = dict(zip(self.ordering[:index], position[:index]))
+            beyond |= Q(**equal, **{f"{field}__{lookup}": position[index]})
+        return condition & beyond
+
+    def encode_cursor(self, ascending, position):
+        """Return the opaque cursor for ``position``."""
+        values = [value.isoformat() if hasattr(value, "isoformat") else str(value) for value in position]
+        return base64.urlsafe_b64encode(json.dumps([ascending, values]).encode()).decode()
+
+    def decode_cursor(self, model, cursor):
+        """Return ``(ascending, position)`` from a cursor, raising NotFound if it isn't valid."""
+        try:
+            ascending, values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [model._meta.get_field(field).to_python(value) for field, value in zip(self.ordering, values)]
+            if None in position:
+                raise ValueError
+        except (TypeError, ValueError, ValidationError) as err:
+            raise NotFound("Invalid cursor") from err
+        return bool(ascending), position
+
+    def get_next_link(self):
+        """Return the URL of the next page, or None on the last page."""
+        if self.next_cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), "ascending")
+        return replace_query_param(url, "cursor", self.next_cursor)
+
+    def get_paginated_response(self, data):
+        """Return the page with its ``next`` link (there's no ``count``, as counting would read every row)."""
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        """Describe the paginated response for the API schema."""
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
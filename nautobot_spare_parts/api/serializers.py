@@ -1,6 +1,7 @@
 """API serializers for Spare Parts Inventory plugin."""
 
 from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
 
 from nautobot.apps.api import NautobotModelSerializer
 from nautobot.dcim.api.serializers import (
@@ -11,15 +12,103 @@ from nautobot.dcim.api.serializers import (
 )
 from nautobot.users.api.serializers import UserSerializer
 
-from nautobot_spare_parts.models import SparePartInventory, SparePartTransaction, SparePartType
+from nautobot_spare_parts.compatibility import DEFAULT_ELSEWHERE_LIMIT, MAX_DEVICES
+from nautobot_spare_parts.geo import DEFAULT_NEAREST_COUNT, MAX_NEAREST_COUNT
+from nautobot_spare_parts.models import (
+    SparePartDailyUsage,
+    SparePartForecast,
+    SparePartInventory,
+    SparePartReservation,
+    SparePartTransaction,
+    SparePartTransactionArchive,
+    SparePartType,
+)
+
+FIELD_SELECTION_PARAMS = ("fields", "exclude", "flat")
+
+
+class FieldSelection:
+    """The response fields asked for with the ``?fields=``, ``?exclude=`` and ``?flat=`` query parameters.
+
+    ``fields`` and ``exclude`` are comma-separated top-level field names. ``flat`` asks for related objects as
+    their ID plus a ``<field>_display`` string instead of nested objects. Only read (GET/HEAD) requests are
+    affected, so writes always validate against the full serializer.
+    """
+
+    def __init__(self, request):
+        """Read the selection from ``request`` (which may be None)."""
+        params = request.query_params if request is not None and request.method in SAFE_METHODS else {}
+        self.fields = self._names(params.get("fields"))
+        self.exclude = self._names(params.get("exclude")) or set()
+        self.flat = params.get("flat", "").lower() in ("true", "1")
+
+    @staticmethod
+    def _names(value):
+        """Split a comma-separated list of field names; None when the parameter wasn't given."""
+        if value is None:
+            return None
+        return {name.strip() for name in value.split(",") if name.strip()}
+
+    def includes(self, name):
+        """Return whether the top-level field ``name`` is to be returned."""
+        return (self.fields is None or name in self.fields) and name not in self.exclude
+
+
+class FlatRelatedField(serializers.RelatedField):
+    """A related object as its primary key, or as its display string with ``display=True``."""
 
+    def __init__(self, display=False, **kwargs):
+        """Set up the field."""
+        self.display = display
+        super().__init__(**kwargs)
 
-class SparePartTypeSerializer(NautobotModelSerializer):
+    def to_representation(self, value):
+        """Return the primary key or display string of ``value``."""
+        return str(value) if self.display else value.pk
+
+
+class FieldSelectionSerializerMixin:
+    """Serializer mixin applying the request's FieldSelection to the top-level serializer of a response.
+
+    Nested serializers are returned whole, or replaced by FlatRelatedFields in flat mode.
+    """
+
+    def get_fields(self):
+        """Return the fields chosen by the request."""
+        fields = super().get_fields()
+        parent = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        if parent is not None:
+            return fields
+        selection = FieldSelection(self.context.get("request"))
+
+        selected = {}
+        for name, field in fields.items():
+            if not selection.includes(name):
+                continue
+            if selection.flat and isinstance(field, serializers.BaseSerializer):
+                many = isinstance(field, serializers.ListSerializer)
+                source = field.source or name
+                if source == name:
+                    selected[name] = FlatRelatedField(many=many, read_only=True)
+                else:
+                    selected[name] = FlatRelatedField(source=source, many=many, read_only=True)
+                selected[f"{name}_display"] = FlatRelatedField(display=True, source=source, many=many, read_only=True)
+            else:
+                selected[name] = field
+        return selected
+
+
+class SparePartTypeSerializer(FieldSelectionSerializerMixin, NautobotModelSerializer):
     """Serializer for SparePartType."""
 
     manufacturer = ManufacturerSerializer(read_only=True)
     compatible_device_types = DeviceTypeSerializer(many=True, read_only=True)
     total_quantity = serializers.IntegerField(read_only=True, source="get_total_quantity")
+    total_reserved = serializers.IntegerField(read_only=True, source="stock_totals.total_reserved")
+    total_available = serializers.IntegerField(read_only=True, source="stock_totals.total_available")
+    location_count = serializers.IntegerField(read_only=True, source="stock_totals.location_count")
+    low_stock_location_count = serializers.IntegerField(read_only=True, source="stock_totals.low_stock_location_count")
+    last_movement = serializers.DateTimeField(read_only=True, source="stock_totals.last_movement")
 
     class Meta:
         """Meta class for SparePartTypeSerializer."""
@@ -37,13 +126,18 @@ class SparePartTypeSerializer(NautobotModelSerializer):
             "unit_cost",
             "compatible_device_types",
             "total_quantity",
+            "total_reserved",
+            "total_available",
+            "location_count",
+            "low_stock_location_count",
+            "last_movement",
             "tags",
             "created",
             "last_updated",
         ]
 
 
-class SparePartInventorySerializer(NautobotModelSerializer):
+class SparePartInventorySerializer(FieldSelectionSerializerMixin, NautobotModelSerializer):
     """Serializer for SparePartInventory."""
 
     spare_part_type = SparePartTypeSerializer(read_only=True)
@@ -51,6 +145,7 @@ class SparePartInventorySerializer(NautobotModelSerializer):
     quantity_available = serializers.IntegerField(read_only=True)
     is_low_stock = serializers.BooleanField(read_only=True)
     needs_reorder = serializers.BooleanField(read_only=True)
+    version = serializers.IntegerField(read_only=True)
 
     class Meta:
         """Meta class for SparePartInventorySerializer."""
@@ -71,12 +166,13 @@ class SparePartInventorySerializer(NautobotModelSerializer):
             "storage_location_detail",
             "notes",
             "tags",
+            "version",
             "created",
             "last_updated",
         ]
 
 
-class SparePartTransactionSerializer(serializers.ModelSerializer):
+class SparePartTransactionSerializer(FieldSelectionSerializerMixin, serializers.ModelSerializer):
     """Serializer for SparePartTransaction."""
 
     spare_part_inventory = SparePartInventorySerializer(read_only=True)
@@ -100,6 +196,7 @@ class SparePartTransactionSerializer(serializers.ModelSerializer):
             "reason",
             "related_device",
             "notes",
+            "transfer_source",
         ]
         read_only_fields = [
             "id",
@@ -111,7 +208,122 @@ class SparePartTransactionSerializer(serializers.ModelSerializer):
             "quantity_after",
             "user",
             "timestamp",
+            "transfer_source",
+        ]
+
+
+class SparePartTransactionArchiveSerializer(FieldSelectionSerializerMixin, serializers.ModelSerializer):
+    """Serializer for SparePartTransactionArchive."""
+
+    url = serializers.HyperlinkedIdentityField(
+        view_name="plugins-api:nautobot_spare_parts-api:spareparttransactionarchive-detail"
+    )
+    spare_part_inventory = SparePartInventorySerializer(read_only=True)
+    user = UserSerializer(read_only=True)
+    related_device = DeviceSerializer(read_only=True)
+
+    class Meta:
+        """Meta class for SparePartTransactionArchiveSerializer."""
+
+        model = SparePartTransactionArchive
+        fields = [
+            "id",
+            "url",
+            "spare_part_inventory",
+            "transaction_type",
+            "quantity",
+            "quantity_before",
+            "quantity_after",
+            "user",
+            "timestamp",
+            "reason",
+            "related_device",
+            "notes",
+            "transfer_source",
+            "archived",
+        ]
+        read_only_fields = fields
+
+
+class SparePartDailyUsageSerializer(FieldSelectionSerializerMixin, serializers.ModelSerializer):
+    """Serializer for SparePartDailyUsage."""
+
+    url = serializers.HyperlinkedIdentityField(
+        view_name="plugins-api:nautobot_spare_parts-api:sparepartdailyusage-detail"
+    )
+    spare_part_inventory = SparePartInventorySerializer(read_only=True)
+
+    class Meta:
+        """Meta class for SparePartDailyUsageSerializer."""
+
+        model = SparePartDailyUsage
+        fields = [
+            "id",
+            "url",
+            "date",
+            "spare_part_inventory",
+            "transaction_type",
+            "transaction_count",
+            "units_in",
+            "units_out",
+        ]
+        read_only_fields = fields
+
+
+class SparePartForecastSerializer(FieldSelectionSerializerMixin, serializers.ModelSerializer):
+    """Serializer for SparePartForecast."""
+
+    url = serializers.HyperlinkedIdentityField(
+        view_name="plugins-api:nautobot_spare_parts-api:sparepartforecast-detail"
+    )
+    spare_part_inventory = SparePartInventorySerializer(read_only=True)
+
+    class Meta:
+        """Meta class for SparePartForecastSerializer."""
+
+        model = SparePartForecast
+        fields = [
+            "id",
+            "url",
+            "spare_part_inventory",
+            "computed",
+            "daily_usage",
+            "daily_usage_deviation",
+            "safety_stock",
+            "recommended_minimum_quantity",
+            "recommended_reorder_quantity",
+            "projected_stockout",
+        ]
+        read_only_fields = fields
+
+
+class SparePartReservationSerializer(FieldSelectionSerializerMixin, serializers.ModelSerializer):
+    """Serializer for SparePartReservation."""
+
+    url = serializers.HyperlinkedIdentityField(
+        view_name="plugins-api:nautobot_spare_parts-api:sparepartreservation-detail"
+    )
+    spare_part_inventory = SparePartInventorySerializer(read_only=True)
+    user = UserSerializer(read_only=True)
+
+    class Meta:
+        """Meta class for SparePartReservationSerializer."""
+
+        model = SparePartReservation
+        fields = [
+            "id",
+            "url",
+            "spare_part_inventory",
+            "quantity",
+            "holder",
+            "expires",
+            "status",
+            "user",
+            "created",
+            "closed",
+            "notes",
         ]
+        read_only_fields = fields
 
 
 class CheckInSerializer(serializers.Serializer):
@@ -141,3 +353,177 @@ class AdjustmentSerializer(serializers.Serializer):
     quantity = serializers.IntegerField(help_text="Adjustment amount (positive or negative)")
     reason = serializers.CharField(help_text="Reason for adjustment")
     notes = serializers.CharField(required=False, allow_blank=True, help_text="Additional notes")
+
+
+class StockMovementItemSerializer(serializers.Serializer):
+    """Serializer for a single item of a bulk stock movement request."""
+
+    inventory = serializers.UUIDField(help_text="ID of the inventory record to change")
+    transaction_type = serializers.ChoiceField(
+        choices=[("check_in", "Check In"), ("check_out", "Check Out"), ("adjustment", "Adjustment")],
+        help_text="Type of stock movement",
+    )
+    quantity = serializers.IntegerField(
+        help_text="Number of units to check in or out, or the adjustment amount (positive or negative)"
+    )
+    reason = serializers.CharField(help_text="Reason for the movement")
+    related_device = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text="ID of device this part is being used for",
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, help_text="Additional notes")
+    version = serializers.IntegerField(
+        required=False,
+        min_value=1,
+        help_text="Apply the movement only if the inventory record is still at this version",
+    )
+
+    def validate(self, data):
+        """Check-ins and check-outs take a positive unit count."""
+        if data["transaction_type"] in ("check_in", "check_out") and data["quantity"] < 1:
+            raise serializers.ValidationError({"quantity": "Ensure this value is greater than or equal to 1."})
+        return data
+
+
+class BulkStockMovementSerializer(serializers.Serializer):
+    """Serializer for the bulk stock movement action."""
+
+    movements = StockMovementItemSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(
+        default=True,
+        help_text="Apply all movements or none of them; set to false to apply the valid movements only",
+    )
+
+
+class TransferSerializer(serializers.Serializer):
+    """Serializer for transfer action."""
+
+    destination_location = serializers.UUIDField(help_text="ID of the location receiving the parts")
+    quantity = serializers.IntegerField(min_value=1, help_text="Number of units to transfer")
+    reason = serializers.CharField(help_text="Reason for transfer")
+    notes = serializers.CharField(required=False, allow_blank=True, help_text="Additional notes")
+
+
+class StockTransferItemSerializer(TransferSerializer):
+    """Serializer for a single item of a bulk transfer request."""
+
+    source = serializers.UUIDField(help_text="ID of the inventory record to transfer from")
+
+
+class BulkStockTransferSerializer(serializers.Serializer):
+    """Serializer for the bulk transfer action."""
+
+    transfers = StockTransferItemSerializer(many=True, allow_empty=False)
+    atomic = serializers.BooleanField(
+        default=True,
+        help_text="Apply all transfers or none of them; set to false to apply the valid transfers only",
+    )
+
+
+class BulkImportSerializer(serializers.Serializer):
+    """Serializer for the bulk CSV import actions."""
+
+    csv = serializers.CharField(trim_whitespace=False, help_text="CSV data, with a header row of field names")
+    dry_run = serializers.BooleanField(
+        default=False,
+        help_text="Validate the rows and report what would change without writing anything",
+    )
+    atomic = serializers.BooleanField(
+        default=True,
+        help_text="Import all rows or none of them; set to false to import the valid rows only",
+    )
+
+
+class CompatibleStockSerializer(serializers.Serializer):
+    """Serializer for the compatible stock lookup."""
+
+    devices = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=MAX_DEVICES,
+        help_text="IDs of the devices to find spare parts for",
+    )
+    elsewhere_limit = serializers.IntegerField(
+        min_value=0,
+        default=DEFAULT_ELSEWHERE_LIMIT,
+        help_text="Most inventory records at other locations to list per device",
+    )
+
+
+class NearestStockSerializer(serializers.Serializer):
+    """Serializer for the nearest available stock lookup."""
+
+    spare_part_type = serializers.UUIDField(help_text="ID of the part type to find stock of")
+    location = serializers.UUIDField(
+        required=False,
+        help_text="ID of the location to search from (its own coordinates or those of its nearest ancestor)",
+    )
+    latitude = serializers.DecimalField(
+        max_digits=8, decimal_places=6, min_value=-90, max_value=90, required=False, help_text="Latitude to search from"
+    )
+    longitude = serializers.DecimalField(
+        max_digits=9,
+        decimal_places=6,
+        min_value=-180,
+        max_value=180,
+        required=False,
+        help_text="Longitude to search from",
+    )
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_NEAREST_COUNT,
+        default=DEFAULT_NEAREST_COUNT,
+        help_text="Number of nearest sites to return",
+    )
+
+    def validate(self, attrs):
+        """Require a location or both coordinates to search from."""
+        has_coordinates = "latitude" in attrs and "longitude" in attrs
+        if "location" not in attrs and not has_coordinates:
+            raise serializers.ValidationError("Give a location, or a latitude and a longitude, to search from.")
+        if ("latitude" in attrs) != ("longitude" in attrs):
+            raise serializers.ValidationError("Give both a latitude and a longitude, or neither.")
+        return attrs
+
+
+class ReservationSerializer(serializers.Serializer):
+    """Serializer for creating a reservation."""
+
+    spare_part_inventory = serializers.UUIDField(help_text="ID of the inventory record to reserve parts from")
+    quantity = serializers.IntegerField(min_value=1, help_text="Number of units to reserve")
+    holder = serializers.CharField(max_length=100, help_text="Ticket, change or person holding the reservation")
+    expires = serializers.DateTimeField(
+        required=False,
+        help_text="When the reservation is released unless extended or used (defaults to reservation_default_days)",
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, help_text="Additional notes")
+
+
+class ExtendReservationSerializer(serializers.Serializer):
+    """Serializer for the extend reservation action."""
+
+    expires = serializers.DateTimeField(help_text="New expiry of the reservation")
+
+
+class ConsumeReservationSerializer(serializers.Serializer):
+    """Serializer for the consume reservation action."""
+
+    quantity = serializers.IntegerField(
+        min_value=1,
+        required=False,
+        help_text="Number of units to check out (defaults to all of them; the rest are released)",
+    )
+    reason = serializers.CharField(required=False, allow_blank=True, help_text="Reason for check-out")
+    related_device_id = serializers.UUIDField(
+        required=False,
+        allow_null=True,
+        help_text="ID of device this part is being used for",
+    )
+    notes = serializers.CharField(required=False, allow_blank=True, help_text="Additional notes")
+
+
+class ReleaseReservationSerializer(serializers.Serializer):
+    """Serializer for the release reservation action."""
+
+    reason = serializers.CharField(required=False, allow_blank=True, help_text="Reason for releasing the parts")
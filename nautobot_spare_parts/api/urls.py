@@ -8,6 +8,10 @@ router = OrderedDefaultRouter()
 router.register("spare-part-types", views.SparePartTypeViewSet)
 router.register("spare-part-inventory", views.SparePartInventoryViewSet)
 router.register("spare-part-transactions", views.SparePartTransactionViewSet)
+router.register("spare-part-reservations", views.SparePartReservationViewSet)
+router.register("spare-part-transaction-archive", views.SparePartTransactionArchiveViewSet)
+router.register("spare-part-usage", views.SparePartDailyUsageViewSet)
+router.register("spare-part-forecasts", views.SparePartForecastViewSet)
 
 app_name = "nautobot_spare_parts-api"
 urlpatterns = router.urls
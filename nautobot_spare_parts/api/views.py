@@ -1,35 +1,415 @@
 """API views for Spare Parts Inventory plugin."""
 
+from datetime import timedelta
+from functools import partial
+import hashlib
+
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags, quote_etag
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException
+from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
 from nautobot.apps.api import NautobotModelViewSet
-from nautobot.dcim.models import Device
+from nautobot.core.api.filter_backends import NautobotFilterBackend
+from nautobot.dcim.models import Device, Location
 
-from nautobot_spare_parts import filters
+from nautobot_spare_parts import filters, query_plans
 from nautobot_spare_parts.api import serializers
-from nautobot_spare_parts.models import SparePartInventory, SparePartTransaction, SparePartType
+from nautobot_spare_parts.api.pagination import KEYSET_PARAMS, KeysetPagination
+from nautobot_spare_parts.checkpoints import get_stock_report, parse_as_of
+from nautobot_spare_parts.compatibility import find_compatible_stock
+from nautobot_spare_parts.export import DEFAULT_CHUNK_SIZE, filter_ledger, streaming_ledger_response
+from nautobot_spare_parts.geo import location_point, nearest_stock
+from nautobot_spare_parts.hierarchy import stock_by_location, TOTAL_FIELDS
+from nautobot_spare_parts.importer import (
+    IMPORT_PERMISSIONS,
+    import_spare_part_inventory,
+    import_spare_part_types,
+    read_csv,
+)
+from nautobot_spare_parts.models import (
+    SparePartDailyUsage,
+    SparePartForecast,
+    SparePartInventory,
+    SparePartReservation,
+    SparePartTransaction,
+    SparePartTransactionArchive,
+    SparePartType,
+    VersionConflict,
+)
+from nautobot_spare_parts.stock import (
+    apply_stock_movements,
+    apply_stock_transfers,
+    consume_reservation,
+    extend_reservation,
+    release_reservations,
+    reserve_stock,
+    StockMovement,
+    StockMovementError,
+    StockTransfer,
+    transfer_stock,
+)
+from nautobot_spare_parts.utils import apply_filterset, get_change_time, get_plugin_setting
+
+USAGE_PERIODS = {
+    "day": None,
+    "week": TruncWeek,
+    "month": TruncMonth,
+}
+
+
+class SparePartsFilterBackend(NautobotFilterBackend):
+    """NautobotFilterBackend that doesn't treat the field selection and keyset pagination parameters as filters."""
+
+    def get_filterset_kwargs(self, request, queryset, view):
+        """Leave ``fields``, ``exclude``, ``flat``, ``cursor`` and ``ascending`` out of the filter data."""
+        kwargs = super().get_filterset_kwargs(request, queryset, view)
+        kwargs["data"] = kwargs["data"].copy()
+        for param in (*serializers.FIELD_SELECTION_PARAMS, *KEYSET_PARAMS):
+            kwargs["data"].pop(param, None)
+        return kwargs
+
+
+class FieldSelectionViewSetMixin:
+    """Viewset mixin fitting the queryset's joins and prefetches to the fields the request selects.
+
+    ``related_fields`` maps each serializer field that reads related objects to the query plan (see query_plans)
+    it needs when nested in full; ``flat_related_fields`` does the same for flat mode, where only the related
+    objects' IDs and display strings are returned. See serializers.FieldSelection.
+    """
+
+    filter_backends = [
+        SparePartsFilterBackend if backend is NautobotFilterBackend else backend
+        for backend in api_settings.DEFAULT_FILTER_BACKENDS
+    ]
+    related_fields = {}
+    flat_related_fields = {}
+
+    def get_queryset(self):
+        """Return the queryset with just the lookups the selected fields need."""
+        queryset = super().get_queryset()
+        selection = serializers.FieldSelection(self.request)
+        related_fields = self.flat_related_fields if selection.flat else self.related_fields
+        return query_plans.apply_plan(
+            queryset.select_related(None).prefetch_related(None),
+            *(plan for name, plan in related_fields.items() if selection.includes(name)),
+        )
+
+
+class KeysetPaginationViewSetMixin:
+    """Viewset mixin switching to KeysetPagination on ``keyset_ordering`` when the request has ``?cursor=``.
+
+    Without it the usual limit/offset pagination applies. The default ordering, by primary key alone, reads every
+    record once but places records created while paging at random, ahead of or behind the cursor.
+    """
+
+    keyset_ordering = ("id",)
+
+    @property
+    def paginator(self):
+        """Return the paginator for this request."""
+        if not hasattr(self, "_paginator") and KeysetPagination.requested(getattr(self, "request", None)):
+            self._paginator = KeysetPagination(self.keyset_ordering)
+        return super().paginator
+
+
+class ConditionalGetViewSetMixin:
+    """Viewset mixin answering ``If-None-Match`` and ``If-Modified-Since`` on list and detail requests.
+
+    A list's version is the latest ``last_updated`` and the number of the records it covers (after filtering),
+    read in one aggregate query, together with the time the "stock" change marker was last moved (see signals),
+    which covers stock totals, deletions and nested related objects. A single record's version is its own
+    ``last_updated`` with the same marker. Responses carry an ``ETag`` and ``Last-Modified`` built from the version,
+    and a request whose validators still match gets a 304 before any record is loaded or serialized. While the
+    marker is missing from the cache (evicted, or never set) a change can't be ruled out, so no 304 is given then.
+    """
+
+    # Model field holding the record's version, if any, put at the start of a single record's ETag.
+    version_field = None
+
+    def list(self, request, *args, **kwargs):
+        """Return the list, or 304 if the client's copy is current."""
+        version = (
+            self.filter_queryset(self.get_queryset())
+            .order_by()
+            .aggregate(last_updated=Max("last_updated"), count=Count("pk"))
+        )
+        return self.conditional_response(
+            request,
+            version["last_updated"],
+            version["count"],
+            partial(super().list, request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        """Return the record, or 304 if the client's copy is current."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        fields = ["last_updated"] if self.version_field is None else ["last_updated", self.version_field]
+        last_updated, *record_version = get_object_or_404(
+            self.get_queryset().prefetch_related(None).order_by().values_list(*fields),
+            **{self.lookup_field: kwargs[lookup_url_kwarg]},
+        )
+        return self.conditional_response(
+            request,
+            last_updated,
+            1,
+            partial(super().retrieve, request, *args, **kwargs),
+            record_version=record_version[0] if record_version else None,
+        )
+
+    def conditional_response(self, request, last_updated, count, get_response, record_version=None):
+        """Return 304 if the request's validators match the version, else ``get_response()``, with validators.
+
+        A ``record_version`` (see IfMatchViewSetMixin) starts the ETag, so the ETag can be sent back in ``If-Match``.
+        """
+        changed = get_change_time("stock")
+        # Without the marker a change can't be ruled out, so the response is sent in full (with fresh validators).
+        marker_known = changed is not None
+        if not marker_known:
+            changed = timezone.now()
+        last_modified = max(last_updated, changed) if last_updated else changed
+        # The representation also varies with the selected fields, filters and format.
+        version = f"{last_updated}|{count}|{changed}|{request.get_full_path()}|{request.accepted_media_type}"
+        etag = hashlib.sha256(version.encode()).hexdigest()[:32]
+        if record_version is not None:
+            etag = f"{record_version}-{etag}"
+        headers = {"ETag": quote_etag(etag)}
+        # HTTP dates have whole seconds, so a change later in the same second would go unseen by If-Modified-Since.
+        # Last-Modified is only given (and If-Modified-Since only honoured) once that second is over.
+        last_modified = int(last_modified.timestamp())
+        if last_modified < int(timezone.now().timestamp()):
+            headers["Last-Modified"] = http_date(last_modified)
+        else:
+            last_modified = None
+        response = None
+        if marker_known:
+            response = get_conditional_response(request, etag=headers["ETag"], last_modified=last_modified)
+        if response is None:
+            response = get_response()
+        if response.status_code in (200, 304):
+            for header, value in headers.items():
+                response[header] = value
+        return response
+
+
+class PreconditionFailed(APIException):
+    """The record is no longer at a version listed in the request's ``If-Match`` header."""
+
+    status_code = status.HTTP_412_PRECONDITION_FAILED
+    default_detail = "The record has been changed since it was read."
+    default_code = "precondition_failed"
+
+
+def if_match_versions(request):
+    """Return the record versions listed in the request's ``If-Match`` header, or None if it has none (or ``*``).
+
+    The version is read from the start of each entity tag, so both the ``"<version>"`` returned by writes and the
+    ``"<version>-<hash>"`` of a detail GET are accepted. Weak tags never match, as If-Match compares strongly.
+    """
+    header = request.headers.get("If-Match")
+    if not header:
+        return None
+    etags = parse_etags(header)
+    if etags == ["*"]:
+        return None
+    versions = set()
+    for etag in etags:
+        if etag.startswith("W/"):
+            continue
+        version = etag.strip('"').split("-")[0]
+        if version.isdigit():
+            versions.add(int(version))
+    return versions
+
+
+def version_etag(version):
+    """Return the ETag header value for a record written at ``version``."""
+    return quote_etag(str(version))
+
+
+class IfMatchViewSetMixin:
+    """Viewset mixin for compare-and-set writes to records with a ``version`` (optimistic concurrency control).
+
+    PUT and PATCH honour ``If-Match``: the save is refused with 412 Precondition Failed unless the record, locked
+    for the save, is still at one of the versions listed (see SparePartInventory.save()). Successful writes return
+    the record's new version as their ``ETag``.
+    """
+
+    def perform_update(self, serializer):
+        """Save the record if it is at a version listed in ``If-Match``."""
+        serializer.instance.expected_versions = if_match_versions(self.request)
+        try:
+            super().perform_update(serializer)
+        except VersionConflict as err:
+            raise PreconditionFailed("; ".join(err.messages)) from err
+
+    def update(self, request, *args, **kwargs):
+        """Update the record and return its new version as the ETag."""
+        response = super().update(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK and "version" in response.data:
+            response["ETag"] = version_etag(response.data["version"])
+        return response
+
+
+def bulk_result_response(results, indexed_results, applied):
+    """Build the response for a bulk stock action.
+
+    ``results`` holds one entry per request item, already filled in for items rejected before reaching the stock
+    engine; ``indexed_results`` pairs the remaining item indexes with their StockMovementResult.
+    """
+    for index, result in indexed_results:
+        if result.error is not None:
+            results[index] = {"index": index, "status": "error", "message": "; ".join(result.error.messages)}
+        elif not applied:
+            results[index] = {"index": index, "status": "not_applied"}
+        else:
+            txn = result.transaction
+            results[index] = {
+                "index": index,
+                "status": "success",
+                "inventory": str(txn.spare_part_inventory_id),
+                "transaction": str(txn.pk),
+                "quantity_before": txn.quantity_before,
+                "quantity_after": txn.quantity_after,
+            }
+            if result.destination_transaction is not None:
+                credit = result.destination_transaction
+                results[index]["destination_inventory"] = str(credit.spare_part_inventory_id)
+                results[index]["destination_transaction"] = str(credit.pk)
+    for index, result in enumerate(results):
+        if result is None:
+            results[index] = {"index": index, "status": "not_applied"}
+
+    failed = sum(1 for result in results if result["status"] == "error")
+    succeeded = sum(1 for result in results if result["status"] == "success")
+    if not succeeded:
+        response_status = "error"
+    elif failed:
+        response_status = "partial"
+    else:
+        response_status = "success"
+
+    return Response(
+        {
+            "status": response_status,
+            "applied": succeeded,
+            "failed": failed,
+            "results": results,
+        },
+        status=status.HTTP_400_BAD_REQUEST if response_status == "error" else status.HTTP_200_OK,
+    )
 
 
-class SparePartTypeViewSet(NautobotModelViewSet):
+def compatible_inventory_result(request, inventory):
+    """Describe an inventory record found by the compatible stock lookup."""
+    return {
+        "inventory": str(inventory.pk),
+        "url": request.build_absolute_uri(inventory.get_absolute_url(api=True)),
+        "spare_part_type": str(inventory.spare_part_type),
+        "location": inventory.location.name,
+        "storage_location_detail": inventory.storage_location_detail,
+        "quantity_available": inventory.quantity_available,
+    }
+
+
+def bulk_import_response(request, import_rows, permissions, **kwargs):
+    """Run a bulk CSV import from the request data and build its response."""
+    if not request.user.has_perms(permissions):
+        return Response(
+            {"status": "error", "message": "You do not have permission to add and change these objects"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+    serializer = serializers.BulkImportSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        rows = read_csv(serializer.validated_data["csv"])
+    except ValidationError as err:
+        return Response(
+            {"status": "error", "message": "; ".join(err.messages)},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    result = import_rows(
+        rows,
+        dry_run=serializer.validated_data["dry_run"],
+        atomic=serializer.validated_data["atomic"],
+        **kwargs,
+    )
+
+    if result.ok:
+        response_status = "success"
+    elif result.applied:
+        response_status = "partial"
+    else:
+        response_status = "error"
+    return Response(
+        {"status": response_status, **result.as_dict()},
+        status=status.HTTP_400_BAD_REQUEST if response_status == "error" else status.HTTP_200_OK,
+    )
+
+
+class SparePartTypeViewSet(ConditionalGetViewSetMixin, FieldSelectionViewSetMixin, NautobotModelViewSet):
     """API viewset for SparePartType."""
 
-    queryset = SparePartType.objects.all()
+    queryset = SparePartType.objects.with_stock_totals()
     serializer_class = serializers.SparePartTypeSerializer
     filterset_class = filters.SparePartTypeFilterSet
+    related_fields = {
+        "display": (["manufacturer"], []),
+        "manufacturer": (["manufacturer"], []),
+        "compatible_device_types": ([], ["compatible_device_types"]),
+        "tags": ([], ["tags"]),
+    }
+    flat_related_fields = {
+        **related_fields,
+        "compatible_device_types": ([], [query_plans.brief_device_types("compatible_device_types")]),
+    }
 
+    @action(detail=False, methods=["post"], url_path="bulk-import")
+    def bulk_import(self, request):
+        """Create or update spare part types from CSV data."""
+        return bulk_import_response(
+            request,
+            import_spare_part_types,
+            IMPORT_PERMISSIONS["spare_part_types"],
+        )
 
-class SparePartInventoryViewSet(NautobotModelViewSet):
-    """API viewset for SparePartInventory."""
 
-    queryset = SparePartInventory.objects.select_related(
-        "spare_part_type",
-        "spare_part_type__manufacturer",
-        "location",
-    )
+class SparePartInventoryViewSet(
+    IfMatchViewSetMixin,
+    ConditionalGetViewSetMixin,
+    KeysetPaginationViewSetMixin,
+    FieldSelectionViewSetMixin,
+    NautobotModelViewSet,
+):
+    """API viewset for SparePartInventory.
+
+    PUT, PATCH and the check_in, check_out and adjust actions honour ``If-Match`` (see IfMatchViewSetMixin).
+    """
+
+    queryset = SparePartInventory.objects.all()
+    version_field = "version"
     serializer_class = serializers.SparePartInventorySerializer
     filterset_class = filters.SparePartInventoryFilterSet
+    related_fields = {
+        "display": query_plans.BRIEF_INVENTORY,
+        "spare_part_type": query_plans.nested_plan("spare_part_type", query_plans.SPARE_PART_TYPE),
+        "location": (["location"], ["location__tags"]),
+        "tags": ([], ["tags"]),
+    }
+    flat_related_fields = {
+        "display": query_plans.BRIEF_INVENTORY,
+        "spare_part_type": query_plans.nested_plan("spare_part_type", query_plans.BRIEF_SPARE_PART_TYPE),
+        "location": (["location"], []),
+        "tags": ([], ["tags"]),
+    }
 
     @action(detail=True, methods=["post"])
     def check_in(self, request, pk=None):
@@ -48,12 +428,9 @@ class SparePartInventoryViewSet(NautobotModelViewSet):
                     transaction_type="check_in",
                     reason=reason,
                     user=request.user,
+                    notes=notes,
+                    expected_versions=if_match_versions(request),
                 )
-                if notes:
-                    # Add notes to the most recent transaction
-                    transaction = inventory.transactions.first()
-                    transaction.notes = notes
-                    transaction.save()
 
                 return Response(
                     {
@@ -64,6 +441,12 @@ class SparePartInventoryViewSet(NautobotModelViewSet):
                         ).data,
                     },
                     status=status.HTTP_200_OK,
+                    headers={"ETag": version_etag(inventory.version)},
+                )
+            except VersionConflict as e:
+                return Response(
+                    {"status": "error", "message": "; ".join(e.messages)},
+                    status=status.HTTP_412_PRECONDITION_FAILED,
                 )
             except Exception as e:
                 return Response(
@@ -102,12 +485,9 @@ class SparePartInventoryViewSet(NautobotModelViewSet):
                     reason=reason,
                     user=request.user,
                     related_device=related_device,
+                    notes=notes,
+                    expected_versions=if_match_versions(request),
                 )
-                if notes:
-                    # Add notes to the most recent transaction
-                    transaction = inventory.transactions.first()
-                    transaction.notes = notes
-                    transaction.save()
 
                 return Response(
                     {
@@ -118,6 +498,12 @@ class SparePartInventoryViewSet(NautobotModelViewSet):
                         ).data,
                     },
                     status=status.HTTP_200_OK,
+                    headers={"ETag": version_etag(inventory.version)},
+                )
+            except VersionConflict as e:
+                return Response(
+                    {"status": "error", "message": "; ".join(e.messages)},
+                    status=status.HTTP_412_PRECONDITION_FAILED,
                 )
             except Exception as e:
                 return Response(
@@ -144,12 +530,9 @@ class SparePartInventoryViewSet(NautobotModelViewSet):
                     transaction_type="adjustment",
                     reason=reason,
                     user=request.user,
+                    notes=notes,
+                    expected_versions=if_match_versions(request),
                 )
-                if notes:
-                    # Add notes to the most recent transaction
-                    transaction = inventory.transactions.first()
-                    transaction.notes = notes
-                    transaction.save()
 
                 return Response(
                     {
@@ -160,6 +543,266 @@ class SparePartInventoryViewSet(NautobotModelViewSet):
                         ).data,
                     },
                     status=status.HTTP_200_OK,
+                    headers={"ETag": version_etag(inventory.version)},
+                )
+            except VersionConflict as e:
+                return Response(
+                    {"status": "error", "message": "; ".join(e.messages)},
+                    status=status.HTTP_412_PRECONDITION_FAILED,
+                )
+            except Exception as e:
+                return Response(
+                    {"status": "error", "message": str(e)},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    @action(detail=False, methods=["post"], url_path="bulk-movements")
+    def bulk_movements(self, request):
+        """Apply many check-ins, check-outs and adjustments in a single request."""
+        serializer = serializers.BulkStockMovementSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data["movements"]
+        atomic = serializer.validated_data["atomic"]
+
+        device_ids = {item["related_device"] for item in items if item.get("related_device")}
+        devices = Device.objects.restrict(request.user, "view").in_bulk(device_ids) if device_ids else {}
+
+        results = [None] * len(items)
+        movements = []
+        indexes = []
+        for index, item in enumerate(items):
+            related_device = None
+            if item.get("related_device"):
+                related_device = devices.get(item["related_device"])
+                if related_device is None:
+                    results[index] = {"index": index, "status": "error", "message": "Device not found"}
+                    continue
+            quantity = -item["quantity"] if item["transaction_type"] == "check_out" else item["quantity"]
+            movements.append(
+                StockMovement(
+                    item["inventory"],
+                    item["transaction_type"],
+                    quantity,
+                    item["reason"],
+                    related_device=related_device,
+                    notes=item.get("notes", ""),
+                    expected_versions={item["version"]} if "version" in item else None,
+                )
+            )
+            indexes.append(index)
+
+        movement_results = []
+        applied = not (atomic and any(results))
+        if applied:
+            try:
+                movement_results = apply_stock_movements(
+                    movements,
+                    user=request.user,
+                    atomic=atomic,
+                    queryset=SparePartInventory.objects.restrict(request.user, "change"),
+                )
+            except StockMovementError as err:
+                applied = False
+                movement_results = err.results
+
+        return bulk_result_response(results, zip(indexes, movement_results), applied)
+
+    @action(detail=False, methods=["get"], url_path="as-of")
+    def as_of(self, request):
+        """Stock levels of the (filtered) inventory records at the time given by ``?as_of=``."""
+        try:
+            as_of = parse_as_of(request.query_params.get("as_of", ""))
+            inventories = apply_filterset(self.filterset_class, self.get_queryset(), request.query_params)
+        except ValidationError as err:
+            return Response(
+                {"status": "error", "message": "; ".join(err.messages)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [
+            {
+                "inventory": str(row["inventory"].pk),
+                "url": request.build_absolute_uri(row["inventory"].get_absolute_url(api=True)),
+                "spare_part_type": str(row["inventory"].spare_part_type),
+                "location": row["inventory"].location.name,
+                "quantity_on_hand": row["quantity_on_hand"],
+                "quantity_reserved": row["quantity_reserved"],
+                "quantity_available": row["quantity_available"],
+            }
+            for row in get_stock_report(as_of, inventories)
+        ]
+        return Response({"as_of": as_of.isoformat(), "count": len(results), "results": results})
+
+    @action(detail=False, methods=["get"], url_path="location-summary")
+    def location_summary(self, request):
+        """Stock totals of the (filtered) inventory records per location, each including its child locations.
+
+        Every location holding matching records is listed along with its ancestors, parents before children.
+        """
+        try:
+            inventories = apply_filterset(
+                self.filterset_class, SparePartInventory.objects.restrict(request.user, "view"), request.query_params
+            )
+        except ValidationError as err:
+            return Response(
+                {"status": "error", "message": "; ".join(err.messages)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [
+            {
+                "location": str(row["location"].pk),
+                "url": request.build_absolute_uri(row["location"].get_absolute_url(api=True)),
+                "name": row["location"].name,
+                "parent": str(row["location"].parent_id) if row["location"].parent_id else None,
+                "depth": row["depth"],
+                **{field: row[field] for field in TOTAL_FIELDS},
+            }
+            for row in stock_by_location(inventories, locations=Location.objects.restrict(request.user, "view"))
+        ]
+        return Response({"count": len(results), "results": results})
+
+    @action(detail=False, methods=["get", "post"], url_path="compatible")
+    def compatible(self, request):
+        """In-stock inventory records compatible with the given devices, at each device's location first.
+
+        Devices are given as ``?device=<id>`` (repeatable) or, for long lists, POSTed as ``{"devices": [...]}``.
+        """
+        if request.method == "GET":
+            data = {"devices": request.query_params.getlist("device")}
+            if "elsewhere_limit" in request.query_params:
+                data["elsewhere_limit"] = request.query_params["elsewhere_limit"]
+        else:
+            data = request.data
+        serializer = serializers.CompatibleStockSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        device_ids = list(dict.fromkeys(serializer.validated_data["devices"]))
+
+        devices = Device.objects.restrict(request.user, "view").select_related("location").in_bulk(device_ids)
+        found = find_compatible_stock(
+            [devices[pk] for pk in device_ids if pk in devices],
+            inventories=SparePartInventory.objects.restrict(request.user, "view"),
+            elsewhere_limit=serializer.validated_data["elsewhere_limit"],
+        )
+
+        results = [
+            {
+                "device": str(result.device.pk),
+                "name": result.device.name,
+                "location": result.device.location.name,
+                "local": [compatible_inventory_result(request, inventory) for inventory in result.local],
+                "elsewhere": [compatible_inventory_result(request, inventory) for inventory in result.elsewhere],
+            }
+            for result in found
+        ]
+        return Response(
+            {
+                "count": len(results),
+                "not_found": [str(pk) for pk in device_ids if pk not in devices],
+                "results": results,
+            }
+        )
+
+    @action(detail=False, methods=["get"], url_path="nearest")
+    def nearest(self, request):
+        """The inventory records of a part type with available stock nearest to a location or coordinates.
+
+        Asked as ``?spare_part_type=<id>&location=<id>`` or ``?spare_part_type=<id>&latitude=..&longitude=..``,
+        with ``&limit=`` for the number of sites. Distances are great-circle kilometres between the locations'
+        coordinates (or those of their nearest ancestor that has them).
+        """
+        serializer = serializers.NearestStockSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        if "location" in data:
+            location = Location.objects.restrict(request.user, "view").filter(pk=data["location"]).first()
+            if location is None:
+                return Response(
+                    {"status": "error", "message": f"Location {data['location']} not found."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            point = location_point(location)
+            if point is None:
+                return Response(
+                    {"status": "error", "message": f"Neither {location} nor its parents have coordinates."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            latitude, longitude = point
+            origin = {"location": str(location.pk), "latitude": latitude, "longitude": longitude}
+        else:
+            latitude, longitude = data["latitude"], data["longitude"]
+            origin = {"latitude": latitude, "longitude": longitude}
+
+        found = nearest_stock(
+            data["spare_part_type"],
+            latitude,
+            longitude,
+            count=data["limit"],
+            inventories=SparePartInventory.objects.restrict(request.user, "view"),
+        )
+        results = [
+            {**compatible_inventory_result(request, inventory), "distance_km": round(distance, 3)}
+            for inventory, distance in found
+        ]
+        return Response({"origin": origin, "count": len(results), "results": results})
+
+    @action(detail=False, methods=["post"], url_path="bulk-import")
+    def bulk_import(self, request):
+        """Create or update inventory records from CSV data, recording opening balances on the ledger."""
+        return bulk_import_response(
+            request,
+            import_spare_part_inventory,
+            IMPORT_PERMISSIONS["spare_part_inventory"],
+            user=request.user,
+        )
+
+    @action(detail=True, methods=["post"])
+    def transfer(self, request, pk=None):
+        """Transfer spare parts to another location."""
+        inventory = self.get_object()
+        serializer = serializers.TransferSerializer(data=request.data)
+
+        if serializer.is_valid():
+            quantity = serializer.validated_data["quantity"]
+            destination_location_id = serializer.validated_data["destination_location"]
+
+            try:
+                destination_location = Location.objects.restrict(request.user, "view").get(pk=destination_location_id)
+            except Location.DoesNotExist:
+                return Response(
+                    {"status": "error", "message": "Location not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            try:
+                _, credit = transfer_stock(
+                    inventory,
+                    destination_location,
+                    quantity,
+                    serializer.validated_data["reason"],
+                    user=request.user,
+                    notes=serializer.validated_data.get("notes", ""),
+                    queryset=SparePartInventory.objects.restrict(request.user, "change"),
+                    create_missing=request.user.has_perm("nautobot_spare_parts.add_sparepartinventory"),
+                )
+
+                return Response(
+                    {
+                        "status": "success",
+                        "message": f"Transferred {quantity} units to {destination_location}",
+                        "inventory": serializers.SparePartInventorySerializer(
+                            inventory, context={"request": request}
+                        ).data,
+                        "destination_inventory": serializers.SparePartInventorySerializer(
+                            credit.spare_part_inventory, context={"request": request}
+                        ).data,
+                    },
+                    status=status.HTTP_200_OK,
                 )
             except Exception as e:
                 return Response(
@@ -169,17 +812,334 @@ class SparePartInventoryViewSet(NautobotModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=["post"], url_path="bulk-transfers")
+    def bulk_transfers(self, request):
+        """Transfer stock for many inventory records in a single request."""
+        serializer = serializers.BulkStockTransferSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        items = serializer.validated_data["transfers"]
+        atomic = serializer.validated_data["atomic"]
+
+        location_ids = {item["destination_location"] for item in items}
+        locations = Location.objects.restrict(request.user, "view").in_bulk(location_ids)
+
+        results = [None] * len(items)
+        transfers = []
+        indexes = []
+        for index, item in enumerate(items):
+            if item["destination_location"] not in locations:
+                results[index] = {"index": index, "status": "error", "message": "Location not found"}
+                continue
+            transfers.append(
+                StockTransfer(
+                    item["source"],
+                    locations[item["destination_location"]],
+                    item["quantity"],
+                    item["reason"],
+                    notes=item.get("notes", ""),
+                )
+            )
+            indexes.append(index)
+
+        transfer_results = []
+        applied = not (atomic and any(results))
+        if applied:
+            try:
+                transfer_results = apply_stock_transfers(
+                    transfers,
+                    user=request.user,
+                    atomic=atomic,
+                    queryset=SparePartInventory.objects.restrict(request.user, "change"),
+                    create_missing=request.user.has_perm("nautobot_spare_parts.add_sparepartinventory"),
+                )
+            except StockMovementError as err:
+                applied = False
+                transfer_results = err.results
+
+        return bulk_result_response(results, zip(indexes, transfer_results), applied)
+
 
-class SparePartTransactionViewSet(NautobotModelViewSet):
+class SparePartTransactionViewSet(KeysetPaginationViewSetMixin, FieldSelectionViewSetMixin, NautobotModelViewSet):
     """API viewset for SparePartTransaction (read-only)."""
 
-    queryset = SparePartTransaction.objects.select_related(
-        "spare_part_inventory",
-        "spare_part_inventory__spare_part_type",
-        "spare_part_inventory__location",
-        "user",
-        "related_device",
-    )
+    queryset = SparePartTransaction.objects.all()
     serializer_class = serializers.SparePartTransactionSerializer
     filterset_class = filters.SparePartTransactionFilterSet
     http_method_names = ["get", "head", "options"]  # Read-only
+    keyset_ordering = ("timestamp", "id")
+    related_fields = {
+        "spare_part_inventory": query_plans.RELATED_INVENTORY,
+        "user": (["user"], []),
+        "related_device": (["related_device"], ["related_device__tags"]),
+    }
+    flat_related_fields = {
+        "spare_part_inventory": query_plans.BRIEF_RELATED_INVENTORY,
+        "user": (["user"], []),
+        "related_device": (["related_device"], []),
+    }
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Stream the filtered ledger as CSV or NDJSON (``?export_format=csv|ndjson``)."""
+        try:
+            chunk_size = int(request.query_params.get("chunk_size", DEFAULT_CHUNK_SIZE))
+            queryset = filter_ledger(self.get_queryset(), request.query_params)
+            return streaming_ledger_response(
+                queryset,
+                request.query_params.get("export_format", "csv"),
+                chunk_size=max(chunk_size, 1),
+            )
+        except ValueError:
+            return Response(
+                {"status": "error", "message": "chunk_size must be an integer"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        except ValidationError as err:
+            return Response(
+                {"status": "error", "message": "; ".join(err.messages)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+
+class SparePartReservationViewSet(FieldSelectionViewSetMixin, NautobotModelViewSet):
+    """API viewset for SparePartReservation.
+
+    Reservations are made with POST and then changed only through the extend, consume and release actions, which
+    keep the inventory's reserved count and the ledger in step.
+    """
+
+    queryset = SparePartReservation.objects.all()
+    serializer_class = serializers.SparePartReservationSerializer
+    filterset_class = filters.SparePartReservationFilterSet
+    http_method_names = ["get", "post", "head", "options"]
+    related_fields = {
+        "spare_part_inventory": query_plans.RELATED_INVENTORY,
+        "user": (["user"], []),
+    }
+    flat_related_fields = {
+        "spare_part_inventory": query_plans.BRIEF_RELATED_INVENTORY,
+        "user": (["user"], []),
+    }
+
+    def create(self, request, *args, **kwargs):
+        """Reserve parts, allocating them on the inventory record."""
+        serializer = serializers.ReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        expires = data.get("expires")
+        if expires is None:
+            expires = timezone.now() + timedelta(days=get_plugin_setting("reservation_default_days"))
+
+        try:
+            reservation = reserve_stock(
+                data["spare_part_inventory"],
+                data["quantity"],
+                data["holder"],
+                expires,
+                user=request.user,
+                notes=data.get("notes", ""),
+                queryset=SparePartInventory.objects.restrict(request.user, "change"),
+            )
+        except ValidationError as err:
+            return Response(
+                {"status": "error", "message": "; ".join(err.messages)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(self.get_serializer(reservation).data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=["post"])
+    def extend(self, request, pk=None):
+        """Move the expiry of an active reservation."""
+        reservation = self.get_object()
+        serializer = serializers.ExtendReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            extend_reservation(reservation, serializer.validated_data["expires"])
+        except ValidationError as err:
+            return Response(
+                {"status": "error", "message": "; ".join(err.messages)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {
+                "status": "success",
+                "message": f"Reservation extended to {reservation.expires.isoformat()}",
+                "reservation": self.get_serializer(reservation).data,
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def consume(self, request, pk=None):
+        """Check out the reserved parts and close the reservation, in one database transaction."""
+        reservation = self.get_object()
+        serializer = serializers.ConsumeReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        related_device = None
+        if data.get("related_device_id"):
+            try:
+                related_device = Device.objects.get(pk=data["related_device_id"])
+            except Device.DoesNotExist:
+                return Response(
+                    {"status": "error", "message": "Device not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+        try:
+            txn = consume_reservation(
+                reservation,
+                quantity=data.get("quantity"),
+                reason=data.get("reason", ""),
+                user=request.user,
+                related_device=related_device,
+                notes=data.get("notes", ""),
+                queryset=SparePartInventory.objects.restrict(request.user, "change"),
+            )
+        except ValidationError as err:
+            return Response(
+                {"status": "error", "message": "; ".join(err.messages)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {
+                "status": "success",
+                "message": f"Checked out {-txn.quantity} units",
+                "reservation": self.get_serializer(reservation).data,
+                "inventory": serializers.SparePartInventorySerializer(
+                    txn.spare_part_inventory, context={"request": request}
+                ).data,
+            }
+        )
+
+    @action(detail=True, methods=["post"])
+    def release(self, request, pk=None):
+        """Release the reserved parts back to available stock and close the reservation."""
+        reservation = self.get_object()
+        serializer = serializers.ReleaseReservationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        released = release_reservations(
+            [reservation],
+            reason=serializer.validated_data.get("reason", ""),
+            user=request.user,
+            queryset=SparePartInventory.objects.restrict(request.user, "change"),
+        )
+        if not released:
+            return Response(
+                {"status": "error", "message": "Reservation is not active or its inventory record was not found"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(
+            {
+                "status": "success",
+                "message": f"Released {released[0].quantity} units",
+                "reservation": self.get_serializer(released[0]).data,
+            }
+        )
+
+
+class SparePartTransactionArchiveViewSet(FieldSelectionViewSetMixin, NautobotModelViewSet):
+    """API viewset for archived SparePartTransactions (read-only)."""
+
+    queryset = SparePartTransactionArchive.objects.all()
+    serializer_class = serializers.SparePartTransactionArchiveSerializer
+    filterset_class = filters.SparePartTransactionArchiveFilterSet
+    http_method_names = ["get", "head", "options"]  # Read-only
+    related_fields = {
+        "spare_part_inventory": query_plans.RELATED_INVENTORY,
+        "user": (["user"], []),
+        "related_device": (["related_device"], ["related_device__tags"]),
+    }
+    flat_related_fields = {
+        "spare_part_inventory": query_plans.BRIEF_RELATED_INVENTORY,
+        "user": (["user"], []),
+        "related_device": (["related_device"], []),
+    }
+
+
+class SparePartDailyUsageViewSet(FieldSelectionViewSetMixin, NautobotModelViewSet):
+    """API viewset for the daily usage rollup (read-only)."""
+
+    queryset = SparePartDailyUsage.objects.all()
+    serializer_class = serializers.SparePartDailyUsageSerializer
+    filterset_class = filters.SparePartDailyUsageFilterSet
+    http_method_names = ["get", "head", "options"]  # Read-only
+    related_fields = {"spare_part_inventory": query_plans.RELATED_INVENTORY}
+    flat_related_fields = {"spare_part_inventory": query_plans.BRIEF_RELATED_INVENTORY}
+
+    @action(detail=False, methods=["get"])
+    def summary(self, request):
+        """Usage totals per period, spare part type, location and transaction type (``?period=day|week|month``).
+
+        Weeks start on Monday and each period is labelled with its first day. Only the rollup table is read.
+        """
+        period = request.query_params.get("period", "week")
+        if period not in USAGE_PERIODS:
+            return Response(
+                {"status": "error", "message": f"period must be one of: {', '.join(USAGE_PERIODS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            usage = apply_filterset(
+                self.filterset_class, self.get_queryset().prefetch_related(None), request.query_params
+            )
+        except ValidationError as err:
+            return Response(
+                {"status": "error", "message": "; ".join(err.messages)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        truncate = USAGE_PERIODS[period]
+        rows = (
+            usage.annotate(period_start=truncate("date") if truncate else F("date"))
+            .order_by()
+            .values(
+                "period_start",
+                "spare_part_inventory__spare_part_type",
+                "spare_part_inventory__spare_part_type__name",
+                "spare_part_inventory__location",
+                "spare_part_inventory__location__name",
+                "transaction_type",
+            )
+            .annotate(
+                transaction_count=Sum("transaction_count"),
+                units_in=Sum("units_in"),
+                units_out=Sum("units_out"),
+            )
+            .order_by(
+                "period_start",
+                "spare_part_inventory__location__name",
+                "spare_part_inventory__spare_part_type__name",
+                "transaction_type",
+            )
+        )
+        results = [
+            {
+                "period_start": row["period_start"].isoformat(),
+                "spare_part_type": str(row["spare_part_inventory__spare_part_type"]),
+                "spare_part_type_name": row["spare_part_inventory__spare_part_type__name"],
+                "location": str(row["spare_part_inventory__location"]),
+                "location_name": row["spare_part_inventory__location__name"],
+                "transaction_type": row["transaction_type"],
+                "transaction_count": row["transaction_count"],
+                "units_in": row["units_in"],
+                "units_out": row["units_out"],
+            }
+            for row in rows
+        ]
+        return Response({"period": period, "count": len(results), "results": results})
+
+
+class SparePartForecastViewSet(FieldSelectionViewSetMixin, NautobotModelViewSet):
+    """API viewset for demand forecasts (read-only; run the Forecast Demand job to refresh them)."""
+
+    queryset = SparePartForecast.objects.all()
+    serializer_class = serializers.SparePartForecastSerializer
+    filterset_class = filters.SparePartForecastFilterSet
+    http_method_names = ["get", "head", "options"]  # Read-only
+    related_fields = {"spare_part_inventory": query_plans.RELATED_INVENTORY}
+    flat_related_fields = {"spare_part_inventory": query_plans.BRIEF_RELATED_INVENTORY}
@@ -0,0 +1,89 @@
+"""Archival of old SparePartTransaction rows.
+
+Transactions at or before a cutoff are moved, a bounded batch per database transaction, from the live ledger into
+SparePartTransactionArchive. Before anything is moved, a stock checkpoint is recorded at the cutoff itself: that
+carry-forward balance lets point-in-time stock queries after the cutoff start from the checkpoint and read only
+the live ledger, while queries before it read the archive.
+"""
+
+from datetime import datetime, timedelta
+import time
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from nautobot_spare_parts.checkpoints import create_checkpoint_as_of
+from nautobot_spare_parts.models import SparePartStockCheckpoint, SparePartTransaction, SparePartTransactionArchive
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def get_archive_cutoff(retention_days):
+    """Return the start of the day ``retention_days`` ago, so archiving runs share one cutoff per day."""
+    day = timezone.localdate() - timedelta(days=retention_days)
+    return timezone.make_aware(datetime.combine(day, datetime.min.time()))
+
+
+def get_carry_forward_checkpoint(cutoff):
+    """Return the checkpoint recorded exactly at ``cutoff``, creating it if need be."""
+    checkpoint = SparePartStockCheckpoint.objects.filter(timestamp=cutoff).first()
+    if checkpoint is None:
+        checkpoint = create_checkpoint_as_of(cutoff)
+    return checkpoint
+
+
+def archive_batch(cutoff, batch_size=DEFAULT_BATCH_SIZE):
+    """Move up to ``batch_size`` transactions at or before ``cutoff`` into the archive; return how many moved.
+
+    The two halves of a transfer are archived together, so the pair's link is kept: outgoing transfers whose
+    incoming half is after the cutoff stay live, and the other half of each transfer in the batch is moved with it.
+    """
+    with transaction.atomic():
+        batch_ids = list(
+            SparePartTransaction.objects.filter(timestamp__lte=cutoff)
+            .exclude(transfer_destination__timestamp__gt=cutoff)
+            .order_by()
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch_ids:
+            return 0
+        # An incoming half is never earlier than its outgoing half, so the halves pulled in are before the cutoff too.
+        batch_ids += list(
+            SparePartTransaction.objects.filter(
+                Q(transfer_source__in=batch_ids) | Q(transfer_destination__in=batch_ids)
+            )
+            .exclude(pk__in=batch_ids)
+            .values_list("pk", flat=True)
+        )
+
+        archived = []
+        for row in SparePartTransaction.objects.filter(pk__in=batch_ids).values(
+            *SparePartTransactionArchive.ARCHIVED_FIELDS
+        ):
+            row["transfer_source"] = row.pop("transfer_source_id")
+            archived.append(SparePartTransactionArchive(**row))
+        SparePartTransactionArchive.objects.bulk_create(archived, ignore_conflicts=True)
+        SparePartTransaction.objects.filter(pk__in=batch_ids).delete()
+    return len(batch_ids)
+
+
+def archive_transactions(cutoff, batch_size=DEFAULT_BATCH_SIZE, max_batches=None, pause=0):
+    """Archive every transaction at or before ``cutoff``, one batch per database transaction.
+
+    Records the carry-forward checkpoint first. ``max_batches`` stops early (a later run carries on where this one
+    stopped) and ``pause`` sleeps between batches to leave room for other database work. Returns the number of
+    transactions archived.
+    """
+    get_carry_forward_checkpoint(cutoff)
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        moved = archive_batch(cutoff, batch_size=batch_size)
+        if not moved:
+            break
+        total += moved
+        batches += 1
+        if pause:
+            time.sleep(pause)
+    return total
@@ -0,0 +1,215 @@
+"""Stock checkpoints and point-in-time ("as of") stock levels.
+
+A checkpoint records the on-hand and reserved quantities of every inventory record at one moment. The stock
+levels at any other time are then the levels of the nearest starting point (the checkpoint just before, the
+checkpoint just after, or the live inventory records) moved forwards or backwards by the ledger transactions in
+between, summed per inventory record with one grouped query over the ``(spare_part_inventory, timestamp)`` index.
+
+Inventory records whose quantities were set without a ledger transaction (for example typed into the edit form)
+are only reflected accurately from the first checkpoint after the change.
+"""
+
+from datetime import datetime, time
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from nautobot_spare_parts.models import (
+    SparePartInventory,
+    SparePartStockCheckpoint,
+    SparePartStockCheckpointEntry,
+    SparePartTransaction,
+    SparePartTransactionArchive,
+)
+from nautobot_spare_parts.stock import RESERVATION_TRANSACTION_TYPES
+
+
+def parse_as_of(value):
+    """Parse an "as of" date/time; a date alone means the end of that day. Raises ValidationError if invalid."""
+    try:
+        as_of = parse_datetime(value)
+        if as_of is None:
+            date = parse_date(value)
+            if date is not None:
+                as_of = datetime.combine(date, time.max)
+    except ValueError:
+        as_of = None
+    if as_of is None:
+        raise ValidationError(f"Invalid date/time {value!r}; use an ISO 8601 date or date and time")
+    if timezone.is_naive(as_of):
+        as_of = timezone.make_aware(as_of)
+    return as_of
+
+
+def create_checkpoint(batch_size=5000):
+    """Record the current stock levels of every inventory record and return the new SparePartStockCheckpoint.
+
+    Every inventory row is locked (in primary-key order, like the stock engine) while the levels are read, and the
+    checkpoint timestamp is taken once the locks are held. Movements committed before that are part of the
+    snapshot; movements waiting on the locks get later ledger timestamps. Stock movements are held up for as long
+    as the snapshot takes.
+    """
+    with transaction.atomic():
+        levels = list(
+            SparePartInventory.objects.select_for_update()
+            .order_by("pk")
+            .values_list("pk", "quantity_on_hand", "quantity_reserved")
+        )
+        checkpoint = SparePartStockCheckpoint.objects.create(timestamp=timezone.now(), inventory_count=len(levels))
+        SparePartStockCheckpointEntry.objects.bulk_create(
+            (
+                SparePartStockCheckpointEntry(
+                    checkpoint=checkpoint,
+                    spare_part_inventory_id=inventory_id,
+                    quantity_on_hand=on_hand,
+                    quantity_reserved=reserved,
+                )
+                for inventory_id, on_hand, reserved in levels
+            ),
+            batch_size=batch_size,
+        )
+    return checkpoint
+
+
+def create_checkpoint_as_of(as_of, batch_size=5000):
+    """Record a checkpoint of the stock levels at the past moment ``as_of`` and return it.
+
+    The levels are worked out with get_stock_as_of(), so this is how a carry-forward balance is recorded before
+    the transactions leading up to it are archived. Raises ValidationError if the ledger would put any record
+    below zero.
+    """
+    with transaction.atomic():
+        levels = get_stock_as_of(as_of)
+        negative = [pk for pk, (on_hand, reserved) in levels.items() if on_hand < 0 or reserved < 0]
+        if negative:
+            raise ValidationError(
+                f"The ledger gives {len(negative)} inventory record(s) negative stock at {as_of}; reconcile it first"
+            )
+        checkpoint = SparePartStockCheckpoint.objects.create(timestamp=as_of, inventory_count=len(levels))
+        SparePartStockCheckpointEntry.objects.bulk_create(
+            (
+                SparePartStockCheckpointEntry(
+                    checkpoint=checkpoint,
+                    spare_part_inventory_id=inventory_id,
+                    quantity_on_hand=on_hand,
+                    quantity_reserved=reserved,
+                )
+                for inventory_id, (on_hand, reserved) in levels.items()
+            ),
+            batch_size=batch_size,
+        )
+    return checkpoint
+
+
+def get_ledger_deltas(inventories, start, end):
+    """Return ``{inventory_pk: (on_hand_change, reserved_change)}`` for transactions in ``(start, end]``.
+
+    Archived transactions are included when the time range reaches back into the archive.
+    """
+    ledgers = [SparePartTransaction.objects.all()]
+    archived = SparePartTransactionArchive.objects.filter(timestamp__gt=start, timestamp__lte=end)
+    if archived.exists():
+        ledgers.append(archived)
+
+    reservation = Q(transaction_type__in=RESERVATION_TRANSACTION_TYPES)
+    totals = {}
+    for ledger in ledgers:
+        deltas = (
+            ledger.filter(
+                spare_part_inventory__in=inventories,
+                timestamp__gt=start,
+                timestamp__lte=end,
+            )
+            .order_by()
+            .values_list("spare_part_inventory")
+            .annotate(
+                on_hand=Coalesce(Sum("quantity", filter=~reservation), 0),
+                reserved=Coalesce(Sum("quantity", filter=reservation), 0),
+            )
+        )
+        for inventory_id, on_hand, reserved in deltas:
+            on_hand_total, reserved_total = totals.get(inventory_id, (0, 0))
+            totals[inventory_id] = (on_hand_total + on_hand, reserved_total + reserved)
+    return totals
+
+
+def get_stock_as_of(as_of, inventories=None):
+    """Return ``{inventory_pk: (quantity_on_hand, quantity_reserved)}`` as they stood at ``as_of``.
+
+    ``inventories`` limits the records considered (all of them by default); records created after ``as_of`` are
+    left out. The calculation starts from whichever of the surrounding checkpoints or the live records is closest
+    to ``as_of``, so it only reads the ledger for that stretch of time.
+    """
+    if inventories is None:
+        inventories = SparePartInventory.objects.all()
+    inventories = inventories.filter(created__lte=as_of)
+
+    now = timezone.now()
+    if as_of >= now:
+        return {pk: (on_hand, reserved) for pk, on_hand, reserved in _live_levels(inventories)}
+
+    checkpoints = SparePartStockCheckpoint.objects.all()
+    before = checkpoints.filter(timestamp__lte=as_of).order_by("-timestamp").first()
+    after = checkpoints.filter(timestamp__gt=as_of, timestamp__lte=now).order_by("timestamp").first()
+    after_timestamp = after.timestamp if after is not None else now
+
+    if before is not None and as_of - before.timestamp <= after_timestamp - as_of:
+        start, end, sign = before.timestamp, as_of, 1
+        base = _checkpoint_levels(before, inventories)
+    else:
+        start, end, sign = as_of, after_timestamp, -1
+        base = _checkpoint_levels(after, inventories) if after is not None else _live_levels(inventories)
+
+    levels = {pk: (0, 0) for pk in inventories.values_list("pk", flat=True)}
+    for pk, on_hand, reserved in base:
+        if pk in levels:
+            levels[pk] = (on_hand, reserved)
+    for pk, (on_hand_change, reserved_change) in get_ledger_deltas(inventories, start, end).items():
+        if pk in levels:
+            on_hand, reserved = levels[pk]
+            levels[pk] = (on_hand + sign * on_hand_change, reserved + sign * reserved_change)
+    return levels
+
+
+def get_stock_report(as_of, inventories=None):
+    """Return the stock held at ``as_of`` as a list of dictionaries, one per inventory record.
+
+    Each dictionary holds the ``inventory`` (with its part type, manufacturer and location loaded) and its
+    ``quantity_on_hand``, ``quantity_reserved`` and ``quantity_available`` at that time.
+    """
+    levels = get_stock_as_of(as_of, inventories)
+    records = SparePartInventory.objects.select_related(
+        "spare_part_type",
+        "spare_part_type__manufacturer",
+        "location",
+    ).in_bulk(list(levels))
+    report = []
+    for pk, (on_hand, reserved) in levels.items():
+        report.append(
+            {
+                "inventory": records[pk],
+                "quantity_on_hand": on_hand,
+                "quantity_reserved": reserved,
+                "quantity_available": on_hand - reserved,
+            }
+        )
+    report.sort(key=lambda row: (row["inventory"].location.name, str(row["inventory"].spare_part_type)))
+    return report
+
+
+def _live_levels(inventories):
+    """Return ``(pk, on_hand, reserved)`` tuples from the inventory records themselves."""
+    return inventories.values_list("pk", "quantity_on_hand", "quantity_reserved")
+
+
+def _checkpoint_levels(checkpoint, inventories):
+    """Return ``(pk, on_hand, reserved)`` tuples recorded at ``checkpoint``."""
+    return checkpoint.entries.filter(spare_part_inventory__in=inventories).values_list(
+        "spare_part_inventory",
+        "quantity_on_hand",
+        "quantity_reserved",
+    )
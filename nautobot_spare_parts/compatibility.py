@@ -0,0 +1,110 @@
+"""Finding the spare parts in stock that fit given devices.
+
+Answers come from the compatibility index (SparePartCompatibility), which lists the in-stock inventory records of
+every device type's compatible part types along with their locations. Finding the spares for any number of
+devices is one index lookup by device type, for the distinct device types among them, and one query loading the
+inventory records found. No join runs across devices, device types, the compatibility table and the inventory.
+"""
+
+import uuid
+
+from django.db.models import Q
+
+from nautobot_spare_parts import query_plans
+from nautobot_spare_parts.models import SparePartCompatibility, SparePartInventory
+
+# Records at other locations listed per device unless the caller asks for more or fewer.
+DEFAULT_ELSEWHERE_LIMIT = 10
+
+# Devices looked up in one request at most (by the API and the bulk form).
+MAX_DEVICES = 10000
+
+
+class CompatibleStock:
+    """The in-stock inventory records that fit one device.
+
+    ``local`` holds those at the device's own location and ``elsewhere`` those at other locations (up to the
+    requested limit), each with the most available stock first.
+    """
+
+    def __init__(self, device, local, elsewhere):
+        """Record the result."""
+        self.device = device
+        self.local = local
+        self.elsewhere = elsewhere
+
+
+def find_compatible_stock(devices, inventories=None, elsewhere_limit=DEFAULT_ELSEWHERE_LIMIT):
+    """Return a CompatibleStock for each of ``devices``, in order.
+
+    Only records in ``inventories`` (all records by default; pass a restricted queryset to honour permissions)
+    are returned. ``elsewhere_limit`` caps the records at other locations per device (None for no cap).
+    """
+    devices = list(devices)
+    if inventories is None:
+        inventories = SparePartInventory.objects.all()
+    entries = SparePartCompatibility.objects.filter(device_type__in={device.device_type_id for device in devices})
+
+    stock = {}
+    for device_type_id, location_id, inventory_id in entries.order_by().values_list(
+        "device_type", "location", "spare_part_inventory"
+    ):
+        stock.setdefault(device_type_id, []).append((location_id, inventory_id))
+    records = {
+        inventory.pk: inventory
+        for inventory in query_plans.apply_plan(
+            inventories.filter(pk__in=entries.values("spare_part_inventory")).order_by(),
+            query_plans.BRIEF_INVENTORY,
+        )
+    }
+
+    results = []
+    for device in devices:
+        local, elsewhere = [], []
+        for location_id, inventory_id in stock.get(device.device_type_id, ()):
+            if inventory_id in records:
+                (local if location_id == device.location_id else elsewhere).append(records[inventory_id])
+        local.sort(key=_most_available)
+        elsewhere.sort(key=_most_available)
+        if elsewhere_limit is not None:
+            elsewhere = elsewhere[:elsewhere_limit]
+        results.append(CompatibleStock(device, local, elsewhere))
+    return results
+
+
+def resolve_devices(queryset, references):
+    """Look up devices in ``queryset`` by name or ID; return ``(devices, unresolved references)``.
+
+    Devices come back in the order of the references. A name shared by several devices (at different locations
+    or tenants) gives all of them.
+    """
+    ids = {_as_uuid(reference) for reference in references} - {None}
+    by_id = {}
+    by_name = {}
+    for device in queryset.filter(Q(pk__in=ids) | Q(name__in=references)).select_related("location"):
+        by_id[device.pk] = device
+        by_name.setdefault(device.name, []).append(device)
+
+    devices = {}
+    unresolved = []
+    for reference in references:
+        pk = _as_uuid(reference)
+        matches = [by_id[pk]] if pk in by_id else by_name.get(reference, [])
+        if not matches:
+            unresolved.append(reference)
+        for device in matches:
+            devices.setdefault(device.pk, device)
+    return list(devices.values()), unresolved
+
+
+def _as_uuid(reference):
+    """Return ``reference`` as a UUID, or None if it isn't one."""
+    try:
+        return uuid.UUID(reference)
+    except ValueError:
+        return None
+
+
+def _most_available(inventory):
+    """Sort key putting the records with the most available stock first."""
+    return (-inventory.quantity_available, str(inventory))
@@ -0,0 +1,98 @@
+"""Streaming export of the SparePartTransaction ledger.
+
+The ledger is read as plain value tuples with ``QuerySet.iterator()``, which uses a server-side cursor on
+PostgreSQL, so rows are fetched ``chunk_size`` at a time and no model instances are built. The rendered lines are
+yielded one by one, so memory use stays flat however large the export is.
+"""
+
+import csv
+from datetime import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from nautobot_spare_parts.filters import SparePartTransactionFilterSet
+from nautobot_spare_parts.utils import apply_filterset
+
+# (column name, queryset lookup) for each exported field, in output order.
+LEDGER_EXPORT_COLUMNS = (
+    ("id", "pk"),
+    ("timestamp", "timestamp"),
+    ("spare_part_type", "spare_part_inventory__spare_part_type__name"),
+    ("part_number", "spare_part_inventory__spare_part_type__part_number"),
+    ("location", "spare_part_inventory__location__name"),
+    ("inventory", "spare_part_inventory_id"),
+    ("transaction_type", "transaction_type"),
+    ("quantity", "quantity"),
+    ("quantity_before", "quantity_before"),
+    ("quantity_after", "quantity_after"),
+    ("user", "user__username"),
+    ("related_device", "related_device__name"),
+    ("transfer_source", "transfer_source_id"),
+    ("reason", "reason"),
+    ("notes", "notes"),
+)
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+DEFAULT_CHUNK_SIZE = 2000
+
+
+def filter_ledger(queryset, params):
+    """Apply the SparePartTransactionFilterSet filters in the QueryDict ``params``, ignoring other parameters."""
+    return apply_filterset(SparePartTransactionFilterSet, queryset, params)
+
+
+def iter_ledger_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield one tuple of LEDGER_EXPORT_COLUMNS values per transaction, oldest first."""
+    lookups = [lookup for _, lookup in LEDGER_EXPORT_COLUMNS]
+    return queryset.order_by("timestamp", "pk").values_list(*lookups).iterator(chunk_size=chunk_size)
+
+
+class _LineBuffer:
+    """File-like object whose write() hands back the written line instead of storing it."""
+
+    def write(self, value):
+        """Return ``value`` unchanged."""
+        return value
+
+
+def _csv_value(value):
+    """Format datetimes as ISO 8601 in CSV output, like the NDJSON output does."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def render_ledger(rows, export_format):
+    """Yield ``rows`` as lines of CSV (with a header line) or NDJSON."""
+    names = [name for name, _ in LEDGER_EXPORT_COLUMNS]
+    if export_format == "csv":
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(names)
+        for row in rows:
+            yield writer.writerow([_csv_value(value) for value in row])
+    elif export_format == "ndjson":
+        for row in rows:
+            yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+    else:
+        raise ValidationError(f"Unsupported export format {export_format!r}; use one of {', '.join(EXPORT_FORMATS)}")
+
+
+def streaming_ledger_response(queryset, export_format, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return a StreamingHttpResponse that downloads the ledger rows in ``queryset``."""
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError(f"Unsupported export format {export_format!r}; use one of {', '.join(EXPORT_FORMATS)}")
+    response = StreamingHttpResponse(
+        render_ledger(iter_ledger_rows(queryset, chunk_size=chunk_size), export_format),
+        content_type=EXPORT_FORMATS[export_format],
+    )
+    filename = f"spare_part_transactions_{timezone.now():%Y%m%d%H%M%S}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
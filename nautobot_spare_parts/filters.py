@@ -1,11 +1,22 @@
 """Filters for Spare Parts Inventory plugin."""
 
+from django.db.models import F, Q
 import django_filters
 
 from nautobot.apps.filters import NautobotFilterSet
 from nautobot.dcim.models import DeviceType, Location, Manufacturer
 
-from nautobot_spare_parts.models import SparePartInventory, SparePartTransaction, SparePartType
+from nautobot_spare_parts.hierarchy import subtree_location_ids
+from nautobot_spare_parts.models import (
+    SparePartDailyUsage,
+    SparePartForecast,
+    SparePartInventory,
+    SparePartReservation,
+    SparePartTransaction,
+    SparePartTransactionArchive,
+    SparePartType,
+)
+from nautobot_spare_parts.search import search_queryset
 
 
 class SparePartTypeFilterSet(NautobotFilterSet):
@@ -27,6 +38,30 @@ class SparePartTypeFilterSet(NautobotFilterSet):
         queryset=DeviceType.objects.all(),
         label="Compatible Device Type",
     )
+    total_quantity = django_filters.NumberFilter(
+        field_name="total_quantity",
+        method="filter_stock_level",
+        label="Total quantity",
+    )
+    total_quantity__gte = django_filters.NumberFilter(
+        field_name="total_quantity__gte",
+        method="filter_stock_level",
+        label="Total quantity (at least)",
+    )
+    total_quantity__lte = django_filters.NumberFilter(
+        field_name="total_quantity__lte",
+        method="filter_stock_level",
+        label="Total quantity (at most)",
+    )
+    total_available__lte = django_filters.NumberFilter(
+        field_name="total_available__lte",
+        method="filter_stock_level",
+        label="Total available (at most)",
+    )
+    in_stock = django_filters.BooleanFilter(
+        method="filter_in_stock",
+        label="In Stock",
+    )
 
     class Meta:
         """Meta class for SparePartTypeFilterSet."""
@@ -36,14 +71,21 @@ class SparePartTypeFilterSet(NautobotFilterSet):
 
     def search(self, queryset, name, value):
         """Perform search across multiple fields."""
-        if not value.strip():
+        return search_queryset(queryset, value)
+
+    def filter_stock_level(self, queryset, name, value):
+        """Filter on the stock total annotations, adding them if the queryset doesn't have them yet."""
+        if value is None:
             return queryset
-        return queryset.filter(
-            django_filters.Q(name__icontains=value)
-            | django_filters.Q(part_number__icontains=value)
-            | django_filters.Q(description__icontains=value)
-            | django_filters.Q(manufacturer__name__icontains=value)
-        )
+        if "total_quantity" not in queryset.query.annotations:
+            queryset = queryset.with_stock_totals()
+        return queryset.filter(**{name: value})
+
+    def filter_in_stock(self, queryset, name, value):
+        """Filter for part types held at one or more locations."""
+        if value:
+            return self.filter_stock_level(queryset, "total_quantity__gt", 0)
+        return queryset
 
 
 class SparePartInventoryFilterSet(NautobotFilterSet):
@@ -61,6 +103,11 @@ class SparePartInventoryFilterSet(NautobotFilterSet):
         queryset=Location.objects.all(),
         label="Location",
     )
+    location_tree = django_filters.ModelMultipleChoiceFilter(
+        queryset=Location.objects.all(),
+        method="filter_location_tree",
+        label="Location (including child locations)",
+    )
     category = django_filters.MultipleChoiceFilter(
         field_name="spare_part_type__category",
         choices=SparePartType.CATEGORY_CHOICES,
@@ -86,29 +133,26 @@ class SparePartInventoryFilterSet(NautobotFilterSet):
             "location",
             "quantity_on_hand",
             "quantity_reserved",
+            "quantity_available",
             "minimum_quantity",
+            "is_low_stock",
+            "needs_reorder",
         ]
 
     def search(self, queryset, name, value):
         """Perform search across multiple fields."""
-        if not value.strip():
-            return queryset
-        return queryset.filter(
-            django_filters.Q(spare_part_type__name__icontains=value)
-            | django_filters.Q(spare_part_type__part_number__icontains=value)
-            | django_filters.Q(location__name__icontains=value)
-            | django_filters.Q(storage_location_detail__icontains=value)
-        )
+        return search_queryset(queryset, value)
 
     def filter_low_stock(self, queryset, name, value):
         """Filter for low stock items."""
         if value:
-            # Use raw SQL or annotations to filter where quantity_available <= minimum_quantity
-            from django.db.models import F
+            return queryset.filter(is_low_stock=True)
+        return queryset
 
-            return queryset.filter(
-                quantity_on_hand__lte=F("minimum_quantity") + F("quantity_reserved")
-            )
+    def filter_location_tree(self, queryset, name, value):
+        """Filter for records stored at the given locations or anywhere below them."""
+        if value:
+            return queryset.filter(location__in=subtree_location_ids(location.pk for location in value))
         return queryset
 
 
@@ -156,11 +200,146 @@ class SparePartTransactionFilterSet(NautobotFilterSet):
 
     def search(self, queryset, name, value):
         """Perform search across multiple fields."""
+        return search_queryset(queryset, value)
+
+
+class SparePartReservationFilterSet(NautobotFilterSet):
+    """Filter set for SparePartReservation."""
+
+    q = django_filters.CharFilter(
+        method="search",
+        label="Search",
+    )
+    spare_part_inventory = django_filters.ModelMultipleChoiceFilter(
+        queryset=SparePartInventory.objects.all(),
+        label="Inventory",
+    )
+    spare_part_type = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__spare_part_type",
+        queryset=SparePartType.objects.all(),
+        label="Spare Part Type",
+    )
+    location = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__location",
+        queryset=Location.objects.all(),
+        label="Location",
+    )
+    status = django_filters.MultipleChoiceFilter(
+        choices=SparePartReservation.STATUS_CHOICES,
+        label="Status",
+    )
+    expires = django_filters.DateTimeFromToRangeFilter(
+        label="Expires",
+    )
+
+    class Meta:
+        """Meta class for SparePartReservationFilterSet."""
+
+        model = SparePartReservation
+        fields = ["id", "spare_part_inventory", "holder", "status", "user", "expires"]
+
+    def search(self, queryset, name, value):
+        """Search the holder and notes."""
         if not value.strip():
             return queryset
-        return queryset.filter(
-            django_filters.Q(spare_part_inventory__spare_part_type__name__icontains=value)
-            | django_filters.Q(spare_part_inventory__location__name__icontains=value)
-            | django_filters.Q(reason__icontains=value)
-            | django_filters.Q(notes__icontains=value)
-        )
+        return queryset.filter(Q(holder__icontains=value) | Q(notes__icontains=value))
+
+
+class SparePartTransactionArchiveFilterSet(SparePartTransactionFilterSet):
+    """Filter set for SparePartTransactionArchive."""
+
+    class Meta(SparePartTransactionFilterSet.Meta):
+        """Meta class for SparePartTransactionArchiveFilterSet."""
+
+        model = SparePartTransactionArchive
+
+
+class SparePartDailyUsageFilterSet(NautobotFilterSet):
+    """Filter set for SparePartDailyUsage."""
+
+    date = django_filters.DateFromToRangeFilter(
+        label="Date",
+    )
+    spare_part_type = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__spare_part_type",
+        queryset=SparePartType.objects.all(),
+        label="Spare Part Type",
+    )
+    location = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__location",
+        queryset=Location.objects.all(),
+        label="Location",
+    )
+    category = django_filters.MultipleChoiceFilter(
+        field_name="spare_part_inventory__spare_part_type__category",
+        choices=SparePartType.CATEGORY_CHOICES,
+        label="Category",
+    )
+    manufacturer = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__spare_part_type__manufacturer",
+        queryset=Manufacturer.objects.all(),
+        label="Manufacturer",
+    )
+    transaction_type = django_filters.MultipleChoiceFilter(
+        choices=SparePartTransaction.TRANSACTION_TYPE_CHOICES,
+        label="Transaction Type",
+    )
+
+    class Meta:
+        """Meta class for SparePartDailyUsageFilterSet."""
+
+        model = SparePartDailyUsage
+        fields = [
+            "id",
+            "spare_part_inventory",
+            "transaction_type",
+            "date",
+        ]
+
+
+class SparePartForecastFilterSet(NautobotFilterSet):
+    """Filter set for SparePartForecast."""
+
+    spare_part_type = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__spare_part_type",
+        queryset=SparePartType.objects.all(),
+        label="Spare Part Type",
+    )
+    location = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__location",
+        queryset=Location.objects.all(),
+        label="Location",
+    )
+    category = django_filters.MultipleChoiceFilter(
+        field_name="spare_part_inventory__spare_part_type__category",
+        choices=SparePartType.CATEGORY_CHOICES,
+        label="Category",
+    )
+    manufacturer = django_filters.ModelMultipleChoiceFilter(
+        field_name="spare_part_inventory__spare_part_type__manufacturer",
+        queryset=Manufacturer.objects.all(),
+        label="Manufacturer",
+    )
+    projected_stockout = django_filters.DateFromToRangeFilter(
+        label="Projected Stock-Out",
+    )
+    below_recommended_minimum = django_filters.BooleanFilter(
+        method="filter_below_recommended_minimum",
+        label="Below Recommended Minimum",
+    )
+
+    class Meta:
+        """Meta class for SparePartForecastFilterSet."""
+
+        model = SparePartForecast
+        fields = [
+            "id",
+            "spare_part_inventory",
+            "projected_stockout",
+        ]
+
+    def filter_below_recommended_minimum(self, queryset, name, value):
+        """Filter for records whose available stock is at or below the recommended minimum."""
+        if value:
+            return queryset.filter(spare_part_inventory__quantity_available__lte=F("recommended_minimum_quantity"))
+        return queryset.filter(spare_part_inventory__quantity_available__gt=F("recommended_minimum_quantity"))
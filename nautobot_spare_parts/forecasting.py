@@ -0,0 +1,183 @@
+"""Demand forecasting and reorder recommendations.
+
+The check-out history of every inventory record is read from the daily usage rollup in one query and laid out as
+a NumPy matrix of units checked out per record (row) and period (column). The average rate of use, its
+variability and the safety stock needed to ride out the replenishment lead time are then worked out for all rows
+at once:
+
+- ``daily_usage`` is the mean units per period divided by the period length
+- ``daily_usage_deviation`` is the standard deviation per period scaled to one day (``/ sqrt(period_days)``)
+- ``safety_stock`` is ``service_factor * daily_usage_deviation * sqrt(lead_time_days)``
+- ``recommended_minimum_quantity`` (the reorder point) is the lead time demand plus the safety stock
+- ``recommended_reorder_quantity`` is the demand over ``cover_days``
+- ``projected_stockout`` is the day the available stock runs out at ``daily_usage``
+
+Locations are independent of each other, so the rows are split into chunks of whole locations. With
+``forecast_workers`` above 1 the chunks are worked out in a process pool, except in daemonic processes (such as
+Celery prefork workers), which may not start child processes; there they are worked out one after the other.
+
+NumPy is an optional dependency; install ``nautobot-spare-parts[forecasting]`` to use this module.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+import math
+import multiprocessing
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from nautobot_spare_parts.models import SparePartDailyUsage, SparePartForecast, SparePartInventory
+from nautobot_spare_parts.utils import get_plugin_setting
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Stock-out dates further out than this are left empty rather than projected.
+MAX_PROJECTION_DAYS = 3650
+
+# Locations are grouped into chunks of at least this many inventory records before going to the process pool, so
+# small sites don't each pay for a round trip to a worker.
+MIN_CHUNK_SIZE = 10000
+
+FORECAST_SETTINGS = (
+    "history_days",
+    "period_days",
+    "lead_time_days",
+    "cover_days",
+    "service_factor",
+    "workers",
+)
+
+
+def forecast_chunk(usage, available, period_days, lead_time_days, cover_days, service_factor):
+    """Work out the forecast for a block of inventory records.
+
+    ``usage`` is the (records x periods) matrix of units checked out and ``available`` the records' available
+    stock. Returns a tuple of arrays: daily usage, its deviation, safety stock, recommended minimum quantity,
+    recommended reorder quantity and days until stock-out (``inf`` when nothing is being used).
+    """
+    daily_usage = usage.mean(axis=1) / period_days
+    daily_usage_deviation = usage.std(axis=1) / math.sqrt(period_days)
+    safety_stock = numpy.ceil(service_factor * daily_usage_deviation * math.sqrt(lead_time_days))
+    minimum = numpy.ceil(daily_usage * lead_time_days) + safety_stock
+    reorder = numpy.ceil(daily_usage * cover_days)
+    days_left = numpy.full(len(available), numpy.inf)
+    in_use = daily_usage > 0
+    days_left[in_use] = numpy.maximum(available[in_use], 0) / daily_usage[in_use]
+    return daily_usage, daily_usage_deviation, safety_stock, minimum, reorder, days_left
+
+
+def get_forecast_settings(**overrides):
+    """Return the forecast settings from PLUGINS_CONFIG, with any non-None ``overrides`` applied."""
+    options = {name: get_plugin_setting(f"forecast_{name}") for name in FORECAST_SETTINGS}
+    options.update((name, value) for name, value in overrides.items() if value is not None)
+    if options["workers"] is None:
+        options["workers"] = 1
+    return options
+
+
+def forecast_demand(batch_size=5000, **overrides):
+    """Forecast demand for every inventory record and replace the stored SparePartForecast rows.
+
+    ``overrides`` (``history_days``, ``period_days``, ``lead_time_days``, ``cover_days``, ``service_factor``,
+    ``workers``) take the place of the ``forecast_*`` plugin settings. Returns the number of forecasts written.
+    Raises ImproperlyConfigured if NumPy isn't installed.
+    """
+    if numpy is None:
+        raise ImproperlyConfigured(
+            "Demand forecasting needs NumPy; install it with: pip install nautobot-spare-parts[forecasting]"
+        )
+    options = get_forecast_settings(**overrides)
+    period_days = max(options["period_days"], 1)
+    periods = max(math.ceil(options["history_days"] / period_days), 1)
+    today = timezone.localdate()
+    start = today - timedelta(days=periods * period_days)
+
+    inventories = list(
+        SparePartInventory.objects.order_by("location", "pk").values_list("pk", "location_id", "quantity_available")
+    )
+    if not inventories:
+        with transaction.atomic():
+            SparePartForecast.objects.all().delete()
+        return 0
+    pks, location_ids, available = zip(*inventories)
+    rows = {pk: row for row, pk in enumerate(pks)}
+
+    # Today is left out, as its usage is still incomplete.
+    history = SparePartDailyUsage.objects.filter(
+        transaction_type="check_out",
+        date__gte=start,
+        date__lt=today,
+    ).values_list("spare_part_inventory", "date", "units_out")
+    cells = [
+        (rows[pk], (date - start).days // period_days, units)
+        for pk, date, units in history.iterator(chunk_size=batch_size)
+        if pk in rows  # Records created since the inventory list was read
+    ]
+    usage = numpy.zeros((len(pks), periods))
+    if cells:
+        row_index, period_index, units = numpy.array(cells, dtype=numpy.int64).T
+        numpy.add.at(usage, (row_index, period_index), units)
+
+    results = _forecast_chunks(
+        usage,
+        numpy.array(available, dtype=numpy.float64),
+        _location_chunks(location_ids),
+        period_days=period_days,
+        lead_time_days=options["lead_time_days"],
+        cover_days=options["cover_days"],
+        service_factor=options["service_factor"],
+        workers=options["workers"],
+    )
+
+    computed = timezone.now()
+    forecasts = []
+    for row, (daily_usage, deviation, safety_stock, minimum, reorder, days_left) in enumerate(zip(*results)):
+        forecasts.append(
+            SparePartForecast(
+                spare_part_inventory_id=pks[row],
+                computed=computed,
+                daily_usage=float(daily_usage),
+                daily_usage_deviation=float(deviation),
+                safety_stock=int(safety_stock),
+                recommended_minimum_quantity=int(minimum),
+                recommended_reorder_quantity=int(reorder),
+                projected_stockout=(
+                    today + timedelta(days=int(days_left)) if days_left <= MAX_PROJECTION_DAYS else None
+                ),
+            )
+        )
+    with transaction.atomic():
+        SparePartForecast.objects.all().delete()
+        SparePartForecast.objects.bulk_create(forecasts, batch_size=batch_size)
+    return len(forecasts)
+
+
+def _location_chunks(location_ids):
+    """Split row positions (sorted by location) into ``(start, stop)`` ranges of whole locations."""
+    chunks = []
+    start = 0
+    for row in range(1, len(location_ids) + 1):
+        if row == len(location_ids) or (location_ids[row] != location_ids[row - 1] and row - start >= MIN_CHUNK_SIZE):
+            chunks.append((start, row))
+            start = row
+    return chunks
+
+
+def _forecast_chunks(usage, available, chunks, workers, **parameters):
+    """Run forecast_chunk() over each ``(start, stop)`` row range and return the joined result arrays."""
+    # Daemonic processes (Celery prefork workers among them) aren't allowed to start a pool.
+    if workers > 1 and len(chunks) > 1 and not multiprocessing.current_process().daemon:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            futures = [
+                executor.submit(forecast_chunk, usage[start:stop], available[start:stop], **parameters)
+                for start, stop in chunks
+            ]
+            parts = [future.result() for future in futures]
+    else:
+        parts = [forecast_chunk(usage[start:stop], available[start:stop], **parameters) for start, stop in chunks]
+    return [numpy.concatenate(arrays) for arrays in zip(*parts)]
@@ -3,6 +3,7 @@
 from django import forms
 
 from nautobot.apps.forms import (
+    DateTimePicker,
     NautobotBulkEditForm,
     NautobotFilterForm,
     NautobotModelForm,
@@ -11,6 +12,7 @@ from nautobot.apps.forms import (
 from nautobot.dcim.models import Device, DeviceType, Location, Manufacturer
 from nautobot.extras.forms import NautobotBulkEditForm as ExtrasNautobotBulkEditForm
 
+from nautobot_spare_parts.compatibility import DEFAULT_ELSEWHERE_LIMIT, MAX_DEVICES
 from nautobot_spare_parts.models import SparePartInventory, SparePartType
 
 
@@ -59,6 +61,16 @@ class SparePartTypeFilterForm(NautobotFilterForm):
         choices=SparePartType.CATEGORY_CHOICES,
         required=False,
     )
+    in_stock = forms.BooleanField(
+        required=False,
+        label="In Stock Only",
+        help_text="Show only part types held at one or more locations",
+    )
+    total_quantity__lte = forms.IntegerField(
+        required=False,
+        min_value=0,
+        label="Total quantity at most",
+    )
 
 
 class SparePartTypeBulkEditForm(TagsBulkEditFormMixin, NautobotBulkEditForm):
@@ -99,6 +111,29 @@ class SparePartInventoryForm(NautobotModelForm):
         queryset=Location.objects.all(),
         help_text="Storage location",
     )
+    # The version of the record the form was rendered from, so a concurrent change is not silently overwritten.
+    expected_version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        """Record the version of the record being edited."""
+        super().__init__(*args, **kwargs)
+        if self.instance.present_in_database:
+            self.fields["expected_version"].initial = self.instance.version
+
+    def clean(self):
+        """Refuse the edit if the record has been changed since the form was rendered."""
+        cleaned_data = super().clean()
+        expected_version = cleaned_data.get("expected_version")
+        if expected_version is not None and self.instance.present_in_database:
+            current = SparePartInventory.objects.filter(pk=self.instance.pk).values_list("version", flat=True).first()
+            if current != expected_version:
+                raise forms.ValidationError(
+                    "This inventory record has been changed by someone else since you opened it. "
+                    "Reload the page to see the changes, then make your edit again."
+                )
+            # Re-checked under the row lock when saving, in case of a change between now and then.
+            self.instance.expected_versions = {expected_version}
+        return cleaned_data
 
     class Meta:
         """Meta class for SparePartInventoryForm."""
@@ -131,6 +166,12 @@ class SparePartInventoryFilterForm(NautobotFilterForm):
         queryset=Location.objects.all(),
         required=False,
     )
+    location_tree = forms.ModelMultipleChoiceField(
+        queryset=Location.objects.all(),
+        required=False,
+        label="Location (with children)",
+        help_text="Include records stored anywhere below these locations",
+    )
     category = forms.MultipleChoiceField(
         choices=SparePartType.CATEGORY_CHOICES,
         required=False,
@@ -142,6 +183,40 @@ class SparePartInventoryFilterForm(NautobotFilterForm):
     )
 
 
+class LowStockFilterForm(forms.Form):
+    """Filter form for the low stock dashboard."""
+
+    location = forms.ModelMultipleChoiceField(
+        queryset=Location.objects.all(),
+        required=False,
+    )
+    location_tree = forms.ModelMultipleChoiceField(
+        queryset=Location.objects.all(),
+        required=False,
+        label="Location (with children)",
+        help_text="Include records stored anywhere below these locations",
+    )
+    category = forms.MultipleChoiceField(
+        choices=SparePartType.CATEGORY_CHOICES,
+        required=False,
+    )
+    manufacturer = forms.ModelMultipleChoiceField(
+        queryset=Manufacturer.objects.all(),
+        required=False,
+    )
+
+
+class StockAsOfForm(LowStockFilterForm):
+    """Form for the historical stock report."""
+
+    as_of = forms.DateTimeField(
+        widget=DateTimePicker(),
+        help_text="Show stock levels as they stood at this date and time",
+    )
+
+    field_order = ["as_of", "location", "category", "manufacturer"]
+
+
 class SparePartInventoryBulkEditForm(TagsBulkEditFormMixin, NautobotBulkEditForm):
     """Bulk edit form for SparePartInventory."""
 
@@ -200,6 +275,28 @@ class CheckOutForm(forms.Form):
     )
 
 
+class TransferForm(forms.Form):
+    """Form for transferring spare parts to another location."""
+
+    destination_location = forms.ModelChoiceField(
+        queryset=Location.objects.all(),
+        help_text="Location receiving the parts",
+    )
+    quantity = forms.IntegerField(
+        min_value=1,
+        help_text="Number of units to transfer",
+    )
+    reason = forms.CharField(
+        widget=forms.Textarea(attrs={"rows": 3}),
+        help_text="Reason for transfer (e.g., 'Rebalancing stock for LON1 refresh')",
+    )
+    notes = forms.CharField(
+        widget=forms.Textarea(attrs={"rows": 3}),
+        required=False,
+        help_text="Additional notes (optional)",
+    )
+
+
 class AdjustmentForm(forms.Form):
     """Form for inventory adjustments (corrections)."""
 
@@ -215,3 +312,68 @@ class AdjustmentForm(forms.Form):
         required=False,
         help_text="Additional notes (optional)",
     )
+
+
+class BulkImportForm(forms.Form):
+    """Form for bulk importing spare part types or inventory records from CSV."""
+
+    IMPORT_CHOICES = (
+        ("spare_part_types", "Spare Part Types"),
+        ("spare_part_inventory", "Inventory"),
+    )
+
+    import_type = forms.ChoiceField(
+        choices=IMPORT_CHOICES,
+        help_text="What the rows describe",
+    )
+    csv_file = forms.FileField(
+        required=False,
+        help_text="CSV file with a header row of field names",
+    )
+    csv_data = forms.CharField(
+        widget=forms.Textarea(attrs={"rows": 10, "class": "text-monospace"}),
+        required=False,
+        help_text="Or paste the CSV data here",
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        help_text="Only validate the rows and report what would change",
+    )
+    atomic = forms.BooleanField(
+        required=False,
+        initial=True,
+        label="All or nothing",
+        help_text="Import nothing if any row is invalid",
+    )
+
+    def clean(self):
+        """Require CSV data from either the file or the text box."""
+        cleaned_data = super().clean()
+        if not cleaned_data.get("csv_file") and not cleaned_data.get("csv_data"):
+            raise forms.ValidationError("Upload a CSV file or paste CSV data")
+        return cleaned_data
+
+
+class CompatibleStockForm(forms.Form):
+    """Form for finding the spare parts in stock that fit many devices."""
+
+    devices = forms.CharField(
+        widget=forms.Textarea(attrs={"rows": 10, "class": "text-monospace"}),
+        help_text=f"Device names or IDs, one per line (up to {MAX_DEVICES})",
+    )
+    elsewhere_limit = forms.IntegerField(
+        min_value=0,
+        initial=DEFAULT_ELSEWHERE_LIMIT,
+        label="Other locations",
+        help_text="Most inventory records at other locations to list per device",
+    )
+
+    def clean_devices(self):
+        """Split the device list into its (distinct, non-empty) lines."""
+        lines = list(dict.fromkeys(line.strip() for line in self.cleaned_data["devices"].splitlines()))
+        lines = [line for line in lines if line]
+        if not lines:
+            raise forms.ValidationError("Enter at least one device")
+        if len(lines) > MAX_DEVICES:
+            raise forms.ValidationError(f"Enter at most {MAX_DEVICES} devices")
+        return lines
@@ -0,0 +1,217 @@
+"""Nearest available stock by Location coordinates.
+
+Each part type gets a KD-tree over the locations holding available stock of it. A location's position is its own
+latitude and longitude, or those of its nearest ancestor that has them, as a room or cage usually has none. Points
+are placed on the unit sphere, so the straight-line (chord) distance used by the tree ranks them exactly as the
+great-circle distance does. A nearest-k query visits only the branches that can still hold a closer point. It
+answers in well under a millisecond for thousands of sites.
+
+Trees are built on first use and kept in process memory. Each tree is tagged with two cache versions (see
+utils.get_cache_version). A part type's version is bumped when one of its records runs out of stock or comes back,
+or when one is saved, imported or deleted. The shared "locations" version is bumped when a location is saved or
+deleted. A tree whose tags are out of date is rebuilt on its next use, so other workers' stale trees follow as
+well. Movements that leave stock on the shelf don't touch the trees; the quantities returned are read from the
+database.
+"""
+
+import heapq
+import math
+
+from django.db import transaction
+
+from nautobot.dcim.models import Location
+
+from nautobot_spare_parts import query_plans
+from nautobot_spare_parts.models import SparePartInventory
+from nautobot_spare_parts.utils import bump_cache_version, get_cache_version
+
+# Mean Earth radius, in kilometres.
+EARTH_RADIUS_KM = 6371.0088
+
+# Sites returned by a nearest-stock query unless the caller asks for more or fewer, and the most it may ask for.
+DEFAULT_NEAREST_COUNT = 5
+MAX_NEAREST_COUNT = 100
+
+# Trees built in this process, by part type: (part type version, locations version, tree).
+_trees = {}
+# Location coordinates, with ancestor fallback, as of a locations version: {location ID: unit vector}.
+_locations = {"version": None, "points": {}}
+
+
+def unit_vector(latitude, longitude):
+    """Return the point at ``latitude``, ``longitude`` (in degrees) on the unit sphere."""
+    latitude, longitude = math.radians(float(latitude)), math.radians(float(longitude))
+    return (
+        math.cos(latitude) * math.cos(longitude),
+        math.cos(latitude) * math.sin(longitude),
+        math.sin(latitude),
+    )
+
+
+def chord_to_km(chord):
+    """Return the great-circle distance in kilometres between points ``chord`` apart on the unit sphere."""
+    return 2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0))
+
+
+class KDTree:
+    """A 3-d tree over ``(point, item)`` pairs, answering nearest-k queries by Euclidean distance."""
+
+    def __init__(self, entries):
+        """Build the tree; ``entries`` is an iterable of ``(point, item)`` with ``point`` a 3-tuple."""
+        self.size = 0
+        self.root = self._build(list(entries), 0)
+
+    def __len__(self):
+        """Return the number of points in the tree."""
+        return self.size
+
+    def _build(self, entries, depth):
+        """Return the node for ``entries``: ``(point, item, axis, left, right)``, or None if empty."""
+        if not entries:
+            return None
+        axis = depth % 3
+        entries.sort(key=lambda entry: entry[0][axis])
+        middle = len(entries) // 2
+        self.size += 1
+        point, item = entries[middle]
+        return (
+            point,
+            item,
+            axis,
+            self._build(entries[:middle], depth + 1),
+            self._build(entries[middle + 1 :], depth + 1),
+        )
+
+    def nearest(self, point, count):
+        """Return up to ``count`` ``(distance, item)`` pairs nearest to ``point``, closest first."""
+        if count <= 0:
+            return []
+        # Max-heap (by negated squared distance) of the best candidates found so far.
+        best = []
+        tiebreak = 0
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            node_point, item, axis, left, right = node
+            distance = sum((a - b) ** 2 for a, b in zip(point, node_point))
+            if len(best) < count:
+                heapq.heappush(best, (-distance, tiebreak, item))
+                tiebreak += 1
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, tiebreak, item))
+                tiebreak += 1
+
+            offset = point[axis] - node_point[axis]
+            near, far = (left, right) if offset < 0 else (right, left)
+            # The far side can only hold a closer point if the splitting plane is within the current radius.
+            if len(best) < count or offset * offset < -best[0][0]:
+                stack.append(far)
+            stack.append(near)
+        return [(math.sqrt(-distance), item) for distance, _, item in sorted(best, reverse=True)]
+
+
+def location_points():
+    """Return ``{location ID: unit vector}`` for every location with coordinates of its own or of an ancestor."""
+    version = get_cache_version("locations")
+    if _locations["version"] == version:
+        return _locations["points"]
+
+    rows = {
+        pk: (parent_id, latitude, longitude)
+        for pk, parent_id, latitude, longitude in Location.objects.values_list("pk", "parent", "latitude", "longitude")
+    }
+    points = {}
+    for pk in rows:
+        chain = []
+        current = pk
+        while current is not None and current not in points and current not in chain:
+            parent_id, latitude, longitude = rows.get(current, (None, None, None))
+            if latitude is not None and longitude is not None:
+                points[current] = unit_vector(latitude, longitude)
+                break
+            chain.append(current)
+            current = parent_id
+        found = points.get(current)
+        if found is not None:
+            for location_id in chain:
+                points[location_id] = found
+    _locations.update(version=version, points=points)
+    return points
+
+
+def stock_tree(spare_part_type_id):
+    """Return the KD-tree of the locations holding available stock of a part type, building it if need be.
+
+    The tree's items are ``(inventory ID, location ID)`` pairs.
+    """
+    type_version = get_cache_version(f"stocked_locations:{spare_part_type_id}")
+    locations_version = get_cache_version("locations")
+    cached = _trees.get(spare_part_type_id)
+    if cached is not None and cached[:2] == (type_version, locations_version):
+        return cached[2]
+
+    points = location_points()
+    stocked = SparePartInventory.objects.filter(
+        spare_part_type=spare_part_type_id, quantity_available__gt=0
+    ).values_list("pk", "location")
+    tree = KDTree(
+        (points[location_id], (inventory_id, location_id))
+        for inventory_id, location_id in stocked
+        if location_id in points
+    )
+    _trees[spare_part_type_id] = (type_version, locations_version, tree)
+    return tree
+
+
+def nearest_stock(spare_part_type_id, latitude, longitude, count=DEFAULT_NEAREST_COUNT, inventories=None):
+    """Return up to ``count`` ``(inventory, distance in km)`` pairs holding available stock, nearest first.
+
+    Only records in ``inventories`` (all records by default; pass a restricted queryset to honour permissions)
+    are returned.
+    """
+    if inventories is None:
+        inventories = SparePartInventory.objects.all()
+    tree = stock_tree(spare_part_type_id)
+    origin = unit_vector(latitude, longitude)
+
+    wanted = count
+    while True:
+        candidates = tree.nearest(origin, wanted)
+        records = query_plans.apply_plan(
+            inventories.filter(pk__in=[inventory_id for _, (inventory_id, _) in candidates], quantity_available__gt=0),
+            query_plans.BRIEF_INVENTORY,
+        )
+        records = {inventory.pk: inventory for inventory in records.order_by()}
+        found = [
+            (records[inventory_id], chord_to_km(distance))
+            for distance, (inventory_id, _) in candidates
+            if inventory_id in records
+        ]
+        # Records skipped for permissions (or emptied since the tree was built) make room for further ones.
+        if len(found) >= count or wanted >= len(tree):
+            return found[:count]
+        wanted *= 2
+
+
+def location_point(location):
+    """Return ``(latitude, longitude)`` of ``location`` or of its nearest ancestor with coordinates, or None."""
+    while location is not None:
+        if location.latitude is not None and location.longitude is not None:
+            return location.latitude, location.longitude
+        location = location.parent
+    return None
+
+
+def invalidate_stock_trees(spare_part_type_ids):
+    """Have the trees of the given part types rebuilt once the current transaction commits."""
+    spare_part_type_ids = set(spare_part_type_ids)
+    transaction.on_commit(
+        lambda: [bump_cache_version(f"stocked_locations:{type_id}") for type_id in spare_part_type_ids]
+    )
+
+
+def invalidate_locations():
+    """Have the location coordinates, the trees and the location ancestry (see hierarchy) reloaded on commit."""
+    transaction.on_commit(lambda: bump_cache_version("locations"))
@@ -0,0 +1,99 @@
+"""Stock rolled up over the Location tree.
+
+Locations nest (region, site, building, room), but an inventory record only points at the location it is stored
+in. The ancestry of every location is loaded in one query and kept in process memory, tagged with the shared
+"locations" cache version (see geo.invalidate_locations) so every worker reloads it once a location is saved or
+deleted. Filtering on a region is then one ``location IN (...)`` lookup over its cached descendants. Rolling stock
+up to the regions is one query grouped by location, with the totals added to each location's ancestors in Python.
+No recursive query or walk up the tree runs per request.
+"""
+
+from django.db.models import Count, Q, Sum
+
+from nautobot.dcim.models import Location
+
+from nautobot_spare_parts.utils import get_cache_version
+
+TOTAL_FIELDS = ("record_count", "total_quantity", "total_reserved", "total_available", "low_stock_count")
+
+# Location ancestry as of a locations version: {location ID: (its ID, its parent's, ..., its root's)} and
+# {location ID: frozenset of its ID and its descendants'}.
+_ancestry = {"version": None, "ancestors": {}, "descendants": {}}
+
+
+def location_ancestry():
+    """Return ``(ancestors, descendants)`` of every location, loading them if the cached ones are out of date."""
+    version = get_cache_version("locations")
+    if _ancestry["version"] != version:
+        parents = dict(Location.objects.values_list("pk", "parent"))
+        ancestors = {}
+        descendants = {}
+        for pk in parents:
+            chain = []
+            current = pk
+            while current is not None and current not in chain:
+                chain.append(current)
+                current = parents.get(current)
+            ancestors[pk] = tuple(chain)
+            for ancestor_id in chain:
+                descendants.setdefault(ancestor_id, set()).add(pk)
+        _ancestry.update(
+            version=version,
+            ancestors=ancestors,
+            descendants={pk: frozenset(ids) for pk, ids in descendants.items()},
+        )
+    return _ancestry["ancestors"], _ancestry["descendants"]
+
+
+def subtree_location_ids(location_ids):
+    """Return the IDs of the given locations and of all the locations below them."""
+    _, descendants = location_ancestry()
+    subtree = set()
+    for pk in location_ids:
+        subtree |= descendants.get(pk, {pk})
+    return subtree
+
+
+def stock_by_location(inventories, locations=None):
+    """Return the stock totals of ``inventories`` rolled up to every location holding them and to its ancestors.
+
+    The result is a list of dicts, in tree order (each location followed by its children, by name), with the
+    ``location``, its ``depth`` in the list and the TOTAL_FIELDS counted over the location and those below it.
+    Only locations in ``locations`` (all by default; pass a restricted queryset to honour permissions) are listed.
+    """
+    rows = (
+        inventories.order_by()
+        .values("location")
+        .annotate(
+            record_count=Count("pk"),
+            total_quantity=Sum("quantity_on_hand"),
+            total_reserved=Sum("quantity_reserved"),
+            total_available=Sum("quantity_available"),
+            low_stock_count=Count("pk", filter=Q(is_low_stock=True)),
+        )
+    )
+    ancestors, _ = location_ancestry()
+    totals = {}
+    for row in rows:
+        location_id = row.pop("location")
+        for ancestor_id in ancestors.get(location_id, (location_id,)):
+            entry = totals.setdefault(ancestor_id, dict.fromkeys(TOTAL_FIELDS, 0))
+            for field in TOTAL_FIELDS:
+                entry[field] += row[field]
+
+    if locations is None:
+        locations = Location.objects.all()
+    locations = locations.in_bulk(totals)
+    children = {}
+    for pk, location in locations.items():
+        # The nearest listed ancestor; a location whose parents are all hidden is listed at the top level.
+        parent_id = next((ancestor_id for ancestor_id in ancestors.get(pk, ())[1:] if ancestor_id in locations), None)
+        children.setdefault(parent_id, []).append(location)
+
+    result = []
+    stack = [(location, 0) for location in sorted(children.get(None, []), key=str, reverse=True)]
+    while stack:
+        location, depth = stack.pop()
+        result.append({"location": location, "depth": depth, **totals[location.pk]})
+        stack.extend((child, depth + 1) for child in sorted(children.get(location.pk, []), key=str, reverse=True))
+    return result
@@ -0,0 +1,455 @@
+"""Bulk CSV import of spare part types and inventory records.
+
+Rows are processed in batches. For each batch the referenced manufacturers, device types, locations and part
+types are looked up with one query per model, the existing records are matched on their unique keys
+(manufacturer + part number for part types, part type + location for inventory) and then created with
+``bulk_create`` or updated with ``bulk_update``. Inventory quantities are recorded on the ledger as "Adjustment"
+transactions (an opening balance for new records), written with one bulk insert per batch.
+
+Bulk writes skip ``save()`` and model signals, so no change log entries are written for imported rows. The stock
+state fields, search documents, part type rollups and the compatibility index are maintained here instead, and
+``stock_changed`` is sent on commit.
+
+Empty cells are treated as "not given": new records get the field default and existing records keep their value.
+"""
+
+import csv
+import io
+import uuid
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from nautobot.dcim.models import DeviceType, Location, Manufacturer
+
+from nautobot_spare_parts.geo import invalidate_stock_trees
+from nautobot_spare_parts.models import (
+    SparePartCompatibility,
+    SparePartDailyUsage,
+    SparePartInventory,
+    SparePartStockRollup,
+    SparePartTransaction,
+    SparePartType,
+)
+from nautobot_spare_parts.signals import stock_changed
+
+SPARE_PART_TYPE_IMPORT_FIELDS = (
+    "name",
+    "slug",
+    "manufacturer",
+    "part_number",
+    "description",
+    "category",
+    "unit_cost",
+    "compatible_device_types",
+)
+SPARE_PART_INVENTORY_IMPORT_FIELDS = (
+    "spare_part_type",
+    "manufacturer",
+    "part_number",
+    "location",
+    "quantity_on_hand",
+    "quantity_reserved",
+    "minimum_quantity",
+    "reorder_quantity",
+    "storage_location_detail",
+    "notes",
+)
+
+# Inventory fields set straight from their CSV column.
+INVENTORY_VALUE_FIELDS = (
+    "quantity_on_hand",
+    "quantity_reserved",
+    "minimum_quantity",
+    "reorder_quantity",
+    "storage_location_detail",
+    "notes",
+)
+
+# Permissions needed to run each kind of import, keyed by the import type names used by BulkImportForm.
+IMPORT_PERMISSIONS = {
+    "spare_part_types": (
+        "nautobot_spare_parts.add_spareparttype",
+        "nautobot_spare_parts.change_spareparttype",
+    ),
+    "spare_part_inventory": (
+        "nautobot_spare_parts.add_sparepartinventory",
+        "nautobot_spare_parts.change_sparepartinventory",
+    ),
+}
+
+OPENING_BALANCE_REASON = "Opening balance (bulk import)"
+IMPORT_ADJUSTMENT_REASON = "Stock level set by bulk import"
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+class ImportResult:
+    """Outcome of a bulk import: counts, per-row errors and whether anything was written."""
+
+    def __init__(self, dry_run=False):
+        """Start with nothing imported."""
+        self.dry_run = dry_run
+        self.created = 0
+        self.updated = 0
+        self.errors = []
+        self.applied = False
+
+    @property
+    def ok(self):
+        """Return True if every row was valid."""
+        return not self.errors
+
+    def add_error(self, row_number, errors):
+        """Record the errors of one row; ``errors`` is a ValidationError or a message."""
+        if isinstance(errors, ValidationError):
+            messages = errors.message_dict if hasattr(errors, "error_dict") else {"__all__": errors.messages}
+        else:
+            messages = {"__all__": [str(errors)]}
+        self.errors.append({"row": row_number, "errors": messages})
+
+    def as_dict(self):
+        """Return the result as JSON-serializable data."""
+        return {
+            "dry_run": self.dry_run,
+            "applied": self.applied,
+            "created": self.created,
+            "updated": self.updated,
+            "errors": self.errors,
+        }
+
+
+def read_csv(source):
+    """Return a DictReader over ``source`` (CSV text or a text file) with normalised column names."""
+    if isinstance(source, str):
+        source = io.StringIO(source)
+    reader = csv.DictReader(source)
+    if reader.fieldnames is None:
+        raise ValidationError("The CSV data is empty")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    return reader
+
+
+def _batches(rows, batch_size):
+    """Yield lists of ``(row_number, row)`` pairs, numbering data rows from 1."""
+    batch = []
+    for row_number, row in enumerate(rows, 1):
+        batch.append((row_number, {key: (value or "").strip() for key, value in row.items() if key}))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _is_uuid(value):
+    """Return True if ``value`` is a UUID string."""
+    try:
+        uuid.UUID(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _lookup_map(queryset, field, values):
+    """Map each value of ``field`` (and each primary key) among ``values`` to the matching objects."""
+    values = {value for value in values if value}
+    if not values:
+        return {}
+    pks = {value for value in values if _is_uuid(value)}
+    lookup = {}
+    for obj in queryset.filter(Q(**{f"{field}__in": values}) | Q(pk__in=pks)):
+        lookup.setdefault(getattr(obj, field), []).append(obj)
+        lookup.setdefault(str(obj.pk), []).append(obj)
+    return lookup
+
+
+def _resolve(lookup, value, label, display=None):
+    """Return the single object ``value`` refers to in ``lookup``, or raise ValidationError."""
+    matches = lookup.get(value, [])
+    display = display or repr(value)
+    if not matches:
+        raise ValidationError(f"{label} {display} not found")
+    if len(matches) > 1:
+        raise ValidationError(f"{label} {display} is ambiguous; use its ID instead")
+    return matches[0]
+
+
+def _validate(instance, exclude):
+    """Validate ``instance`` without the per-row foreign key and uniqueness queries of full_clean().
+
+    Field values are converted (and checked) before the model's clean() runs, so clean() only sees typed values.
+    """
+    instance.clean_fields(exclude=exclude)
+    instance.clean()
+
+
+def _run_import(rows, import_batch, dry_run, atomic, batch_size):
+    """Run ``import_batch`` over batches of ``rows`` inside one transaction, rolled back for dry runs."""
+    result = ImportResult(dry_run=dry_run)
+    seen = {}
+    with transaction.atomic():
+        for batch in _batches(rows, batch_size):
+            import_batch(batch, result, seen)
+        if dry_run or (atomic and result.errors):
+            transaction.set_rollback(True)
+        else:
+            result.applied = True
+    return result
+
+
+def import_spare_part_types(rows, dry_run=False, atomic=True, batch_size=DEFAULT_BATCH_SIZE):
+    """Create or update SparePartTypes from dictionaries keyed by SPARE_PART_TYPE_IMPORT_FIELDS.
+
+    Rows are matched to existing part types by manufacturer + part number, or by slug when there is no part
+    number. ``manufacturer`` and each entry of ``compatible_device_types`` (separated by ``|``) are names or IDs.
+    With ``atomic=True`` any invalid row means nothing is written; otherwise only the valid rows are. A dry run
+    validates and counts everything but writes nothing. Returns an ImportResult.
+    """
+    return _run_import(rows, _import_spare_part_type_batch, dry_run, atomic, batch_size)
+
+
+def _import_spare_part_type_batch(batch, result, seen):
+    """Import one batch of part type rows; ``seen`` maps the keys and slugs of earlier rows to their row number."""
+    manufacturers = _lookup_map(Manufacturer.objects.all(), "name", (row.get("manufacturer") for _, row in batch))
+    device_type_names = {
+        name.strip() for _, row in batch for name in row.get("compatible_device_types", "").split("|") if name.strip()
+    }
+    device_types = _lookup_map(DeviceType.objects.all(), "model", device_type_names)
+
+    new_slugs = {
+        row_number: row.get("slug") or slugify(" ".join(filter(None, [row.get("name"), row.get("part_number")])))
+        for row_number, row in batch
+    }
+    existing = SparePartType.objects.filter(
+        Q(part_number__in={row["part_number"] for _, row in batch if row.get("part_number")})
+        | Q(slug__in=set(new_slugs.values()))
+    )
+    by_part_number = {(obj.manufacturer_id, obj.part_number): obj for obj in existing if obj.part_number}
+    by_slug = {obj.slug: obj for obj in existing}
+
+    now = timezone.now()
+    created, updated, device_type_sets = [], [], {}
+    update_fields = set()
+    for row_number, row in batch:
+        try:
+            manufacturer = None
+            if row.get("manufacturer"):
+                manufacturer = _resolve(manufacturers, row["manufacturer"], "Manufacturer")
+            part_number = row.get("part_number", "")
+            if part_number:
+                key = ("part_number", manufacturer.pk if manufacturer else None, part_number)
+                instance = by_part_number.get(key[1:])
+            else:
+                key = ("slug", new_slugs[row_number])
+                instance = by_slug.get(new_slugs[row_number])
+            if key in seen:
+                raise ValidationError(f"Duplicate of row {seen[key]}")
+            seen[key] = row_number
+
+            is_new = instance is None
+            slug = new_slugs[row_number] if is_new or row.get("slug") else instance.slug
+            if ("slug", slug) in seen and seen[("slug", slug)] != row_number:
+                raise ValidationError({"slug": f"Slug {slug!r} is also used by row {seen[('slug', slug)]}"})
+            if slug in by_slug and by_slug[slug] is not instance:
+                raise ValidationError({"slug": f"Slug {slug!r} is already used by {by_slug[slug]}"})
+            seen[("slug", slug)] = row_number
+
+            compatible = None
+            if "compatible_device_types" in row:
+                compatible = [
+                    _resolve(device_types, name.strip(), "Device type")
+                    for name in row["compatible_device_types"].split("|")
+                    if name.strip()
+                ]
+
+            if is_new:
+                instance = SparePartType()
+            values = {name: row[name] for name in ("name", "description", "category", "unit_cost") if row.get(name)}
+            values["slug"] = slug
+            if row.get("manufacturer") or is_new:
+                values["manufacturer"] = manufacturer
+            if part_number or is_new:
+                values["part_number"] = part_number
+            for name, value in values.items():
+                setattr(instance, name, value)
+            _validate(instance, exclude=["manufacturer"])
+        except ValidationError as err:
+            result.add_error(row_number, err)
+            continue
+
+        if is_new:
+            created.append(instance)
+        else:
+            instance.last_updated = now
+            updated.append(instance)
+            update_fields.update(values)
+        if compatible is not None:
+            device_type_sets[instance.pk] = {device_type.pk for device_type in compatible}
+
+    for instance in [*created, *updated]:
+        instance.refresh_search_document()
+    SparePartType.objects.bulk_create(created)
+    if updated:
+        SparePartType.objects.bulk_update(updated, [*sorted(update_fields), "search_document", "last_updated"])
+    if device_type_sets:
+        through = SparePartType.compatible_device_types.through
+        through.objects.filter(spareparttype_id__in=device_type_sets).delete()
+        through.objects.bulk_create(
+            [
+                through(spareparttype_id=type_id, devicetype_id=device_type_id)
+                for type_id, device_type_ids in device_type_sets.items()
+                for device_type_id in device_type_ids
+            ]
+        )
+        SparePartCompatibility.rebuild(spare_part_type_ids=list(device_type_sets))
+    if created:
+        SparePartStockRollup.rebuild([instance.pk for instance in created])
+    result.created += len(created)
+    result.updated += len(updated)
+
+
+def import_spare_part_inventory(rows, user=None, dry_run=False, atomic=True, batch_size=DEFAULT_BATCH_SIZE):
+    """Create or update SparePartInventory records from dictionaries keyed by SPARE_PART_INVENTORY_IMPORT_FIELDS.
+
+    The part type is given by ``spare_part_type`` (a slug or ID) or by ``manufacturer`` + ``part_number``; the
+    location by name or ID. Rows are matched to existing records by part type + location, which are locked while
+    the batch is written. Changes to ``quantity_on_hand`` and ``quantity_reserved`` are recorded on the ledger as
+    done by ``user``. ``atomic`` and ``dry_run`` behave as for import_spare_part_types(). Returns an ImportResult.
+    """
+
+    def import_batch(batch, result, seen):
+        _import_spare_part_inventory_batch(batch, result, seen, user)
+
+    return _run_import(rows, import_batch, dry_run, atomic, batch_size)
+
+
+def _import_spare_part_inventory_batch(batch, result, seen, user):
+    """Import one batch of inventory rows; ``seen`` maps the keys of earlier rows to their row number."""
+    locations = _lookup_map(Location.objects.all(), "name", (row.get("location") for _, row in batch))
+    spare_part_types = _lookup_map(
+        SparePartType.objects.select_related("manufacturer"),
+        "slug",
+        (row.get("spare_part_type") for _, row in batch),
+    )
+    part_numbers = {row["part_number"] for _, row in batch if row.get("part_number") and not row.get("spare_part_type")}
+    for spare_part_type in SparePartType.objects.select_related("manufacturer").filter(part_number__in=part_numbers):
+        manufacturer_name = spare_part_type.manufacturer.name if spare_part_type.manufacturer else ""
+        spare_part_types.setdefault((manufacturer_name, spare_part_type.part_number), []).append(spare_part_type)
+
+    resolved = []
+    for row_number, row in batch:
+        try:
+            if row.get("spare_part_type"):
+                spare_part_type = _resolve(spare_part_types, row["spare_part_type"], "Spare part type")
+            elif row.get("part_number"):
+                spare_part_type = _resolve(
+                    spare_part_types,
+                    (row.get("manufacturer", ""), row["part_number"]),
+                    "Spare part type",
+                    display=f"{row.get('manufacturer', '')} {row['part_number']}".strip(),
+                )
+            else:
+                raise ValidationError({"spare_part_type": "Give a spare_part_type or a manufacturer and part_number"})
+            if not row.get("location"):
+                raise ValidationError({"location": "This field is required"})
+            location = _resolve(locations, row["location"], "Location")
+        except ValidationError as err:
+            result.add_error(row_number, err)
+            continue
+        resolved.append((row_number, row, spare_part_type, location))
+
+    # Lock the existing records in primary-key order, like the stock engine does.
+    existing = {
+        (inventory.spare_part_type_id, inventory.location_id): inventory
+        for inventory in SparePartInventory.objects.select_for_update()
+        .filter(
+            spare_part_type_id__in={spare_part_type.pk for _, _, spare_part_type, _ in resolved},
+            location_id__in={location.pk for _, _, _, location in resolved},
+        )
+        .order_by("pk")
+    }
+
+    now = timezone.now()
+    created, updated, ledger = [], [], []
+    update_fields = set()
+    for row_number, row, spare_part_type, location in resolved:
+        key = (spare_part_type.pk, location.pk)
+        try:
+            if key in seen:
+                raise ValidationError(f"Duplicate of row {seen[key]}")
+            seen[key] = row_number
+            instance = existing.get(key)
+            is_new = instance is None
+            if is_new:
+                instance = SparePartInventory(spare_part_type=spare_part_type, location=location)
+            on_hand_before, reserved_before = instance.quantity_on_hand, instance.quantity_reserved
+            values = {name: row[name] for name in INVENTORY_VALUE_FIELDS if row.get(name)}
+            for name, value in values.items():
+                setattr(instance, name, value)
+            _validate(instance, exclude=["spare_part_type", "location"])
+        except ValidationError as err:
+            result.add_error(row_number, err)
+            continue
+
+        instance.refresh_stock_state()
+        instance.refresh_search_document()
+        instance.last_updated = now
+        if is_new:
+            created.append(instance)
+        else:
+            instance.version += 1
+            updated.append(instance)
+            update_fields.update(values)
+
+        reason = OPENING_BALANCE_REASON if is_new else IMPORT_ADJUSTMENT_REASON
+        movements = [("adjustment", on_hand_before, instance.quantity_on_hand)]
+        if instance.quantity_reserved > reserved_before:
+            movements.append(("allocation", reserved_before, instance.quantity_reserved))
+        elif instance.quantity_reserved < reserved_before:
+            movements.append(("deallocation", reserved_before, instance.quantity_reserved))
+        for transaction_type, before, after in movements:
+            if after != before:
+                ledger.append(
+                    SparePartTransaction(
+                        spare_part_inventory=instance,
+                        transaction_type=transaction_type,
+                        quantity=after - before,
+                        quantity_before=before,
+                        quantity_after=after,
+                        user=user,
+                        reason=reason,
+                    )
+                )
+
+    SparePartInventory.objects.bulk_create(created)
+    if updated:
+        SparePartInventory.objects.bulk_update(
+            updated,
+            [
+                *sorted(update_fields),
+                *SparePartInventory.STOCK_STATE_FIELDS,
+                "search_document",
+                "last_updated",
+                "version",
+            ],
+        )
+    for txn in ledger:
+        txn.refresh_search_document()
+    SparePartTransaction.objects.bulk_create(ledger)
+    SparePartDailyUsage.record(ledger)
+    inventories = [*created, *updated]
+    if inventories:
+        SparePartStockRollup.rebuild(
+            {inventory.spare_part_type_id for inventory in inventories},
+            include_last_movement=True,
+        )
+        SparePartCompatibility.rebuild(inventory_ids=[inventory.pk for inventory in inventories])
+        invalidate_stock_trees({inventory.spare_part_type_id for inventory in inventories})
+        transaction.on_commit(
+            lambda: stock_changed.send(sender=SparePartInventory, inventories=inventories, transactions=ledger)
+        )
+    result.created += len(created)
+    result.updated += len(updated)
@@ -0,0 +1,111 @@
+"""Jobs for Spare Parts Inventory plugin."""
+
+from nautobot.apps.jobs import BooleanVar, IntegerVar, Job, register_jobs
+
+from nautobot_spare_parts.checkpoints import create_checkpoint
+from nautobot_spare_parts.forecasting import forecast_demand
+from nautobot_spare_parts.reconciliation import reconcile_ledger
+from nautobot_spare_parts.stock import release_expired_reservations
+
+name = "Spare Parts"  # Grouping shown in the Jobs list
+
+# Discrepancies beyond this many are counted but not logged one by one.
+MAX_LOGGED_DISCREPANCIES = 500
+
+
+class CreateStockCheckpoint(Job):
+    """Record the stock levels of every inventory record, for point-in-time stock queries."""
+
+    class Meta:
+        """Meta class for CreateStockCheckpoint."""
+
+        name = "Create Stock Checkpoint"
+        description = "Snapshot current stock levels so historical (as of) stock queries stay fast. Schedule it daily."
+        has_sensitive_variables = False
+
+    def run(self):
+        """Create the checkpoint."""
+        checkpoint = create_checkpoint()
+        self.logger.info("Recorded %d inventory records in %s", checkpoint.inventory_count, checkpoint)
+
+
+class ForecastDemand(Job):
+    """Forecast the demand for every inventory record and recommend minimum and reorder quantities."""
+
+    history_days = IntegerVar(
+        required=False,
+        min_value=1,
+        description="Days of check-out history to use (defaults to the forecast_history_days setting)",
+    )
+    lead_time_days = IntegerVar(
+        required=False,
+        min_value=0,
+        description="Days it takes a reorder to arrive (defaults to the forecast_lead_time_days setting)",
+    )
+
+    class Meta:
+        """Meta class for ForecastDemand."""
+
+        name = "Forecast Demand"
+        description = "Project stock-out dates and recommend minimum and reorder quantities from check-out history."
+        has_sensitive_variables = False
+
+    def run(self, *, history_days=None, lead_time_days=None):
+        """Run the forecast."""
+        count = forecast_demand(history_days=history_days, lead_time_days=lead_time_days)
+        self.logger.info("Forecast demand for %d inventory records", count)
+
+
+class ReconcileLedger(Job):
+    """Check that every inventory record's transactions chain together and end at its current stock levels."""
+
+    fix = BooleanVar(
+        default=False,
+        description="Add corrective transactions where the ledger doesn't end at the current stock level",
+    )
+    include_archive = BooleanVar(
+        default=False,
+        description="Check archived transactions too (slower)",
+    )
+
+    class Meta:
+        """Meta class for ReconcileLedger."""
+
+        name = "Reconcile Ledger"
+        description = "Verify the quantity before/after chain of the transaction log against current stock levels."
+        has_sensitive_variables = False
+
+    def run(self, *, fix=False, include_archive=False):
+        """Reconcile the ledger."""
+        result = reconcile_ledger(include_archive=include_archive, fix=fix, user=self.user)
+        for discrepancy in result.discrepancies[:MAX_LOGGED_DISCREPANCIES]:
+            self.logger.warning(str(discrepancy))
+        if len(result.discrepancies) > MAX_LOGGED_DISCREPANCIES:
+            self.logger.warning("%d more discrepancies not shown", len(result.discrepancies) - MAX_LOGGED_DISCREPANCIES)
+        self.logger.info(
+            "Checked %d transactions for %d inventory records: %d discrepancies, %d corrective transactions added",
+            result.transaction_count,
+            result.inventory_count,
+            len(result.discrepancies),
+            len(result.corrections),
+        )
+
+
+class ReleaseExpiredReservations(Job):
+    """Release every reservation past its expiry, returning its units to available stock."""
+
+    class Meta:
+        """Meta class for ReleaseExpiredReservations."""
+
+        name = "Release Expired Reservations"
+        description = "Release the parts held by expired reservations, with a deallocation on the ledger for each."
+        has_sensitive_variables = False
+
+    def run(self):
+        """Release the expired reservations."""
+        released = release_expired_reservations(user=self.user)
+        self.logger.info("Released %d expired reservations", released)
+
+
+jobs = [CreateStockCheckpoint, ForecastDemand, ReconcileLedger, ReleaseExpiredReservations]
+register_jobs(*jobs)
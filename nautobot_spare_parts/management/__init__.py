@@ -0,0 +1 @@
+"""Management commands for Spare Parts Inventory plugin."""
@@ -0,0 +1,58 @@
+"""Move old spare part transactions into the archive."""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from nautobot_spare_parts.archive import archive_transactions, DEFAULT_BATCH_SIZE, get_archive_cutoff
+from nautobot_spare_parts.utils import get_plugin_setting
+
+
+class Command(BaseCommand):
+    """Archive SparePartTransaction rows older than the retention horizon, in bounded batches."""
+
+    help = "Move transactions older than the retention horizon into the transaction archive."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--older-than",
+            type=int,
+            help="Archive transactions older than this many days (defaults to transaction_retention_days).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of transactions moved per database transaction.",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            help="Stop after this many batches; the next run carries on from there.",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        retention_days = options["older_than"]
+        if retention_days is None:
+            retention_days = get_plugin_setting("transaction_retention_days")
+        if retention_days is None:
+            raise CommandError("Give --older-than or set transaction_retention_days in PLUGINS_CONFIG")
+
+        cutoff = get_archive_cutoff(retention_days)
+        try:
+            archived = archive_transactions(
+                cutoff,
+                batch_size=options["batch_size"],
+                max_batches=options["max_batches"],
+                pause=options["pause"],
+            )
+        except ValidationError as err:
+            raise CommandError("; ".join(err.messages)) from err
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} transactions up to {cutoff:%Y-%m-%d %H:%M}"))
@@ -0,0 +1,41 @@
+"""Rebuild the daily usage rollup from the transaction ledger."""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from nautobot_spare_parts.models import SparePartDailyUsage, SparePartInventory
+
+
+class Command(BaseCommand):
+    """Recount SparePartDailyUsage rows from the live and archived ledgers, a batch of inventory records at a time."""
+
+    help = "Rebuild the daily usage rollup from the transaction ledger and its archive."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--since", help="First day to rebuild (YYYY-MM-DD); defaults to the start of the ledger.")
+        parser.add_argument("--until", help="Last day to rebuild (YYYY-MM-DD); defaults to today.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Number of inventory records rebuilt (and locked) per database transaction.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        dates = {}
+        for option, key in (("since", "start_date"), ("until", "end_date")):
+            if options[option]:
+                dates[key] = parse_date(options[option])
+                if dates[key] is None:
+                    raise CommandError(f"Invalid --{option} date {options[option]!r}; use YYYY-MM-DD")
+
+        inventory_ids = list(SparePartInventory.objects.order_by("pk").values_list("pk", flat=True))
+        batch_size = max(options["batch_size"], 1)
+        buckets = 0
+        for offset in range(0, len(inventory_ids), batch_size):
+            buckets += SparePartDailyUsage.rebuild(inventory_ids[offset : offset + batch_size], **dates)
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {buckets} usage buckets for {len(inventory_ids)} inventory records")
+        )
@@ -0,0 +1,27 @@
+"""Record a stock checkpoint."""
+
+from django.core.management.base import BaseCommand
+
+from nautobot_spare_parts.checkpoints import create_checkpoint
+
+
+class Command(BaseCommand):
+    """Snapshot the stock levels of every SparePartInventory record."""
+
+    help = "Record the current stock levels of every inventory record, for point-in-time stock queries."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of checkpoint entries inserted per query.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        checkpoint = create_checkpoint(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Recorded {checkpoint.inventory_count} inventory records in {checkpoint}")
+        )
@@ -0,0 +1,80 @@
+"""Dump the spare part transaction ledger to a file."""
+
+import sys
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from nautobot_spare_parts.export import (
+    DEFAULT_CHUNK_SIZE,
+    EXPORT_FORMATS,
+    filter_ledger,
+    iter_ledger_rows,
+    render_ledger,
+)
+from nautobot_spare_parts.models import SparePartTransaction
+
+
+class Command(BaseCommand):
+    """Stream SparePartTransaction rows to CSV or NDJSON without loading the ledger into memory."""
+
+    help = "Export the spare part transaction ledger as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="csv", help="Output format.")
+        parser.add_argument("--output", help="File to write to (defaults to standard output).")
+        parser.add_argument("--since", help="Only export transactions at or after this date/time.")
+        parser.add_argument("--until", help="Only export transactions at or before this date/time.")
+        parser.add_argument(
+            "--location",
+            action="append",
+            default=[],
+            help="Only export transactions for this location ID (may be repeated).",
+        )
+        parser.add_argument(
+            "--transaction-type",
+            action="append",
+            default=[],
+            help="Only export transactions of this type (may be repeated).",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        params = QueryDict(mutable=True)
+        if options["since"]:
+            params["timestamp_after"] = options["since"]
+        if options["until"]:
+            params["timestamp_before"] = options["until"]
+        params.setlist("location", options["location"])
+        params.setlist("transaction_type", options["transaction_type"])
+
+        try:
+            queryset = filter_ledger(SparePartTransaction.objects.all(), params)
+        except ValidationError as err:
+            raise CommandError("; ".join(err.messages)) from err
+
+        lines = render_ledger(iter_ledger_rows(queryset, chunk_size=options["chunk_size"]), options["format"])
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                count = self._write(lines, output)
+        else:
+            count = self._write(lines, sys.stdout)
+        if options["format"] == "csv":
+            count -= 1  # header line
+        self.stderr.write(self.style.SUCCESS(f"Exported {count} transactions"))
+
+    def _write(self, lines, output):
+        """Write ``lines`` to ``output`` and return how many were written."""
+        count = 0
+        for line in lines:
+            output.write(line)
+            count += 1
+        return count
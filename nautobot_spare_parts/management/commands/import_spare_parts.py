@@ -0,0 +1,79 @@
+"""Bulk import spare part types or inventory records from a CSV file."""
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from nautobot_spare_parts.importer import (
+    DEFAULT_BATCH_SIZE,
+    import_spare_part_inventory,
+    import_spare_part_types,
+    read_csv,
+)
+
+
+class Command(BaseCommand):
+    """Create or update SparePartType or SparePartInventory records from CSV."""
+
+    help = "Import spare part types or inventory records from a CSV file."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument("import_type", choices=["types", "inventory"], help="What the rows describe.")
+        parser.add_argument("path", help="CSV file with a header row of field names.")
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the rows and report what would change without writing anything.",
+        )
+        parser.add_argument(
+            "--partial",
+            action="store_true",
+            help="Import the valid rows even if some are invalid (by default nothing is imported).",
+        )
+        parser.add_argument("--user", help="Username recorded on the opening balance transactions.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows looked up and written at a time.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        options_for_import = {
+            "dry_run": options["dry_run"],
+            "atomic": not options["partial"],
+            "batch_size": options["batch_size"],
+        }
+        if options["import_type"] == "inventory":
+            user = None
+            if options["user"]:
+                try:
+                    user = get_user_model().objects.get(username=options["user"])
+                except get_user_model().DoesNotExist as err:
+                    raise CommandError(f"User {options['user']!r} not found") from err
+            options_for_import["user"] = user
+
+        with open(options["path"], encoding="utf-8-sig", newline="") as csv_file:
+            try:
+                rows = read_csv(csv_file)
+            except ValidationError as err:
+                raise CommandError("; ".join(err.messages)) from err
+            if options["import_type"] == "types":
+                result = import_spare_part_types(rows, **options_for_import)
+            else:
+                result = import_spare_part_inventory(rows, **options_for_import)
+
+        for error in result.errors:
+            for field, messages in error["errors"].items():
+                prefix = f"Row {error['row']}" if field == "__all__" else f"Row {error['row']} {field}"
+                self.stderr.write(f"{prefix}: {'; '.join(messages)}")
+
+        summary = f"{result.created} created, {result.updated} updated, {len(result.errors)} invalid"
+        if result.applied:
+            self.stdout.write(self.style.SUCCESS(f"Imported: {summary}"))
+        elif result.dry_run:
+            self.stdout.write(f"Dry run, nothing written: {summary}")
+        else:
+            raise CommandError(f"Nothing imported: {summary}")
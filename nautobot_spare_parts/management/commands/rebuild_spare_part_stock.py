@@ -0,0 +1,55 @@
+"""Rebuild or verify the per-part-type stock rollups, and rebuild the compatibility index."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from nautobot_spare_parts.models import SparePartCompatibility, SparePartStockRollup, SparePartType
+
+
+class Command(BaseCommand):
+    """Recount SparePartStockRollup rows from inventory records and the transaction ledger.
+
+    Without ``--verify`` the SparePartCompatibility entries of each part type are rebuilt as well.
+    """
+
+    help = (
+        "Rebuild (or with --verify, check) the stock rollup of every spare part type, and rebuild the "
+        "compatibility index."
+    )
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Report rollups that differ from a fresh count without changing them; exit non-zero on drift.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of part types to recount per database transaction.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        type_ids = list(SparePartType.objects.order_by("pk").values_list("pk", flat=True))
+        batch_size = options["batch_size"]
+        batches = [type_ids[start : start + batch_size] for start in range(0, len(type_ids), batch_size)]
+
+        if options["verify"]:
+            mismatches = []
+            for batch in batches:
+                mismatches.extend(SparePartStockRollup.verify(batch))
+            for type_id, field, stored, actual in mismatches:
+                self.stdout.write(f"{type_id}: {field} is {stored}, expected {actual}")
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rollup value(s) out of date")
+            self.stdout.write(self.style.SUCCESS(f"All {len(type_ids)} stock rollups are up to date"))
+            return
+
+        rebuilt = 0
+        indexed = 0
+        for batch in batches:
+            rebuilt += SparePartStockRollup.rebuild(batch, include_last_movement=True)
+            indexed += SparePartCompatibility.rebuild(spare_part_type_ids=batch)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} stock rollups and {indexed} compatibility entries"))
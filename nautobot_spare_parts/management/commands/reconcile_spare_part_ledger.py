@@ -0,0 +1,59 @@
+"""Check the spare part transaction ledger against the inventory records."""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from nautobot_spare_parts.reconciliation import DEFAULT_CHUNK_SIZE, reconcile_ledger
+
+
+class Command(BaseCommand):
+    """Verify the quantity before/after chain of every inventory record's transactions."""
+
+    help = "Check that every inventory record's transactions chain together and end at its current stock levels."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Add corrective transactions where the ledger doesn't end at the current stock level.",
+        )
+        parser.add_argument(
+            "--include-archive",
+            action="store_true",
+            help="Check archived transactions too.",
+        )
+        parser.add_argument("--user", help="Username recorded on the corrective transactions.")
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help="Number of rows fetched from the database at a time.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        user = None
+        if options["user"]:
+            try:
+                user = get_user_model().objects.get(username=options["user"])
+            except get_user_model().DoesNotExist as err:
+                raise CommandError(f"User {options['user']!r} not found") from err
+
+        result = reconcile_ledger(
+            include_archive=options["include_archive"],
+            fix=options["fix"],
+            user=user,
+            chunk_size=max(options["chunk_size"], 1),
+        )
+        for discrepancy in result.discrepancies:
+            self.stdout.write(str(discrepancy))
+
+        summary = (
+            f"Checked {result.transaction_count} transactions for {result.inventory_count} inventory records: "
+            f"{len(result.discrepancies)} discrepancies, {len(result.corrections)} corrective transactions added"
+        )
+        if result.ok:
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            self.stdout.write(self.style.WARNING(summary))
@@ -0,0 +1,25 @@
+"""Release spare part reservations that have expired."""
+
+from django.core.management.base import BaseCommand
+
+from nautobot_spare_parts.stock import DEFAULT_SWEEP_BATCH_SIZE, release_expired_reservations
+
+
+class Command(BaseCommand):
+    """Release every active SparePartReservation past its expiry, deallocating its units on the ledger."""
+
+    help = "Release expired spare part reservations, returning their units to available stock."
+
+    def add_arguments(self, parser):
+        """Add command arguments."""
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_SWEEP_BATCH_SIZE,
+            help="Number of reservations released per database transaction.",
+        )
+
+    def handle(self, *args, **options):
+        """Run the command."""
+        released = release_expired_reservations(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Released {released} expired reservations"))
@@ -0,0 +1,19 @@
+# Generated by Django 4.2.17 on 2026-10-17 09:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spareparttransaction',
+            name='transfer_source',
+            field=models.OneToOneField(blank=True, help_text='Outgoing transfer transaction that this incoming transfer pairs with', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='transfer_destination', to='nautobot_spare_parts.spareparttransaction'),
+        ),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 4.2.17 on 2026-10-17 09:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+import uuid
+
+
+def populate_stock_rollups(apps, schema_editor):
+    """Create a stock rollup for every existing part type."""
+    SparePartType = apps.get_model("nautobot_spare_parts", "SparePartType")
+    SparePartInventory = apps.get_model("nautobot_spare_parts", "SparePartInventory")
+    SparePartTransaction = apps.get_model("nautobot_spare_parts", "SparePartTransaction")
+    SparePartStockRollup = apps.get_model("nautobot_spare_parts", "SparePartStockRollup")
+
+    totals = {
+        row.pop("spare_part_type"): row
+        for row in SparePartInventory.objects.order_by()
+        .values("spare_part_type")
+        .annotate(
+            total_on_hand=Coalesce(models.Sum("quantity_on_hand"), 0),
+            total_reserved=Coalesce(models.Sum("quantity_reserved"), 0),
+            stocked_location_count=models.Count("pk", filter=models.Q(quantity_on_hand__gt=0)),
+            low_stock_location_count=models.Count(
+                "pk",
+                filter=models.Q(quantity_on_hand__lte=models.F("minimum_quantity") + models.F("quantity_reserved")),
+            ),
+        )
+    }
+    last_movements = dict(
+        SparePartTransaction.objects.order_by()
+        .values_list("spare_part_inventory__spare_part_type")
+        .annotate(last=models.Max("timestamp"))
+    )
+
+    rollups = []
+    for type_id in SparePartType.objects.values_list("pk", flat=True):
+        row = totals.get(type_id, {})
+        on_hand = row.get("total_on_hand", 0)
+        reserved = row.get("total_reserved", 0)
+        rollups.append(
+            SparePartStockRollup(
+                spare_part_type_id=type_id,
+                total_on_hand=on_hand,
+                total_reserved=reserved,
+                total_available=on_hand - reserved,
+                stocked_location_count=row.get("stocked_location_count", 0),
+                low_stock_location_count=row.get("low_stock_location_count", 0),
+                last_movement=last_movements.get(type_id),
+            )
+        )
+    SparePartStockRollup.objects.bulk_create(rollups, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0002_spareparttransaction_transfer_source'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SparePartStockRollup',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('total_on_hand', models.PositiveIntegerField(default=0)),
+                ('total_reserved', models.PositiveIntegerField(default=0)),
+                ('total_available', models.IntegerField(default=0)),
+                ('stocked_location_count', models.PositiveIntegerField(default=0)),
+                ('low_stock_location_count', models.PositiveIntegerField(default=0)),
+                ('last_movement', models.DateTimeField(blank=True, null=True)),
+                ('spare_part_type', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='stock_rollup', to='nautobot_spare_parts.spareparttype')),
+            ],
+            options={
+                'verbose_name': 'Spare Part Stock Rollup',
+                'verbose_name_plural': 'Spare Part Stock Rollups',
+            },
+        ),
+        migrations.RunPython(populate_stock_rollups, migrations.RunPython.noop),
+    ]
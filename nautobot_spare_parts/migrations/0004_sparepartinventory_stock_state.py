@@ -0,0 +1,52 @@
+# Generated by Django 4.2.17 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+def populate_stock_state(apps, schema_editor):
+    """Compute the stored stock state of existing inventory records."""
+    SparePartInventory = apps.get_model("nautobot_spare_parts", "SparePartInventory")
+
+    SparePartInventory.objects.update(
+        quantity_available=models.F("quantity_on_hand") - models.F("quantity_reserved"),
+        is_low_stock=False,
+        needs_reorder=False,
+    )
+    SparePartInventory.objects.filter(
+        quantity_on_hand__lte=models.F("minimum_quantity") + models.F("quantity_reserved")
+    ).update(is_low_stock=True)
+    SparePartInventory.objects.filter(is_low_stock=True, reorder_quantity__gt=0).update(needs_reorder=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0003_sparepartstockrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sparepartinventory',
+            name='quantity_available',
+            field=models.IntegerField(default=0, editable=False, help_text='On hand minus reserved (maintained automatically)'),
+        ),
+        migrations.AddField(
+            model_name='sparepartinventory',
+            name='is_low_stock',
+            field=models.BooleanField(default=True, editable=False, help_text='Available quantity is at or below the minimum quantity (maintained automatically)'),
+        ),
+        migrations.AddField(
+            model_name='sparepartinventory',
+            name='needs_reorder',
+            field=models.BooleanField(default=False, editable=False, help_text='Low on stock and has a reorder quantity set (maintained automatically)'),
+        ),
+        migrations.RunPython(populate_stock_state, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='sparepartinventory',
+            index=models.Index(condition=models.Q(('is_low_stock', True)), fields=['location', 'spare_part_type'], name='sparepartinv_low_stock_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sparepartinventory',
+            index=models.Index(condition=models.Q(('needs_reorder', True)), fields=['location', 'spare_part_type'], name='sparepartinv_reorder_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2.17 on 2026-10-17 14:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0004_sparepartinventory_stock_state'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SparePartStockCheckpoint',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('timestamp', models.DateTimeField(db_index=True, help_text='Moment the stock levels were recorded')),
+                ('inventory_count', models.PositiveIntegerField(default=0, help_text='Number of inventory records recorded')),
+            ],
+            options={
+                'verbose_name': 'Spare Part Stock Checkpoint',
+                'verbose_name_plural': 'Spare Part Stock Checkpoints',
+                'ordering': ['-timestamp'],
+                'get_latest_by': 'timestamp',
+            },
+        ),
+        migrations.CreateModel(
+            name='SparePartStockCheckpointEntry',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('quantity_on_hand', models.PositiveIntegerField()),
+                ('quantity_reserved', models.PositiveIntegerField()),
+                ('checkpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='nautobot_spare_parts.sparepartstockcheckpoint')),
+                ('spare_part_inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkpoint_entries', to='nautobot_spare_parts.sparepartinventory')),
+            ],
+            options={
+                'verbose_name': 'Spare Part Stock Checkpoint Entry',
+                'verbose_name_plural': 'Spare Part Stock Checkpoint Entries',
+                'unique_together': {('checkpoint', 'spare_part_inventory')},
+            },
+        ),
+    ]
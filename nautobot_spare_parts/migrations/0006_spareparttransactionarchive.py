@@ -0,0 +1,41 @@
+# Generated by Django 4.2.17 on 2026-10-17 15:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('nautobot_spare_parts', '0005_sparepartstockcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SparePartTransactionArchive',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('transaction_type', models.CharField(choices=[('check_in', 'Check In'), ('check_out', 'Check Out'), ('adjustment', 'Adjustment'), ('allocation', 'Allocation'), ('deallocation', 'Deallocation'), ('transfer', 'Transfer')], help_text='Type of transaction', max_length=50)),
+                ('quantity', models.IntegerField(help_text='Amount changed (positive or negative)')),
+                ('quantity_before', models.PositiveIntegerField(help_text='Stock level before transaction')),
+                ('quantity_after', models.PositiveIntegerField(help_text='Stock level after transaction')),
+                ('timestamp', models.DateTimeField(help_text='When the transaction occurred')),
+                ('reason', models.TextField(help_text='Reason for the transaction')),
+                ('notes', models.TextField(blank=True)),
+                ('transfer_source', models.UUIDField(blank=True, help_text='ID of the outgoing transfer transaction that this incoming transfer pairs with', null=True)),
+                ('archived', models.DateTimeField(auto_now_add=True, help_text='When the transaction was archived')),
+                ('related_device', models.ForeignKey(blank=True, help_text='Device associated with this transaction', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_spare_part_transactions', to='dcim.device')),
+                ('spare_part_inventory', models.ForeignKey(help_text='Inventory record this transaction affects', on_delete=django.db.models.deletion.PROTECT, related_name='archived_transactions', to='nautobot_spare_parts.sparepartinventory')),
+                ('user', models.ForeignKey(blank=True, help_text='User who performed the transaction', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_spare_part_transactions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Archived Spare Part Transaction',
+                'verbose_name_plural': 'Archived Spare Part Transactions',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['spare_part_inventory', 'timestamp'], name='sparepartarchive_inv_ts_idx'), models.Index(fields=['timestamp'], name='sparepartarchive_ts_idx')],
+            },
+        ),
+    ]
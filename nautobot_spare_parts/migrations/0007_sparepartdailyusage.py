@@ -0,0 +1,34 @@
+# Generated by Django 4.2.17 on 2026-10-17 16:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0006_spareparttransactionarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SparePartDailyUsage',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('date', models.DateField(help_text="Day of the transactions (in the server's time zone)")),
+                ('transaction_type', models.CharField(choices=[('check_in', 'Check In'), ('check_out', 'Check Out'), ('adjustment', 'Adjustment'), ('allocation', 'Allocation'), ('deallocation', 'Deallocation'), ('transfer', 'Transfer')], max_length=50)),
+                ('transaction_count', models.PositiveIntegerField(default=0)),
+                ('units_in', models.PositiveIntegerField(default=0)),
+                ('units_out', models.PositiveIntegerField(default=0)),
+                ('spare_part_inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='nautobot_spare_parts.sparepartinventory')),
+            ],
+            options={
+                'verbose_name': 'Spare Part Daily Usage',
+                'verbose_name_plural': 'Spare Part Daily Usage',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='sparepartusage_date_idx')],
+                'unique_together': {('spare_part_inventory', 'date', 'transaction_type')},
+            },
+        ),
+    ]
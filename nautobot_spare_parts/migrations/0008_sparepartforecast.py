@@ -0,0 +1,35 @@
+# Generated by Django 4.2.17 on 2026-10-17 16:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0007_sparepartdailyusage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SparePartForecast',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('computed', models.DateTimeField(help_text='When the forecast was made')),
+                ('daily_usage', models.FloatField(help_text='Average units checked out per day')),
+                ('daily_usage_deviation', models.FloatField(help_text='Standard deviation of the units checked out per day')),
+                ('safety_stock', models.PositiveIntegerField(help_text='Units held back to cover variable demand over the lead time')),
+                ('recommended_minimum_quantity', models.PositiveIntegerField(help_text='Stock level at which to reorder: lead time demand plus safety stock')),
+                ('recommended_reorder_quantity', models.PositiveIntegerField(help_text='Units to order: the expected use over the cover period')),
+                ('projected_stockout', models.DateField(blank=True, help_text='Day the available stock runs out at the current rate of use (empty if not in sight)', null=True)),
+                ('spare_part_inventory', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast', to='nautobot_spare_parts.sparepartinventory')),
+            ],
+            options={
+                'verbose_name': 'Spare Part Forecast',
+                'verbose_name_plural': 'Spare Part Forecasts',
+                'ordering': ['projected_stockout'],
+                'indexes': [models.Index(fields=['projected_stockout'], name='sparepartforecast_stockout_idx')],
+            },
+        ),
+    ]
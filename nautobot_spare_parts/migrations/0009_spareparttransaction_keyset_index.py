@@ -0,0 +1,17 @@
+# Generated by Django 4.2.17 on 2026-10-17 17:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0008_sparepartforecast'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='spareparttransaction',
+            index=models.Index(fields=['timestamp', 'id'], name='sparepartledger_ts_id_idx'),
+        ),
+    ]
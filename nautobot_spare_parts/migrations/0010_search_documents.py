@@ -0,0 +1,102 @@
+# Generated by Django 4.2.17 on 2026-10-17 18:10
+
+from django.db import DatabaseError, migrations, models, transaction
+from django.db.models.functions import Concat, Lower
+
+# Tables given a trigram index on their search document, with the index names.
+TRIGRAM_INDEXES = (
+    ('spareparttype', 'sparepart_type_search_idx'),
+    ('sparepartinventory', 'sparepartinv_search_idx'),
+    ('spareparttransaction', 'sparepartledger_search_idx'),
+    ('spareparttransactionarchive', 'sparepartarchive_search_idx'),
+)
+
+
+def populate_search_documents(apps, schema_editor):
+    """Compute the search documents of existing records (see models.build_search_document)."""
+    SparePartType = apps.get_model("nautobot_spare_parts", "SparePartType")
+    SparePartInventory = apps.get_model("nautobot_spare_parts", "SparePartInventory")
+
+    def document(*values):
+        return "\n".join("" if value is None else str(value) for value in values).lower()
+
+    spare_part_types = list(SparePartType.objects.select_related("manufacturer"))
+    for spare_part_type in spare_part_types:
+        spare_part_type.search_document = document(
+            spare_part_type.name,
+            spare_part_type.part_number,
+            "".join(char for char in spare_part_type.part_number if char.isalnum()),
+            spare_part_type.description,
+            spare_part_type.manufacturer.name if spare_part_type.manufacturer_id else "",
+        )
+    SparePartType.objects.bulk_update(spare_part_types, ["search_document"], batch_size=1000)
+
+    inventories = list(SparePartInventory.objects.select_related("location"))
+    for inventory in inventories:
+        inventory.search_document = document(inventory.location.name, inventory.storage_location_detail)
+    SparePartInventory.objects.bulk_update(inventories, ["search_document"], batch_size=1000)
+
+    for model_name in ("SparePartTransaction", "SparePartTransactionArchive"):
+        apps.get_model("nautobot_spare_parts", model_name).objects.update(
+            search_document=Lower(Concat("reason", models.Value("\n"), "notes"))
+        )
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """On PostgreSQL, index the search documents for ``LIKE '%term%'`` matches with pg_trgm.
+
+    Skipped when the extension can't be installed; searches then work the same, unindexed.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError:
+        return
+    for model_name, index_name in TRIGRAM_INDEXES:
+        table = apps.get_model("nautobot_spare_parts", model_name)._meta.db_table
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {index_name} ON {schema_editor.quote_name(table)} "
+            "USING gin (search_document gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    """Drop the trigram indexes (the extension is left installed)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for _, index_name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0009_spareparttransaction_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='spareparttype',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Searchable text of the part type (maintained automatically)'),
+        ),
+        migrations.AddField(
+            model_name='sparepartinventory',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Searchable text of the record (maintained automatically)'),
+        ),
+        migrations.AddField(
+            model_name='spareparttransaction',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Searchable text of the transaction (maintained automatically)'),
+        ),
+        migrations.AddField(
+            model_name='spareparttransactionarchive',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False, help_text='Searchable text of the transaction, as it was in the live ledger'),
+        ),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
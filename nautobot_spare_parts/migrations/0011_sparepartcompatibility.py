@@ -0,0 +1,61 @@
+# Generated by Django 4.2.17 on 2026-10-17 19:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def populate_compatibility_index(apps, schema_editor):
+    """Index the in-stock inventory records of every part type under its compatible device types."""
+    SparePartCompatibility = apps.get_model("nautobot_spare_parts", "SparePartCompatibility")
+    SparePartInventory = apps.get_model("nautobot_spare_parts", "SparePartInventory")
+    SparePartType = apps.get_model("nautobot_spare_parts", "SparePartType")
+
+    device_types = {}
+    for type_id, device_type_id in SparePartType.compatible_device_types.through.objects.values_list(
+        "spareparttype", "devicetype"
+    ):
+        device_types.setdefault(type_id, []).append(device_type_id)
+    SparePartCompatibility.objects.bulk_create(
+        [
+            SparePartCompatibility(
+                device_type_id=device_type_id,
+                spare_part_type_id=type_id,
+                location_id=location_id,
+                spare_part_inventory_id=inventory_id,
+            )
+            for inventory_id, type_id, location_id in SparePartInventory.objects.filter(
+                quantity_available__gt=0
+            ).values_list("pk", "spare_part_type", "location")
+            for device_type_id in device_types.get(type_id, ())
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dcim', '0062_module_data_migration'),
+        ('nautobot_spare_parts', '0010_search_documents'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SparePartCompatibility',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('device_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dcim.devicetype')),
+                ('spare_part_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='nautobot_spare_parts.spareparttype')),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='dcim.location')),
+                ('spare_part_inventory', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='compatibility_entries', to='nautobot_spare_parts.sparepartinventory')),
+            ],
+            options={
+                'verbose_name': 'Spare Part Compatibility',
+                'verbose_name_plural': 'Spare Part Compatibilities',
+                'unique_together': {('device_type', 'spare_part_inventory')},
+                'indexes': [models.Index(fields=['device_type', 'location'], name='sparepartcompat_dt_loc_idx'), models.Index(fields=['spare_part_type'], name='sparepartcompat_type_idx')],
+            },
+        ),
+        migrations.RunPython(populate_compatibility_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.17 on 2026-10-17 21:40
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('nautobot_spare_parts', '0011_sparepartcompatibility'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SparePartReservation',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False, unique=True)),
+                ('quantity', models.PositiveIntegerField(help_text='Number of units reserved')),
+                ('holder', models.CharField(help_text='Ticket, change or person holding the reservation', max_length=100)),
+                ('expires', models.DateTimeField(blank=True, help_text='When the reservation is released unless extended or used (never, if empty)', null=True)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('consumed', 'Consumed'), ('released', 'Released'), ('expired', 'Expired')], default='active', editable=False, help_text='Active until the parts are checked out (consumed), released or the reservation expires', max_length=20)),
+                ('created', models.DateTimeField(auto_now_add=True, help_text='When the reservation was made')),
+                ('closed', models.DateTimeField(blank=True, editable=False, help_text='When the reservation was consumed, released or expired', null=True)),
+                ('notes', models.TextField(blank=True)),
+                ('spare_part_inventory', models.ForeignKey(help_text='Inventory record the parts are reserved from', on_delete=django.db.models.deletion.PROTECT, related_name='reservations', to='nautobot_spare_parts.sparepartinventory')),
+                ('user', models.ForeignKey(blank=True, help_text='User who made the reservation', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='spare_part_reservations', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Spare Part Reservation',
+                'verbose_name_plural': 'Spare Part Reservations',
+                'ordering': ['expires'],
+                'indexes': [models.Index(fields=['spare_part_inventory', 'status'], name='sparepartresv_inv_status_idx'), models.Index(condition=models.Q(('status', 'active')), fields=['expires'], name='sparepartresv_active_idx'), models.Index(fields=['holder'], name='sparepartresv_holder_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-17 23:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nautobot_spare_parts', '0012_sparepartreservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sparepartinventory',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Incremented on every change to the record (maintained automatically)'),
+        ),
+    ]
@@ -2,16 +2,90 @@
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, TruncDate
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 
-from nautobot.apps.models import PrimaryModel, BaseModel
+from nautobot.apps.models import BaseManager, BaseModel, PrimaryModel, RestrictedQuerySet
 from nautobot.dcim.models import Device, DeviceType, Location, Manufacturer
 from nautobot.extras.utils import extras_features
 
 
 User = get_user_model()
 
+STOCK_TOTAL_FIELDS = (
+    "total_quantity",
+    "total_reserved",
+    "total_available",
+    "location_count",
+    "low_stock_location_count",
+    "last_movement",
+)
+
+
+def build_search_document(*values):
+    """Return the search document for a record's searchable values: the values lowercased, one per line.
+
+    Searches match lowercased terms against the document with a case-sensitive ``contains`` (see search.py).
+    """
+    return "\n".join("" if value is None else str(value) for value in values).lower()
+
+
+def compact_part_number(part_number):
+    """Return ``part_number`` without separators, so "450AEIE" finds "450-AEIE"."""
+    return "".join(char for char in part_number if char.isalnum())
+
+
+def is_low_stock_level(quantity_on_hand, quantity_reserved, minimum_quantity):
+    """Return whether the given stock levels are at or below the minimum quantity."""
+    return quantity_on_hand - quantity_reserved <= minimum_quantity
+
+
+class VersionConflict(ValidationError):
+    """Raised when a write expected an inventory record at a version it is no longer at."""
+
+    def __init__(self, inventory, version):
+        """Describe the conflict; ``version`` is the record's current version."""
+        self.version = version
+        super().__init__(
+            f"{inventory} has been changed by someone else (it is now at version {version}); reload it and retry"
+        )
+
+
+def stock_crossings(changes):
+    """Return the inventory records among ``changes`` whose available stock has run out or come back.
+
+    ``changes`` is an iterable of ``(inventory, quantity_on_hand_before, quantity_reserved_before)`` where
+    ``inventory`` holds the new levels.
+    """
+    return [
+        inventory
+        for inventory, on_hand_before, reserved_before in changes
+        if (inventory.quantity_available > 0) != (on_hand_before - reserved_before > 0)
+    ]
+
+
+class SparePartTypeQuerySet(RestrictedQuerySet):
+    """QuerySet for SparePartType."""
+
+    def with_stock_totals(self):
+        """Annotate each part type with its stock totals across all locations.
+
+        Adds ``total_quantity`` (on hand), ``total_reserved``, ``total_available``, ``location_count`` (locations
+        holding stock), ``low_stock_location_count`` and ``last_movement``, read from the part type's
+        SparePartStockRollup through a one-to-one join.
+        """
+        return self.annotate(
+            total_quantity=Coalesce(models.F("stock_rollup__total_on_hand"), 0),
+            total_reserved=Coalesce(models.F("stock_rollup__total_reserved"), 0),
+            total_available=Coalesce(models.F("stock_rollup__total_available"), 0),
+            location_count=Coalesce(models.F("stock_rollup__stocked_location_count"), 0),
+            low_stock_location_count=Coalesce(models.F("stock_rollup__low_stock_location_count"), 0),
+            last_movement=models.F("stock_rollup__last_movement"),
+        )
+
 
 @extras_features(
     "custom_fields",
@@ -74,6 +148,16 @@ class SparePartType(PrimaryModel):
         blank=True,
         help_text="Device types this part is compatible with",
     )
+    search_document = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Searchable text of the part type (maintained automatically)",
+    )
+
+    SEARCH_DOCUMENT_SOURCE_FIELDS = ("name", "part_number", "description", "manufacturer")
+
+    objects = BaseManager.from_queryset(SparePartTypeQuerySet)()
 
     class Meta:
         """Meta class for SparePartType."""
@@ -95,15 +179,57 @@ class SparePartType(PrimaryModel):
             return reverse("plugins-api:nautobot_spare_parts-api:spareparttype-detail", kwargs={"pk": self.pk})
         return reverse("plugins:nautobot_spare_parts:spareparttype", args=[self.pk])
 
+    def refresh_search_document(self):
+        """Recompute the stored ``search_document`` from the name, part number, description and manufacturer.
+
+        Called by save() and by the importer; code that changes these fields with ``QuerySet.update()`` must set
+        the document itself.
+        """
+        self.search_document = build_search_document(
+            self.name,
+            self.part_number,
+            compact_part_number(self.part_number),
+            self.description,
+            self.manufacturer.name if self.manufacturer_id else "",
+        )
+
+    def save(self, *args, **kwargs):
+        """Keep the stored search document in line with the fields being saved."""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.refresh_search_document()
+        elif set(update_fields) & set(self.SEARCH_DOCUMENT_SOURCE_FIELDS):
+            self.refresh_search_document()
+            kwargs["update_fields"] = set(update_fields) | {"search_document"}
+        super().save(*args, **kwargs)
+
     def clean(self):
         """Validate model data."""
         super().clean()
         if self.part_number and not self.manufacturer:
             raise ValidationError({"manufacturer": "Manufacturer is required when part number is specified"})
 
+    @cached_property
+    def stock_totals(self):
+        """Stock totals across all locations, read from the ``with_stock_totals()`` annotations when present."""
+        if all(hasattr(self, name) for name in STOCK_TOTAL_FIELDS):
+            return {name: getattr(self, name) for name in STOCK_TOTAL_FIELDS}
+        try:
+            rollup = self.stock_rollup
+        except SparePartStockRollup.DoesNotExist:
+            rollup = SparePartStockRollup(spare_part_type=self)
+        return {
+            "total_quantity": rollup.total_on_hand,
+            "total_reserved": rollup.total_reserved,
+            "total_available": rollup.total_available,
+            "location_count": rollup.stocked_location_count,
+            "low_stock_location_count": rollup.low_stock_location_count,
+            "last_movement": rollup.last_movement,
+        }
+
     def get_total_quantity(self):
         """Get total quantity across all locations."""
-        return self.inventory_records.aggregate(total=models.Sum("quantity_on_hand"))["total"] or 0
+        return self.stock_totals["total_quantity"]
 
     def get_locations_with_stock(self):
         """Get list of locations that have this part in stock."""
@@ -159,12 +285,65 @@ class SparePartInventory(PrimaryModel):
         help_text="Specific storage location (e.g., Rack A, Shelf 3)",
     )
     notes = models.TextField(blank=True)
+    quantity_available = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text="On hand minus reserved (maintained automatically)",
+    )
+    is_low_stock = models.BooleanField(
+        default=True,
+        editable=False,
+        help_text="Available quantity is at or below the minimum quantity (maintained automatically)",
+    )
+    needs_reorder = models.BooleanField(
+        default=False,
+        editable=False,
+        help_text="Low on stock and has a reorder quantity set (maintained automatically)",
+    )
+    search_document = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Searchable text of the record (maintained automatically)",
+    )
+    version = models.PositiveIntegerField(
+        default=1,
+        editable=False,
+        help_text="Incremented on every change to the record (maintained automatically)",
+    )
+
+    # Versions a save() may overwrite; set it for a compare-and-set save that raises VersionConflict otherwise.
+    expected_versions = None
+
+    STOCK_STATE_FIELDS = ("quantity_available", "is_low_stock", "needs_reorder")
+    STOCK_STATE_SOURCE_FIELDS = ("quantity_on_hand", "quantity_reserved", "minimum_quantity", "reorder_quantity")
+    SEARCH_DOCUMENT_SOURCE_FIELDS = ("location", "storage_location_detail")
+    # What the part type rollups count of a record (see SparePartStockRollup.apply_record_change).
+    ROLLUP_SOURCE_FIELDS = ("spare_part_type", "quantity_on_hand", "quantity_reserved", "is_low_stock")
+    # What the compatibility index holds of a record (see SparePartCompatibility).
+    COMPATIBILITY_SOURCE_FIELDS = ("spare_part_type", "location", "quantity_available")
+
+    # The ROLLUP_SOURCE_FIELDS and COMPATIBILITY_SOURCE_FIELDS values stored in the row when save() or delete()
+    # locked it, or None for a new record.
+    _stored_stock = None
 
     class Meta:
         """Meta class for SparePartInventory."""
 
         ordering = ["location", "spare_part_type"]
         unique_together = [["spare_part_type", "location"]]
+        indexes = [
+            models.Index(
+                fields=["location", "spare_part_type"],
+                condition=models.Q(is_low_stock=True),
+                name="sparepartinv_low_stock_idx",
+            ),
+            models.Index(
+                fields=["location", "spare_part_type"],
+                condition=models.Q(needs_reorder=True),
+                name="sparepartinv_reorder_idx",
+            ),
+        ]
         verbose_name = "Spare Part Inventory"
         verbose_name_plural = "Spare Part Inventories"
 
@@ -172,26 +351,89 @@ class SparePartInventory(PrimaryModel):
         """String representation."""
         return f"{self.spare_part_type} at {self.location}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the part type and low stock state the record was loaded with.
+
+        The part type lets a reassignment invalidate the nearest-stock trees of both part types; the low stock state
+        lets alerts fire only when it changes.
+        """
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_spare_part_type_id = instance.__dict__.get("spare_part_type_id")
+        instance._loaded_is_low_stock = instance.__dict__.get("is_low_stock", False)
+        return instance
+
     def get_absolute_url(self, api=False):
         """Return absolute URL for detail view."""
         if api:
             return reverse("plugins-api:nautobot_spare_parts-api:sparepartinventory-detail", kwargs={"pk": self.pk})
         return reverse("plugins:nautobot_spare_parts:sparepartinventory", args=[self.pk])
 
-    @property
-    def quantity_available(self):
-        """Compute available quantity (on hand minus reserved)."""
-        return self.quantity_on_hand - self.quantity_reserved
+    def refresh_stock_state(self):
+        """Recompute the stored ``quantity_available``, ``is_low_stock`` and ``needs_reorder`` fields.
 
-    @property
-    def is_low_stock(self):
-        """Check if inventory is at or below minimum quantity."""
-        return self.quantity_available <= self.minimum_quantity
+        Called by save() and by the stock engine; code that changes quantities with ``QuerySet.update()`` must
+        set these fields itself.
+        """
+        self.quantity_available = self.quantity_on_hand - self.quantity_reserved
+        self.is_low_stock = is_low_stock_level(self.quantity_on_hand, self.quantity_reserved, self.minimum_quantity)
+        self.needs_reorder = self.is_low_stock and self.reorder_quantity > 0
 
-    @property
-    def needs_reorder(self):
-        """Check if part needs to be reordered."""
-        return self.is_low_stock and self.reorder_quantity > 0
+    def refresh_search_document(self):
+        """Recompute the stored ``search_document`` from the location name and storage location detail.
+
+        Called by save() and by the importer. The part type is searched through its own document rather than
+        copied in here.
+        """
+        self.search_document = build_search_document(self.location.name, self.storage_location_detail)
+
+    def save(self, *args, **kwargs):
+        """Keep the stored stock state, search document and version in line with the fields being saved.
+
+        An existing row is locked to move its version on, so concurrent saves can't give out the same version. With
+        ``expected_versions`` set, the save raises VersionConflict unless the locked row is at one of them.
+        """
+        self.refresh_stock_state()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None:
+            self.refresh_search_document()
+        else:
+            update_fields = set(update_fields)
+            if update_fields & set(self.STOCK_STATE_SOURCE_FIELDS):
+                update_fields |= set(self.STOCK_STATE_FIELDS)
+            if update_fields & set(self.SEARCH_DOCUMENT_SOURCE_FIELDS):
+                self.refresh_search_document()
+                update_fields.add("search_document")
+            kwargs["update_fields"] = update_fields | {"version"}
+
+        with transaction.atomic():
+            stored = None if self._state.adding else self._lock_row()
+            if stored is not None:
+                current = stored.pop("version")
+                if self.expected_versions is not None and current not in self.expected_versions:
+                    raise VersionConflict(self, current)
+                self.version = current + 1
+            self._stored_stock = stored
+            super().save(*args, **kwargs)
+        self.expected_versions = None
+
+    def delete(self, *args, **kwargs):
+        """Delete the record, locking its row first so the rollups give back the stock it actually held."""
+        with transaction.atomic():
+            stored = self._lock_row()
+            if stored is not None:
+                stored.pop("version")
+            self._stored_stock = stored
+            return super().delete(*args, **kwargs)
+
+    def _lock_row(self):
+        """Lock the record's row and return its stored version and source fields (see _stored_stock), or None."""
+        return (
+            SparePartInventory.objects.select_for_update()
+            .filter(pk=self.pk)
+            .values("version", *dict.fromkeys(self.ROLLUP_SOURCE_FIELDS + self.COMPATIBILITY_SOURCE_FIELDS))
+            .first()
+        )
 
     def clean(self):
         """Validate model data."""
@@ -205,86 +447,46 @@ class SparePartInventory(PrimaryModel):
         if self.quantity_reserved < 0:
             raise ValidationError({"quantity_reserved": "Reserved quantity cannot be negative"})
 
-    def allocate(self, quantity, reason, user=None):
-        """Reserve parts for use."""
-        if quantity <= 0:
-            raise ValidationError("Allocation quantity must be positive")
-        if self.quantity_available < quantity:
-            raise ValidationError(
-                f"Cannot allocate {quantity} units. Only {self.quantity_available} available."
-            )
-
-        quantity_before = self.quantity_reserved
-        self.quantity_reserved += quantity
-        self.validated_save()
-
-        # Create transaction record
-        SparePartTransaction.objects.create(
-            spare_part_inventory=self,
-            transaction_type="allocation",
-            quantity=quantity,
-            quantity_before=quantity_before,
-            quantity_after=self.quantity_reserved,
-            user=user,
-            reason=reason,
-        )
+    def allocate(self, quantity, reason, user=None, notes="", holder=None):
+        """Reserve parts for use, as an open-ended SparePartReservation held by ``holder`` (``reason`` by default)."""
+        # The stock engine imports this module, so it is imported lazily here
+        from nautobot_spare_parts.stock import reserve_stock
 
+        holder = (holder or reason)[: SparePartReservation._meta.get_field("holder").max_length]
+        reserve_stock(self, quantity, holder, None, user=user, notes=notes, reason=reason)
         return self
 
-    def deallocate(self, quantity, reason, user=None):
-        """Release reserved parts."""
+    def deallocate(self, quantity, reason, user=None, notes=""):
+        """Release reserved parts, drawing down the record's active reservations first."""
+        from nautobot_spare_parts.stock import release_reserved_units
+
         if quantity <= 0:
             raise ValidationError("Deallocation quantity must be positive")
-        if self.quantity_reserved < quantity:
-            raise ValidationError(
-                f"Cannot deallocate {quantity} units. Only {self.quantity_reserved} reserved."
-            )
+        release_reserved_units(self, quantity, reason, user=user, notes=notes)
+        return self
 
-        quantity_before = self.quantity_reserved
-        self.quantity_reserved -= quantity
-        self.validated_save()
-
-        # Create transaction record
-        SparePartTransaction.objects.create(
-            spare_part_inventory=self,
-            transaction_type="deallocation",
-            quantity=-quantity,
-            quantity_before=quantity_before,
-            quantity_after=self.quantity_reserved,
-            user=user,
-            reason=reason,
-        )
+    def adjust_stock(
+        self, quantity, transaction_type, reason, user=None, related_device=None, notes="", expected_versions=None
+    ):
+        """Modify stock levels and create transaction record.
 
-        return self
+        With ``expected_versions``, raises VersionConflict unless the record is still at one of those versions.
+        """
+        from nautobot_spare_parts.stock import apply_stock_movement
 
-    def adjust_stock(self, quantity, transaction_type, reason, user=None, related_device=None):
-        """Modify stock levels and create transaction record."""
         if transaction_type not in ["check_in", "check_out", "adjustment"]:
             raise ValidationError("Invalid transaction type for stock adjustment")
 
-        quantity_before = self.quantity_on_hand
-        new_quantity = quantity_before + quantity
-
-        if new_quantity < 0:
-            raise ValidationError(
-                f"Cannot adjust stock by {quantity}. Would result in negative inventory."
-            )
-
-        self.quantity_on_hand = new_quantity
-        self.validated_save()
-
-        # Create transaction record
-        SparePartTransaction.objects.create(
-            spare_part_inventory=self,
-            transaction_type=transaction_type,
-            quantity=quantity,
-            quantity_before=quantity_before,
-            quantity_after=self.quantity_on_hand,
+        apply_stock_movement(
+            self,
+            transaction_type,
+            quantity,
+            reason,
             user=user,
-            reason=reason,
             related_device=related_device,
+            notes=notes,
+            expected_versions=expected_versions,
         )
-
         return self
 
 
@@ -333,6 +535,20 @@ class SparePartTransaction(BaseModel):
         help_text="Device associated with this transaction",
     )
     notes = models.TextField(blank=True)
+    transfer_source = models.OneToOneField(
+        "self",
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="transfer_destination",
+        help_text="Outgoing transfer transaction that this incoming transfer pairs with",
+    )
+    search_document = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Searchable text of the transaction (maintained automatically)",
+    )
 
     class Meta:
         """Meta class for SparePartTransaction."""
@@ -341,6 +557,7 @@ class SparePartTransaction(BaseModel):
         indexes = [
             models.Index(fields=["spare_part_inventory", "timestamp"]),
             models.Index(fields=["transaction_type"]),
+            models.Index(fields=["timestamp", "id"], name="sparepartledger_ts_id_idx"),
         ]
         verbose_name = "Spare Part Transaction"
         verbose_name_plural = "Spare Part Transactions"
@@ -354,3 +571,709 @@ class SparePartTransaction(BaseModel):
         if api:
             return reverse("plugins-api:nautobot_spare_parts-api:spareparttransaction-detail", kwargs={"pk": self.pk})
         return reverse("plugins:nautobot_spare_parts:spareparttransaction", args=[self.pk])
+
+    def refresh_search_document(self):
+        """Recompute the stored ``search_document`` from the reason and notes.
+
+        Called by save(); code that creates transactions with ``bulk_create()`` must call it itself. The inventory
+        record is searched through its own document rather than copied in here.
+        """
+        self.search_document = build_search_document(self.reason, self.notes)
+
+    def save(self, *args, **kwargs):
+        """Fill in the search document before saving."""
+        self.refresh_search_document()
+        super().save(*args, **kwargs)
+
+
+class SparePartStockRollup(BaseModel):
+    """Denormalized stock totals for one SparePartType across all locations.
+
+    Kept up to date with deltas, by the stock engine in the same transaction as each movement and by the
+    SparePartInventory save/delete signal handlers, so catalog reads are a single one-to-one lookup however many
+    locations stock the part. rebuild() recounts them from the inventory records.
+    """
+
+    spare_part_type = models.OneToOneField(
+        SparePartType,
+        on_delete=models.CASCADE,
+        related_name="stock_rollup",
+    )
+    total_on_hand = models.PositiveIntegerField(default=0)
+    total_reserved = models.PositiveIntegerField(default=0)
+    total_available = models.IntegerField(default=0)
+    stocked_location_count = models.PositiveIntegerField(default=0)
+    low_stock_location_count = models.PositiveIntegerField(default=0)
+    last_movement = models.DateTimeField(blank=True, null=True)
+
+    COUNTER_FIELDS = (
+        "total_on_hand",
+        "total_reserved",
+        "total_available",
+        "stocked_location_count",
+        "low_stock_location_count",
+    )
+
+    class Meta:
+        """Meta class for SparePartStockRollup."""
+
+        verbose_name = "Spare Part Stock Rollup"
+        verbose_name_plural = "Spare Part Stock Rollups"
+
+    def __str__(self):
+        """String representation."""
+        return f"Stock of {self.spare_part_type}"
+
+    @classmethod
+    def apply_changes(cls, changes, timestamp):
+        """Apply the effect of stock movements to the rollups of the affected part types.
+
+        ``changes`` is an iterable of ``(inventory, quantity_on_hand_before, quantity_reserved_before)`` where
+        ``inventory`` holds the new levels. Rollups are updated with ``F()`` expressions in part type order, so
+        concurrent batches serialize on the rollup rows without lost updates or deadlocks. Part types without a
+        rollup row yet are recounted instead.
+        """
+        deltas = {}
+        for inventory, on_hand_before, reserved_before in changes:
+            delta = deltas.setdefault(inventory.spare_part_type_id, dict.fromkeys(cls.COUNTER_FIELDS, 0))
+            cls._add_counts(delta, inventory.quantity_on_hand, inventory.quantity_reserved, inventory.is_low_stock)
+            cls._add_counts(
+                delta,
+                on_hand_before,
+                reserved_before,
+                is_low_stock_level(on_hand_before, reserved_before, inventory.minimum_quantity),
+                sign=-1,
+            )
+        cls._apply_deltas(deltas, last_movement=timestamp)
+
+    @classmethod
+    def apply_record_change(cls, before, after):
+        """Apply the creation, edit or deletion of an inventory record to the rollups of its part types.
+
+        ``before`` and ``after`` map SparePartInventory.ROLLUP_SOURCE_FIELDS to the values stored in the record's
+        row before and after the change; ``before`` is None for a new record and ``after`` None for a deleted one.
+        The record's old counts are taken off its old part type and the new ones added to its new part type, as
+        for apply_changes(). ``last_movement`` is left alone, as no stock moved.
+        """
+        deltas = {}
+        for values, sign in ((before, -1), (after, 1)):
+            if values is not None:
+                delta = deltas.setdefault(values["spare_part_type"], dict.fromkeys(cls.COUNTER_FIELDS, 0))
+                cls._add_counts(
+                    delta, values["quantity_on_hand"], values["quantity_reserved"], values["is_low_stock"], sign=sign
+                )
+        cls._apply_deltas(deltas)
+
+    @staticmethod
+    def _add_counts(delta, quantity_on_hand, quantity_reserved, is_low_stock, sign=1):
+        """Add (or with ``sign=-1`` take off) what one inventory record counts for in its part type's rollup."""
+        delta["total_on_hand"] += sign * quantity_on_hand
+        delta["total_reserved"] += sign * quantity_reserved
+        delta["total_available"] += sign * (quantity_on_hand - quantity_reserved)
+        delta["stocked_location_count"] += sign * int(quantity_on_hand > 0)
+        delta["low_stock_location_count"] += sign * int(is_low_stock)
+
+    @classmethod
+    def _apply_deltas(cls, deltas, **values):
+        """Add ``{part type ID: {counter field: delta}}`` to the stored rollups, also setting ``values`` on them."""
+        missing = []
+        for type_id in sorted(deltas, key=str):
+            updates = {field: models.F(field) + value for field, value in deltas[type_id].items() if value}
+            if not updates and not values:
+                continue
+            updated = cls.objects.filter(spare_part_type_id=type_id).update(**values, **updates)
+            if not updated:
+                missing.append(type_id)
+        if missing:
+            cls.rebuild(missing)
+
+    @classmethod
+    def compute(cls, spare_part_type_ids, include_last_movement=True):
+        """Count the rollup values for the given part types from their inventory records (and ledger)."""
+        values = {type_id: dict.fromkeys(cls.COUNTER_FIELDS, 0) for type_id in spare_part_type_ids}
+        low_stock = models.Q(is_low_stock=True)
+        totals = (
+            SparePartInventory.objects.filter(spare_part_type__in=spare_part_type_ids)
+            .order_by()
+            .values("spare_part_type")
+            .annotate(
+                total_on_hand=Coalesce(models.Sum("quantity_on_hand"), 0),
+                total_reserved=Coalesce(models.Sum("quantity_reserved"), 0),
+                stocked_location_count=models.Count("pk", filter=models.Q(quantity_on_hand__gt=0)),
+                low_stock_location_count=models.Count("pk", filter=low_stock),
+            )
+        )
+        for row in totals:
+            type_values = values[row.pop("spare_part_type")]
+            type_values.update(row)
+            type_values["total_available"] = row["total_on_hand"] - row["total_reserved"]
+
+        if include_last_movement:
+            for type_values in values.values():
+                type_values["last_movement"] = None
+            last_movements = (
+                SparePartTransaction.objects.filter(spare_part_inventory__spare_part_type__in=spare_part_type_ids)
+                .order_by()
+                .values_list("spare_part_inventory__spare_part_type")
+                .annotate(last=models.Max("timestamp"))
+            )
+            for type_id, last in last_movements:
+                values[type_id]["last_movement"] = last
+            archived_movements = (
+                SparePartTransactionArchive.objects.filter(
+                    spare_part_inventory__spare_part_type__in=spare_part_type_ids
+                )
+                .order_by()
+                .values_list("spare_part_inventory__spare_part_type")
+                .annotate(last=models.Max("timestamp"))
+            )
+            for type_id, last in archived_movements:
+                if values[type_id]["last_movement"] is None:
+                    values[type_id]["last_movement"] = last
+        return values
+
+    @classmethod
+    def rebuild(cls, spare_part_type_ids=None, include_last_movement=False):
+        """Recount and store the rollups for the given part types (all part types by default).
+
+        The existing rollup rows are locked before counting, so a concurrent stock movement either lands before
+        the count or applies its delta after the rebuild; neither is lost. ``last_movement`` is only recounted
+        from the ledger when ``include_last_movement`` is set. Returns the number of rollups written.
+        """
+        with transaction.atomic():
+            if spare_part_type_ids is None:
+                spare_part_type_ids = list(SparePartType.objects.values_list("pk", flat=True))
+            existing = {
+                rollup.spare_part_type_id: rollup
+                for rollup in cls.objects.select_for_update().filter(spare_part_type_id__in=spare_part_type_ids)
+            }
+            values = cls.compute(spare_part_type_ids, include_last_movement=include_last_movement)
+            fields = list(cls.COUNTER_FIELDS) + (["last_movement"] if include_last_movement else [])
+
+            created = []
+            for type_id, type_values in values.items():
+                rollup = existing.get(type_id)
+                if rollup is None:
+                    rollup = cls(spare_part_type_id=type_id)
+                    created.append(rollup)
+                for field, value in type_values.items():
+                    setattr(rollup, field, value)
+
+            if existing:
+                cls.objects.bulk_update(existing.values(), fields, batch_size=1000)
+            if created:
+                cls.objects.bulk_create(created, batch_size=1000, ignore_conflicts=True)
+        return len(values)
+
+    @classmethod
+    def verify(cls, spare_part_type_ids=None):
+        """Compare stored rollups with a fresh count, returning ``(type_id, field, stored, actual)`` mismatches."""
+        if spare_part_type_ids is None:
+            spare_part_type_ids = list(SparePartType.objects.values_list("pk", flat=True))
+        stored = {
+            rollup.spare_part_type_id: rollup
+            for rollup in cls.objects.filter(spare_part_type_id__in=spare_part_type_ids)
+        }
+        mismatches = []
+        for type_id, type_values in cls.compute(spare_part_type_ids).items():
+            rollup = stored.get(type_id)
+            for field, actual in type_values.items():
+                value = getattr(rollup, field) if rollup is not None else None
+                if value != actual:
+                    mismatches.append((type_id, field, value, actual))
+        return mismatches
+
+
+class SparePartStockCheckpoint(BaseModel):
+    """A snapshot of the stock levels of every inventory record at one moment.
+
+    Historical ("as of") stock levels are worked out from the nearest checkpoint plus the ledger transactions
+    between it and the requested time, instead of replaying the whole ledger.
+    """
+
+    timestamp = models.DateTimeField(db_index=True, help_text="Moment the stock levels were recorded")
+    inventory_count = models.PositiveIntegerField(default=0, help_text="Number of inventory records recorded")
+
+    class Meta:
+        """Meta class for SparePartStockCheckpoint."""
+
+        ordering = ["-timestamp"]
+        get_latest_by = "timestamp"
+        verbose_name = "Spare Part Stock Checkpoint"
+        verbose_name_plural = "Spare Part Stock Checkpoints"
+
+    def __str__(self):
+        """String representation."""
+        return f"Stock checkpoint at {self.timestamp:%Y-%m-%d %H:%M:%S}"
+
+
+class SparePartStockCheckpointEntry(BaseModel):
+    """The stock levels of one inventory record at a SparePartStockCheckpoint."""
+
+    checkpoint = models.ForeignKey(
+        SparePartStockCheckpoint,
+        on_delete=models.CASCADE,
+        related_name="entries",
+    )
+    spare_part_inventory = models.ForeignKey(
+        SparePartInventory,
+        on_delete=models.CASCADE,
+        related_name="checkpoint_entries",
+    )
+    quantity_on_hand = models.PositiveIntegerField()
+    quantity_reserved = models.PositiveIntegerField()
+
+    class Meta:
+        """Meta class for SparePartStockCheckpointEntry."""
+
+        unique_together = [["checkpoint", "spare_part_inventory"]]
+        verbose_name = "Spare Part Stock Checkpoint Entry"
+        verbose_name_plural = "Spare Part Stock Checkpoint Entries"
+
+    def __str__(self):
+        """String representation."""
+        return f"{self.spare_part_inventory} at {self.checkpoint.timestamp:%Y-%m-%d %H:%M:%S}"
+
+
+class SparePartTransactionArchive(BaseModel):
+    """A SparePartTransaction moved out of the live ledger once it passed the retention horizon.
+
+    Archived rows keep the primary key they had in the live ledger, so references to them stay meaningful.
+    """
+
+    spare_part_inventory = models.ForeignKey(
+        SparePartInventory,
+        on_delete=models.PROTECT,
+        related_name="archived_transactions",
+        help_text="Inventory record this transaction affects",
+    )
+    transaction_type = models.CharField(
+        max_length=50,
+        choices=SparePartTransaction.TRANSACTION_TYPE_CHOICES,
+        help_text="Type of transaction",
+    )
+    quantity = models.IntegerField(help_text="Amount changed (positive or negative)")
+    quantity_before = models.PositiveIntegerField(help_text="Stock level before transaction")
+    quantity_after = models.PositiveIntegerField(help_text="Stock level after transaction")
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="archived_spare_part_transactions",
+        help_text="User who performed the transaction",
+    )
+    timestamp = models.DateTimeField(help_text="When the transaction occurred")
+    reason = models.TextField(help_text="Reason for the transaction")
+    related_device = models.ForeignKey(
+        Device,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="archived_spare_part_transactions",
+        help_text="Device associated with this transaction",
+    )
+    notes = models.TextField(blank=True)
+    transfer_source = models.UUIDField(
+        blank=True,
+        null=True,
+        help_text="ID of the outgoing transfer transaction that this incoming transfer pairs with",
+    )
+    search_document = models.TextField(
+        blank=True,
+        default="",
+        editable=False,
+        help_text="Searchable text of the transaction, as it was in the live ledger",
+    )
+    archived = models.DateTimeField(auto_now_add=True, help_text="When the transaction was archived")
+
+    # Columns copied from the live ledger, as SparePartTransaction attribute names.
+    ARCHIVED_FIELDS = (
+        "id",
+        "spare_part_inventory_id",
+        "transaction_type",
+        "quantity",
+        "quantity_before",
+        "quantity_after",
+        "user_id",
+        "timestamp",
+        "reason",
+        "related_device_id",
+        "notes",
+        "transfer_source_id",
+        "search_document",
+    )
+
+    class Meta:
+        """Meta class for SparePartTransactionArchive."""
+
+        ordering = ["-timestamp"]
+        indexes = [
+            models.Index(fields=["spare_part_inventory", "timestamp"], name="sparepartarchive_inv_ts_idx"),
+            models.Index(fields=["timestamp"], name="sparepartarchive_ts_idx"),
+        ]
+        verbose_name = "Archived Spare Part Transaction"
+        verbose_name_plural = "Archived Spare Part Transactions"
+
+    def __str__(self):
+        """String representation."""
+        return f"{self.get_transaction_type_display()} - {self.spare_part_inventory} ({self.quantity:+d})"
+
+    def get_absolute_url(self, api=False):
+        """Return absolute URL for the API detail view (archived transactions have no UI view)."""
+        return reverse(
+            "plugins-api:nautobot_spare_parts-api:spareparttransactionarchive-detail",
+            kwargs={"pk": self.pk},
+        )
+
+
+class SparePartDailyUsage(BaseModel):
+    """Ledger activity of one inventory record for one transaction type on one day.
+
+    Written alongside the ledger rows it summarizes, so usage trends can be read without scanning the ledger.
+    ``units_in`` and ``units_out`` are the summed positive and negative transaction quantities.
+    """
+
+    date = models.DateField(help_text="Day of the transactions (in the server's time zone)")
+    spare_part_inventory = models.ForeignKey(
+        SparePartInventory,
+        on_delete=models.CASCADE,
+        related_name="daily_usage",
+    )
+    transaction_type = models.CharField(
+        max_length=50,
+        choices=SparePartTransaction.TRANSACTION_TYPE_CHOICES,
+    )
+    transaction_count = models.PositiveIntegerField(default=0)
+    units_in = models.PositiveIntegerField(default=0)
+    units_out = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        """Meta class for SparePartDailyUsage."""
+
+        ordering = ["-date"]
+        unique_together = [["spare_part_inventory", "date", "transaction_type"]]
+        indexes = [
+            models.Index(fields=["date"], name="sparepartusage_date_idx"),
+        ]
+        verbose_name = "Spare Part Daily Usage"
+        verbose_name_plural = "Spare Part Daily Usage"
+
+    def __str__(self):
+        """String representation."""
+        return f"{self.get_transaction_type_display()} of {self.spare_part_inventory} on {self.date}"
+
+    def get_absolute_url(self, api=False):
+        """Return absolute URL for the API detail view (usage rows have no UI view)."""
+        return reverse("plugins-api:nautobot_spare_parts-api:sparepartdailyusage-detail", kwargs={"pk": self.pk})
+
+    @classmethod
+    def record(cls, transactions):
+        """Add newly written ledger rows to their daily usage buckets.
+
+        The caller must hold the locks on the affected inventory records (as the stock engine does), which keeps
+        concurrent writers from updating the same buckets.
+        """
+        buckets = {}
+        for txn in transactions:
+            key = (txn.spare_part_inventory_id, timezone.localdate(txn.timestamp), txn.transaction_type)
+            count, units_in, units_out = buckets.get(key, (0, 0, 0))
+            buckets[key] = (count + 1, units_in + max(txn.quantity, 0), units_out + max(-txn.quantity, 0))
+        if not buckets:
+            return
+
+        existing = {
+            (usage.spare_part_inventory_id, usage.date, usage.transaction_type): usage
+            for usage in cls.objects.filter(
+                spare_part_inventory_id__in={inventory_id for inventory_id, _, _ in buckets},
+                date__in={date for _, date, _ in buckets},
+            )
+        }
+        created, updated = [], []
+        for (inventory_id, date, transaction_type), (count, units_in, units_out) in buckets.items():
+            usage = existing.get((inventory_id, date, transaction_type))
+            if usage is None:
+                usage = cls(spare_part_inventory_id=inventory_id, date=date, transaction_type=transaction_type)
+                created.append(usage)
+            else:
+                updated.append(usage)
+            usage.transaction_count += count
+            usage.units_in += units_in
+            usage.units_out += units_out
+
+        if updated:
+            cls.objects.bulk_update(updated, ["transaction_count", "units_in", "units_out"])
+        if created:
+            cls.objects.bulk_create(created)
+
+    @classmethod
+    def rebuild(cls, inventory_ids, start_date=None, end_date=None):
+        """Recount the usage buckets of the given inventory records from the ledger and its archive.
+
+        ``start_date`` and ``end_date`` (inclusive) limit the days recounted. The inventory rows are locked while
+        their buckets are replaced. Returns the number of buckets written.
+        """
+        with transaction.atomic():
+            inventory_ids = list(
+                SparePartInventory.objects.select_for_update()
+                .filter(pk__in=inventory_ids)
+                .order_by("pk")
+                .values_list("pk", flat=True)
+            )
+            dates = {}
+            if start_date is not None:
+                dates["date__gte"] = start_date
+            if end_date is not None:
+                dates["date__lte"] = end_date
+            cls.objects.filter(spare_part_inventory_id__in=inventory_ids, **dates).delete()
+
+            buckets = {}
+            for ledger in (SparePartTransaction.objects.all(), SparePartTransactionArchive.objects.all()):
+                rows = (
+                    ledger.filter(spare_part_inventory_id__in=inventory_ids)
+                    .annotate(date=TruncDate("timestamp"))
+                    .filter(**dates)
+                    .order_by()
+                    .values_list("spare_part_inventory", "date", "transaction_type")
+                    .annotate(
+                        transaction_count=models.Count("pk"),
+                        units_in=Coalesce(models.Sum("quantity", filter=models.Q(quantity__gt=0)), 0),
+                        units_out=Coalesce(models.Sum("quantity", filter=models.Q(quantity__lt=0)), 0),
+                    )
+                )
+                for inventory_id, date, transaction_type, count, units_in, units_out in rows:
+                    usage = buckets.get((inventory_id, date, transaction_type))
+                    if usage is None:
+                        usage = buckets[(inventory_id, date, transaction_type)] = cls(
+                            spare_part_inventory_id=inventory_id,
+                            date=date,
+                            transaction_type=transaction_type,
+                        )
+                    usage.transaction_count += count
+                    usage.units_in += units_in
+                    usage.units_out -= units_out
+            cls.objects.bulk_create(buckets.values(), batch_size=1000)
+        return len(buckets)
+
+
+class SparePartForecast(BaseModel):
+    """Forecast demand and recommended stock levels for one inventory record.
+
+    Written by nautobot_spare_parts.forecasting.forecast_demand() from the record's check-out history; the
+    recommendations are suggestions and don't change the record's own minimum and reorder quantities.
+    """
+
+    spare_part_inventory = models.OneToOneField(
+        SparePartInventory,
+        on_delete=models.CASCADE,
+        related_name="forecast",
+    )
+    computed = models.DateTimeField(help_text="When the forecast was made")
+    daily_usage = models.FloatField(help_text="Average units checked out per day")
+    daily_usage_deviation = models.FloatField(help_text="Standard deviation of the units checked out per day")
+    safety_stock = models.PositiveIntegerField(help_text="Units held back to cover variable demand over the lead time")
+    recommended_minimum_quantity = models.PositiveIntegerField(
+        help_text="Stock level at which to reorder: lead time demand plus safety stock"
+    )
+    recommended_reorder_quantity = models.PositiveIntegerField(
+        help_text="Units to order: the expected use over the cover period"
+    )
+    projected_stockout = models.DateField(
+        null=True,
+        blank=True,
+        help_text="Day the available stock runs out at the current rate of use (empty if not in sight)",
+    )
+
+    class Meta:
+        """Meta class for SparePartForecast."""
+
+        ordering = ["projected_stockout"]
+        indexes = [
+            models.Index(fields=["projected_stockout"], name="sparepartforecast_stockout_idx"),
+        ]
+        verbose_name = "Spare Part Forecast"
+        verbose_name_plural = "Spare Part Forecasts"
+
+    def __str__(self):
+        """String representation."""
+        return f"Forecast for {self.spare_part_inventory}"
+
+    def get_absolute_url(self, api=False):
+        """Return absolute URL for the API detail view (forecasts have no UI view)."""
+        return reverse("plugins-api:nautobot_spare_parts-api:sparepartforecast-detail", kwargs={"pk": self.pk})
+
+
+class SparePartCompatibility(BaseModel):
+    """One in-stock inventory record of a part type that fits one device type.
+
+    The compatibility index: SparePartType.compatible_device_types joined with the inventory records that have
+    stock available, kept so "which spares fit this device" is an indexed lookup by device type. Entries only
+    change when a record runs out or comes back into stock (the stock engine, or a save), when a record is created,
+    moved to another part type or location, imported or deleted, or when a part type's compatible device types
+    change (the signal handlers and the importer).
+    """
+
+    device_type = models.ForeignKey(
+        DeviceType,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    spare_part_type = models.ForeignKey(
+        SparePartType,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+    spare_part_inventory = models.ForeignKey(
+        SparePartInventory,
+        on_delete=models.CASCADE,
+        related_name="compatibility_entries",
+    )
+
+    class Meta:
+        """Meta class for SparePartCompatibility."""
+
+        unique_together = [["device_type", "spare_part_inventory"]]
+        indexes = [
+            models.Index(fields=["device_type", "location"], name="sparepartcompat_dt_loc_idx"),
+            models.Index(fields=["spare_part_type"], name="sparepartcompat_type_idx"),
+        ]
+        verbose_name = "Spare Part Compatibility"
+        verbose_name_plural = "Spare Part Compatibilities"
+
+    def __str__(self):
+        """String representation."""
+        return f"{self.spare_part_inventory} fits {self.device_type}"
+
+    @classmethod
+    def apply_changes(cls, changes):
+        """Add or drop the entries of inventory records a stock movement has emptied or restocked.
+
+        ``changes`` is as for stock_crossings().
+        """
+        crossed = [inventory.pk for inventory in stock_crossings(changes)]
+        if crossed:
+            cls.rebuild(inventory_ids=crossed)
+
+    @classmethod
+    def rebuild(cls, spare_part_type_ids=None, inventory_ids=None):
+        """Recompute the entries of the given part types and/or inventory records (all of them by default).
+
+        Returns the number of entries written.
+        """
+        entries = cls.objects.all()
+        inventories = SparePartInventory.objects.filter(quantity_available__gt=0)
+        if spare_part_type_ids is not None:
+            entries = entries.filter(spare_part_type__in=spare_part_type_ids)
+            inventories = inventories.filter(spare_part_type__in=spare_part_type_ids)
+        if inventory_ids is not None:
+            entries = entries.filter(spare_part_inventory__in=inventory_ids)
+            inventories = inventories.filter(pk__in=inventory_ids)
+
+        with transaction.atomic():
+            entries.delete()
+            stocked = list(inventories.order_by().values_list("pk", "spare_part_type", "location"))
+            device_types = {}
+            through = SparePartType.compatible_device_types.through
+            for type_id, device_type_id in through.objects.filter(
+                spareparttype__in={type_id for _, type_id, _ in stocked}
+            ).values_list("spareparttype", "devicetype"):
+                device_types.setdefault(type_id, []).append(device_type_id)
+            created = [
+                cls(
+                    device_type_id=device_type_id,
+                    spare_part_type_id=type_id,
+                    location_id=location_id,
+                    spare_part_inventory_id=inventory_id,
+                )
+                for inventory_id, type_id, location_id in stocked
+                for device_type_id in device_types.get(type_id, ())
+            ]
+            cls.objects.bulk_create(created, batch_size=1000, ignore_conflicts=True)
+        return len(created)
+
+
+class SparePartReservation(BaseModel):
+    """Units of one inventory record held for a ticket or person until they are used, released or expire.
+
+    Creating a reservation allocates its units and closing one deallocates them, through the stock engine, so the
+    inventory's ``quantity_reserved`` is the sum of its active reservations and every change is on the ledger.
+    SparePartInventory.allocate() makes an open-ended reservation (no expiry). Only a reserved quantity set directly,
+    through the edit form, the API or an import, is held outside any reservation.
+    """
+
+    STATUS_CHOICES = (
+        ("active", "Active"),
+        ("consumed", "Consumed"),
+        ("released", "Released"),
+        ("expired", "Expired"),
+    )
+
+    spare_part_inventory = models.ForeignKey(
+        SparePartInventory,
+        on_delete=models.PROTECT,
+        related_name="reservations",
+        help_text="Inventory record the parts are reserved from",
+    )
+    quantity = models.PositiveIntegerField(help_text="Number of units reserved")
+    holder = models.CharField(
+        max_length=100,
+        help_text="Ticket, change or person holding the reservation",
+    )
+    expires = models.DateTimeField(
+        blank=True,
+        null=True,
+        help_text="When the reservation is released unless extended or used (never, if empty)",
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="active",
+        editable=False,
+        help_text="Active until the parts are checked out (consumed), released or the reservation expires",
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="spare_part_reservations",
+        help_text="User who made the reservation",
+    )
+    created = models.DateTimeField(auto_now_add=True, help_text="When the reservation was made")
+    closed = models.DateTimeField(
+        blank=True,
+        null=True,
+        editable=False,
+        help_text="When the reservation was consumed, released or expired",
+    )
+    notes = models.TextField(blank=True)
+
+    class Meta:
+        """Meta class for SparePartReservation."""
+
+        ordering = ["expires"]
+        indexes = [
+            models.Index(fields=["spare_part_inventory", "status"], name="sparepartresv_inv_status_idx"),
+            models.Index(fields=["expires"], condition=models.Q(status="active"), name="sparepartresv_active_idx"),
+            models.Index(fields=["holder"], name="sparepartresv_holder_idx"),
+        ]
+        verbose_name = "Spare Part Reservation"
+        verbose_name_plural = "Spare Part Reservations"
+
+    def __str__(self):
+        """String representation."""
+        return f"{self.quantity} x {self.spare_part_inventory} for {self.holder}"
+
+    def get_absolute_url(self, api=False):
+        """Return absolute URL for the API detail view (reservations have no UI view)."""
+        return reverse("plugins-api:nautobot_spare_parts-api:sparepartreservation-detail", kwargs={"pk": self.pk})
+
+    @property
+    def is_active(self):
+        """Whether the reservation still holds its units."""
+        return self.status == "active"
@@ -39,6 +39,24 @@ menu_items = (
                         name="Transactions",
                         permissions=["nautobot_spare_parts.view_spareparttransaction"],
                     ),
+                    NavMenuItem(
+                        link="plugins:nautobot_spare_parts:stock_as_of",
+                        name="Historical Stock",
+                        permissions=["nautobot_spare_parts.view_sparepartinventory"],
+                    ),
+                    NavMenuItem(
+                        link="plugins:nautobot_spare_parts:compatible_stock",
+                        name="Compatible Spares",
+                        permissions=["dcim.view_device", "nautobot_spare_parts.view_sparepartinventory"],
+                    ),
+                    NavMenuItem(
+                        link="plugins:nautobot_spare_parts:bulk_import",
+                        name="Bulk Import",
+                        permissions=[
+                            "nautobot_spare_parts.add_spareparttype",
+                            "nautobot_spare_parts.add_sparepartinventory",
+                        ],
+                    ),
                     NavMenuItem(
                         link="plugins:nautobot_spare_parts:low_stock_dashboard",
                         name="Low Stock Alert",
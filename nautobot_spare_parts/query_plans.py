@@ -0,0 +1,66 @@
+"""Related-object loading plans shared by the API and UI views.
+
+A plan is a ``(select_related, prefetch_related)`` pair of lookup lists giving everything needed to render a
+relation without a query per row. Foreign keys are joined; many-to-many relations are prefetched, and those only
+shown as display strings are prefetched with trimmed ``only()`` querysets. Tags are always prefetched whole, as
+the tag manager doesn't accept a custom prefetch queryset.
+"""
+
+from django.db.models import Prefetch
+
+from nautobot.dcim.models import DeviceType
+
+
+def brief_device_types(lookup):
+    """Prefetch the device types at ``lookup`` with only the columns their display string and link need."""
+    return Prefetch(lookup, queryset=DeviceType.objects.only("id", "model"))
+
+
+def nested_plan(prefix, plan):
+    """Return ``plan`` for objects reached through the relation ``prefix`` (which is itself joined)."""
+    select_related, prefetch_related = plan
+    return (
+        [prefix, *(f"{prefix}__{lookup}" for lookup in select_related)],
+        [
+            Prefetch(f"{prefix}__{lookup.prefetch_through}", queryset=lookup.queryset)
+            if isinstance(lookup, Prefetch)
+            else f"{prefix}__{lookup}"
+            for lookup in prefetch_related
+        ],
+    )
+
+
+def apply_plan(queryset, *plans):
+    """Return ``queryset`` with the lookups of every plan added, each lookup once."""
+    select_related = {}
+    prefetch_related = {}
+    for plan_select_related, plan_prefetch_related in plans:
+        select_related.update(dict.fromkeys(plan_select_related))
+        prefetch_related.update(dict.fromkeys(plan_prefetch_related))
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    if prefetch_related:
+        queryset = queryset.prefetch_related(*prefetch_related)
+    return queryset
+
+
+# A spare part type serialized in full by the API (its stock totals come from the rollup row when not annotated).
+SPARE_PART_TYPE = (["manufacturer", "stock_rollup"], ["compatible_device_types", "tags"])
+# A spare part type shown by its display string ("<manufacturer> <name>").
+BRIEF_SPARE_PART_TYPE = (["manufacturer"], [])
+
+# An inventory record serialized in full by the API.
+INVENTORY = (
+    [*nested_plan("spare_part_type", SPARE_PART_TYPE)[0], "location"],
+    [*nested_plan("spare_part_type", SPARE_PART_TYPE)[1], "location__tags", "tags"],
+)
+# An inventory record shown by its display string ("<part type> at <location>").
+BRIEF_INVENTORY = ([*nested_plan("spare_part_type", BRIEF_SPARE_PART_TYPE)[0], "location"], [])
+# The same, reached through a ``spare_part_inventory`` foreign key (transactions, usage rows, forecasts).
+RELATED_INVENTORY = nested_plan("spare_part_inventory", INVENTORY)
+BRIEF_RELATED_INVENTORY = nested_plan("spare_part_inventory", BRIEF_INVENTORY)
+
+# Rows of the UI tables.
+SPARE_PART_TYPE_TABLE = (["manufacturer"], ["tags"])
+INVENTORY_TABLE = (BRIEF_INVENTORY[0], ["tags"])
+TRANSACTION_TABLE = ([*BRIEF_RELATED_INVENTORY[0], "user", "related_device"], [])
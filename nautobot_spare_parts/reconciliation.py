@@ -0,0 +1,286 @@
+"""Ledger reconciliation.
+
+Every ledger transaction records the counter it changed (``quantity_on_hand`` for check ins, check outs,
+adjustments and transfers; ``quantity_reserved`` for allocations and deallocations) before and after the change.
+For each inventory record, the transactions on each counter should therefore form a chain:
+
+- each transaction's ``quantity_after`` is its ``quantity_before`` plus its ``quantity``
+- each transaction starts where the previous one on the same counter ended
+- the last transaction ends at the record's current level
+
+reconcile_ledger() checks all three for every inventory record in a single pass over the ledger, streamed in
+``(inventory, timestamp)`` order along the ledger's index. It can also append corrective transactions so the
+ledger ends at the current stock levels again. Breaks earlier in a chain are reported but left alone, since the
+ledger is an audit trail and isn't rewritten. Corrections are written like stock movements: with the usage and
+rollup totals in the same database transaction, and ``stock_changed`` sent once it commits.
+"""
+
+from heapq import merge
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from nautobot_spare_parts.models import (
+    SparePartDailyUsage,
+    SparePartInventory,
+    SparePartStockRollup,
+    SparePartTransaction,
+    SparePartTransactionArchive,
+)
+from nautobot_spare_parts.signals import stock_changed
+from nautobot_spare_parts.stock import RESERVATION_TRANSACTION_TYPES
+
+DEFAULT_CHUNK_SIZE = 5000
+CORRECTION_REASON = "Ledger reconciliation"
+
+# Counter each transaction type moves.
+CHAIN_FIELDS = {
+    transaction_type: "quantity_reserved" if transaction_type in RESERVATION_TRANSACTION_TYPES else "quantity_on_hand"
+    for transaction_type, _ in SparePartTransaction.TRANSACTION_TYPE_CHOICES
+}
+
+# Positions in the ledger rows streamed by _stream_ledger().
+INVENTORY, PK, TRANSACTION_TYPE, TIMESTAMP, QUANTITY, BEFORE, AFTER = range(7)
+
+
+class LedgerDiscrepancy:
+    """A problem found in the ledger of one inventory record.
+
+    ``kind`` is ``arithmetic`` (a transaction's before and change don't add up to its after), ``chain`` (a
+    transaction doesn't start where the previous one ended) or ``balance`` (the last transaction doesn't end at
+    the record's current level). ``expected`` and ``actual`` are the mismatching values of ``field``.
+    """
+
+    ARITHMETIC = "arithmetic"
+    CHAIN = "chain"
+    BALANCE = "balance"
+
+    def __init__(self, kind, inventory_id, field, expected, actual, transaction_ids):
+        """Record the discrepancy."""
+        self.kind = kind
+        self.inventory_id = inventory_id
+        self.field = field
+        self.expected = expected
+        self.actual = actual
+        self.transaction_ids = transaction_ids
+
+    def __str__(self):
+        """Describe the discrepancy in one line."""
+        transactions = ", ".join(str(pk) for pk in self.transaction_ids)
+        return (
+            f"Inventory {self.inventory_id} {self.field}: {self.kind} mismatch, expected {self.expected} "
+            f"but found {self.actual} (transactions {transactions})"
+        )
+
+    def as_dict(self):
+        """Return the discrepancy as a JSON-serializable dictionary."""
+        return {
+            "kind": self.kind,
+            "inventory": str(self.inventory_id),
+            "field": self.field,
+            "expected": self.expected,
+            "actual": self.actual,
+            "transactions": [str(pk) for pk in self.transaction_ids],
+        }
+
+
+class ReconciliationResult:
+    """Outcome of reconcile_ledger()."""
+
+    def __init__(self):
+        """Start with nothing checked."""
+        self.inventory_count = 0
+        self.transaction_count = 0
+        self.discrepancies = []
+        self.corrections = []
+
+    @property
+    def ok(self):
+        """Whether the ledger was found to be consistent."""
+        return not self.discrepancies
+
+
+def reconcile_ledger(include_archive=False, fix=False, user=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Check the ledger chain of every inventory record and return a ReconciliationResult.
+
+    With ``include_archive`` the archived transactions are checked too (and chains are followed across the
+    archive boundary); otherwise only the live ledger is read. Suspected balance mismatches are confirmed against
+    the locked inventory rows before they're reported, so movements made during the scan don't show up as false
+    positives. With ``fix``, each confirmed balance mismatch gets a corrective ``adjustment`` (or
+    ``allocation``/``deallocation``) transaction, attributed to ``user``, that takes the ledger from its last
+    recorded level to the current one.
+    """
+    result = ReconciliationResult()
+    levels = {
+        pk: {"quantity_on_hand": on_hand, "quantity_reserved": reserved}
+        for pk, on_hand, reserved in SparePartInventory.objects.values_list(
+            "pk", "quantity_on_hand", "quantity_reserved"
+        ).iterator(chunk_size=chunk_size)
+    }
+    result.inventory_count = len(levels)
+
+    ledgers = [_stream_ledger(SparePartTransaction.objects.all(), chunk_size)]
+    if include_archive:
+        ledgers.append(_stream_ledger(SparePartTransactionArchive.objects.all(), chunk_size))
+    rows = merge(*ledgers, key=itemgetter(INVENTORY, TIMESTAMP, PK)) if len(ledgers) > 1 else ledgers[0]
+
+    suspects = {}
+    for inventory_id, inventory_rows in groupby(rows, key=itemgetter(INVENTORY)):
+        chains = {"quantity_on_hand": [], "quantity_reserved": []}
+        for row in inventory_rows:
+            result.transaction_count += 1
+            chains[CHAIN_FIELDS[row[TRANSACTION_TYPE]]].append(row)
+        if inventory_id not in levels:
+            continue  # Created after the inventory levels were read
+        for field, chain in chains.items():
+            last = _check_chain(inventory_id, field, chain, result.discrepancies)
+            if last is not None and last[AFTER] != levels[inventory_id][field]:
+                suspects.setdefault(inventory_id, {})[field] = last[PK]
+
+    suspect_ids = sorted(suspects, key=str)
+    for start in range(0, len(suspect_ids), chunk_size):
+        _confirm_balances(
+            {pk: suspects[pk] for pk in suspect_ids[start : start + chunk_size]},
+            result,
+            fix=fix,
+            user=user,
+        )
+    return result
+
+
+def _stream_ledger(ledger, chunk_size):
+    """Yield the ledger's rows as tuples (see INVENTORY etc.) in ``(inventory, timestamp, pk)`` order."""
+    return (
+        ledger.order_by("spare_part_inventory", "timestamp", "pk")
+        .values_list(
+            "spare_part_inventory",
+            "pk",
+            "transaction_type",
+            "timestamp",
+            "quantity",
+            "quantity_before",
+            "quantity_after",
+        )
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _check_chain(inventory_id, field, rows, discrepancies):
+    """Check one counter's transactions (in timestamp order), adding what's wrong to ``discrepancies``.
+
+    Transactions written in the same instant can't be told apart by timestamp, so those are taken in whichever
+    order continues the chain. Returns the last transaction row, or None if there are none.
+    """
+    previous = None
+    for _, group in groupby(rows, key=itemgetter(TIMESTAMP)):
+        pending = list(group)
+        while pending:
+            row = pending[0]
+            if previous is not None and len(pending) > 1:
+                row = next((candidate for candidate in pending if candidate[BEFORE] == previous[AFTER]), row)
+            pending.remove(row)
+
+            if row[BEFORE] + row[QUANTITY] != row[AFTER]:
+                discrepancies.append(
+                    LedgerDiscrepancy(
+                        LedgerDiscrepancy.ARITHMETIC,
+                        inventory_id,
+                        field,
+                        row[BEFORE] + row[QUANTITY],
+                        row[AFTER],
+                        [row[PK]],
+                    )
+                )
+            if previous is not None and row[BEFORE] != previous[AFTER]:
+                discrepancies.append(
+                    LedgerDiscrepancy(
+                        LedgerDiscrepancy.CHAIN,
+                        inventory_id,
+                        field,
+                        previous[AFTER],
+                        row[BEFORE],
+                        [previous[PK], row[PK]],
+                    )
+                )
+            previous = row
+    return previous
+
+
+def _last_ledger_level(ledger, field):
+    """Return a subquery for the ``quantity_after`` of the latest transaction on ``field`` in ``ledger``."""
+    types = [transaction_type for transaction_type, chain_field in CHAIN_FIELDS.items() if chain_field == field]
+    return Subquery(
+        ledger.filter(spare_part_inventory=OuterRef("pk"), transaction_type__in=types)
+        .order_by("-timestamp", "-pk")
+        .values("quantity_after")[:1]
+    )
+
+
+def _confirm_balances(suspects, result, fix, user):
+    """Recheck suspected balance mismatches against the locked inventory rows; record (and fix) the real ones.
+
+    ``suspects`` maps inventory primary keys to ``{field: last transaction pk}``.
+    """
+    with transaction.atomic():
+        inventories = (
+            SparePartInventory.objects.select_for_update()
+            .filter(pk__in=suspects)
+            .order_by("pk")
+            .annotate(
+                **{
+                    f"ledger_{field}": Coalesce(
+                        _last_ledger_level(SparePartTransaction.objects.all(), field),
+                        _last_ledger_level(SparePartTransactionArchive.objects.all(), field),
+                    )
+                    for field in ("quantity_on_hand", "quantity_reserved")
+                }
+            )
+        )
+        corrections = []
+        for inventory in inventories:
+            for field, last_pk in suspects[inventory.pk].items():
+                ledger_level = getattr(inventory, f"ledger_{field}")
+                level = getattr(inventory, field)
+                if ledger_level is None or ledger_level == level:
+                    continue
+                result.discrepancies.append(
+                    LedgerDiscrepancy(LedgerDiscrepancy.BALANCE, inventory.pk, field, level, ledger_level, [last_pk])
+                )
+                if fix:
+                    corrections.append(_correction(inventory, field, ledger_level, level, user))
+
+        if corrections:
+            SparePartTransaction.objects.bulk_create(corrections)
+            SparePartDailyUsage.record(corrections)
+            corrected = list({txn.spare_part_inventory_id: txn.spare_part_inventory for txn in corrections}.values())
+            SparePartStockRollup.apply_changes(
+                [(inventory, inventory.quantity_on_hand, inventory.quantity_reserved) for inventory in corrected],
+                max(txn.timestamp for txn in corrections),
+            )
+            transaction.on_commit(
+                lambda: stock_changed.send(sender=SparePartInventory, inventories=corrected, transactions=corrections)
+            )
+            result.corrections.extend(corrections)
+
+
+def _correction(inventory, field, ledger_level, level, user):
+    """Build the transaction that takes the ``field`` ledger chain from ``ledger_level`` to ``level``."""
+    if field == "quantity_reserved":
+        transaction_type = "allocation" if level > ledger_level else "deallocation"
+    else:
+        transaction_type = "adjustment"
+    txn = SparePartTransaction(
+        spare_part_inventory=inventory,
+        transaction_type=transaction_type,
+        quantity=level - ledger_level,
+        quantity_before=ledger_level,
+        quantity_after=level,
+        user=user,
+        reason=CORRECTION_REASON,
+        notes=f"Ledger ended at {ledger_level} but the inventory record holds {level}",
+    )
+    txn.refresh_search_document()
+    return txn
@@ -0,0 +1,102 @@
+"""Search backend for the ``q`` filters.
+
+Part types, inventory records and transactions each keep a ``search_document``: their searchable values,
+lowercased, one per line (see models.build_search_document). A search is split into terms and every term must be
+found either in the record's own document or in the document of the record it belongs to. A transaction matches
+through its inventory record, and an inventory record through its part type, with subqueries on those (much
+smaller) tables rather than joins. Names of related Nautobot objects (manufacturer, location) are copied into
+the documents and refreshed when they change.
+
+Each term is matched with a case-sensitive ``LIKE '%term%'`` on one column. On PostgreSQL the documents carry
+trigram GIN indexes (migration 0010), which serve those matches for terms of three or more characters. Elsewhere
+the same query scans the one column, without the joins the old ``icontains`` searches needed.
+
+Part types and inventory records are ranked: an exact part number match first, then part number prefixes, then
+name prefixes, then everything else in the usual order. Transactions stay newest first.
+"""
+
+from django.db.models import Case, IntegerField, Q, When
+
+from nautobot_spare_parts.models import (
+    SparePartInventory,
+    SparePartTransaction,
+    SparePartTransactionArchive,
+    SparePartType,
+)
+
+# Relation through which each model's records also match, and the model at the other end.
+RELATED_DOCUMENTS = {
+    SparePartInventory: ("spare_part_type", SparePartType),
+    SparePartTransaction: ("spare_part_inventory", SparePartInventory),
+    SparePartTransactionArchive: ("spare_part_inventory", SparePartInventory),
+}
+
+# Paths to the part number and name each ranked model is ranked on.
+RANKED_FIELDS = {
+    SparePartType: ("part_number", "name"),
+    SparePartInventory: ("spare_part_type__part_number", "spare_part_type__name"),
+}
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def search_terms(value):
+    """Split a search string into lowercased terms."""
+    return value.lower().split()
+
+
+def term_condition(model, term):
+    """Return the condition matching ``model`` records whose own or related document contains ``term``."""
+    condition = Q(search_document__contains=term)
+    if model in RELATED_DOCUMENTS:
+        relation, related_model = RELATED_DOCUMENTS[model]
+        related = related_model.objects.filter(term_condition(related_model, term)).values("pk")
+        condition |= Q(**{f"{relation}__in": related})
+    return condition
+
+
+def search_queryset(queryset, value):
+    """Filter ``queryset`` to the records matching every term of ``value``, ranked where the model is ranked."""
+    terms = search_terms(value)
+    if not terms:
+        return queryset
+    model = queryset.model
+    for term in terms:
+        queryset = queryset.filter(term_condition(model, term))
+    if model not in RANKED_FIELDS:
+        return queryset
+
+    part_number, name = RANKED_FIELDS[model]
+    phrase = value.strip()
+    ordering = queryset.query.order_by or model._meta.ordering
+    return queryset.annotate(
+        search_rank=Case(
+            When(**{f"{part_number}__iexact": phrase}, then=3),
+            When(**{f"{part_number}__istartswith": phrase}, then=2),
+            When(**{f"{name}__istartswith": phrase}, then=1),
+            default=0,
+            output_field=IntegerField(),
+        )
+    ).order_by("-search_rank", *ordering)
+
+
+def refresh_search_documents(queryset, batch_size=DEFAULT_BATCH_SIZE):
+    """Recompute the search documents of the records in ``queryset``, writing only those that changed.
+
+    Returns the number of records rewritten.
+    """
+    changed = []
+    count = 0
+    for instance in queryset.iterator(chunk_size=batch_size):
+        document = instance.search_document
+        instance.refresh_search_document()
+        if instance.search_document != document:
+            changed.append(instance)
+        if len(changed) >= batch_size:
+            queryset.model.objects.bulk_update(changed, ["search_document"])
+            count += len(changed)
+            changed = []
+    if changed:
+        queryset.model.objects.bulk_update(changed, ["search_document"])
+        count += len(changed)
+    return count
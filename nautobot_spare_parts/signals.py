@@ -1,28 +1,165 @@
 """Signal handlers for Spare Parts Inventory plugin."""
 
-import logging
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver, Signal
+from nautobot.dcim.models import DeviceType, Location, Manufacturer
 
-from django.db.models.signals import post_save
-from django.dispatch import receiver
+from nautobot_spare_parts import alerts
+from nautobot_spare_parts.geo import invalidate_locations, invalidate_stock_trees
+from nautobot_spare_parts.models import (
+    SparePartCompatibility,
+    SparePartInventory,
+    SparePartStockRollup,
+    SparePartType,
+)
+from nautobot_spare_parts.search import refresh_search_documents
+from nautobot_spare_parts.utils import bump_cache_version, mark_changed
 
-from nautobot_spare_parts.models import SparePartInventory
+# Sent once a stock movement has been committed, with ``inventories`` (the affected SparePartInventory records,
+# refreshed to their new levels) and ``transactions`` (the SparePartTransaction rows that were written).
+# Stock movements update the inventory rows directly, so ``post_save`` does not fire for them.
+stock_changed = Signal()
 
-logger = logging.getLogger(__name__)
+
+@receiver(post_save, sender=SparePartInventory)
+def queue_low_stock_alert(sender, instance, **kwargs):
+    """Queue an alert once the saved record has crossed its minimum stock level."""
+    alert = alerts.get_transition_alert(instance)
+    if alert is not None:
+        transaction.on_commit(lambda: alerts.dispatcher.enqueue(alert))
+
+
+@receiver(stock_changed)
+def queue_low_stock_alerts_after_movement(sender, inventories, **kwargs):
+    """Queue alerts for inventories a stock movement has moved across their minimum stock level."""
+    for inventory in inventories:
+        alert = alerts.get_transition_alert(inventory)
+        if alert is not None:
+            alerts.dispatcher.enqueue(alert)
+
+
+@receiver(post_save, sender=SparePartType)
+def create_stock_rollup(sender, instance, created, **kwargs):
+    """Create the (empty) stock rollup for a new part type."""
+    if created:
+        SparePartStockRollup.rebuild([instance.pk])
+
+
+@receiver(post_save, sender=SparePartInventory)
+def update_stock_rollup(sender, instance, update_fields=None, **kwargs):
+    """Apply the change a created or edited inventory record makes to its part type rollups."""
+    before = getattr(instance, "_stored_stock", None)
+    after = {}
+    for name in SparePartInventory.ROLLUP_SOURCE_FIELDS:
+        if before is None or update_fields is None or name in update_fields:
+            after[name] = getattr(instance, SparePartInventory._meta.get_field(name).attname)
+        else:
+            after[name] = before[name]
+    SparePartStockRollup.apply_record_change(before, after)
+
+
+@receiver(post_delete, sender=SparePartInventory)
+def remove_from_stock_rollup(sender, instance, **kwargs):
+    """Take a deleted inventory record's stock off its part type rollup."""
+    before = getattr(instance, "_stored_stock", None)
+    if before is None:
+        # Deleted through a queryset, which loads the records just before deleting them
+        before = {
+            name: getattr(instance, SparePartInventory._meta.get_field(name).attname)
+            for name in SparePartInventory.ROLLUP_SOURCE_FIELDS
+        }
+    SparePartStockRollup.apply_record_change(before, None)
+
+
+@receiver(post_save, sender=SparePartInventory)
+@receiver(post_delete, sender=SparePartInventory)
+def invalidate_nearest_stock_trees(sender, instance, **kwargs):
+    """Have the nearest-stock trees rebuilt after an inventory record is created, edited or deleted."""
+    spare_part_type_ids = {instance.spare_part_type_id}
+    loaded_spare_part_type_id = getattr(instance, "_loaded_spare_part_type_id", None)
+    if loaded_spare_part_type_id is not None:
+        spare_part_type_ids.add(loaded_spare_part_type_id)
+    invalidate_stock_trees(spare_part_type_ids)
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_caches(sender, **kwargs):
+    """Have the location coordinates and ancestry reloaded after a location is added, moved or deleted."""
+    invalidate_locations()
 
 
 @receiver(post_save, sender=SparePartInventory)
-def check_low_stock(sender, instance, created, **kwargs):
-    """Check if inventory is low and log warning."""
-    if instance.is_low_stock:
-        logger.warning(
-            f"Low stock alert: {instance.spare_part_type} at {instance.location} "
-            f"- Available: {instance.quantity_available}, Minimum: {instance.minimum_quantity}"
-        )
-
-        # Future enhancement: Create webhook event or send notification
-        # For now, just log the warning
-        # You could add custom logic here to:
-        # - Create a Job to send email notifications
-        # - Trigger a webhook to external systems
-        # - Create a custom event log entry
-        # - Update a dashboard metric
+def refresh_compatibility_entries(sender, instance, update_fields=None, **kwargs):
+    """Re-index a saved inventory record if it is new, has moved part type or location, or ran out or came back."""
+    before = getattr(instance, "_stored_stock", None)
+    if before is not None:
+        if update_fields is not None and not set(update_fields) & set(SparePartInventory.COMPATIBILITY_SOURCE_FIELDS):
+            return
+        if (before["spare_part_type"], before["location"], before["quantity_available"] > 0) == (
+            instance.spare_part_type_id,
+            instance.location_id,
+            instance.quantity_available > 0,
+        ):
+            return
+    SparePartCompatibility.rebuild(inventory_ids=[instance.pk])
+
+
+@receiver(m2m_changed, sender=SparePartType.compatible_device_types.through)
+def refresh_compatibility_entries_of_part_types(sender, instance, action, reverse, pk_set, **kwargs):
+    """Re-index the part types whose compatible device types have changed."""
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        SparePartCompatibility.rebuild(spare_part_type_ids=[instance.pk])
+    elif pk_set:
+        SparePartCompatibility.rebuild(spare_part_type_ids=pk_set)
+    else:
+        # All part types were unlinked from the device type ``instance``
+        SparePartCompatibility.objects.filter(device_type=instance).delete()
+
+
+@receiver(post_save, sender=Manufacturer)
+def refresh_spare_part_type_search_documents(sender, instance, created, **kwargs):
+    """Copy a renamed manufacturer into the search documents of its part types."""
+    if not created:
+        refresh_search_documents(SparePartType.objects.filter(manufacturer=instance).select_related("manufacturer"))
+
+
+@receiver(post_save, sender=Location)
+def refresh_inventory_search_documents(sender, instance, created, **kwargs):
+    """Copy a renamed location into the search documents of the inventory records stored there."""
+    if not created:
+        refresh_search_documents(SparePartInventory.objects.filter(location=instance).select_related("location"))
+
+
+@receiver(stock_changed)
+@receiver(post_save, sender=SparePartInventory)
+@receiver(post_delete, sender=SparePartInventory)
+def invalidate_low_stock_summary(sender, **kwargs):
+    """Drop cached low stock dashboard summaries once stock levels change."""
+    bump_cache_version("low_stock_summary")
+
+
+@receiver(stock_changed)
+def mark_stock_changed_after_movement(sender, **kwargs):
+    """Move on the API's collection version (see api.views.ConditionalGetViewSetMixin) after a stock movement."""
+    mark_changed("stock")
+
+
+@receiver(post_save, sender=SparePartInventory)
+@receiver(post_delete, sender=SparePartInventory)
+@receiver(post_save, sender=SparePartType)
+@receiver(post_delete, sender=SparePartType)
+@receiver(m2m_changed, sender=SparePartType.compatible_device_types.through)
+@receiver(post_save, sender=DeviceType)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Manufacturer)
+def mark_stock_changed(sender, **kwargs):
+    """Move on the API's collection version once a change to records it serializes has been committed.
+
+    Covers what the records' own ``last_updated`` doesn't: deletions, part type stock totals and the related
+    objects nested in the API responses.
+    """
+    transaction.on_commit(lambda: mark_changed("stock"))
@@ -0,0 +1,649 @@
+"""Stock mutation engine for Spare Parts Inventory plugin.
+
+Every change to ``quantity_on_hand`` or ``quantity_reserved`` goes through this module. The inventory row is
+locked, the new level is validated against the locked values, only the quantity columns are written back and
+the ledger row (including notes) is inserted in the same database transaction, so concurrent movements cannot
+lose updates or break the ``quantity_before``/``quantity_after`` chain.
+"""
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from nautobot.dcim.models import Location
+
+from nautobot_spare_parts.geo import invalidate_stock_trees
+from nautobot_spare_parts.models import (
+    SparePartCompatibility,
+    SparePartDailyUsage,
+    SparePartInventory,
+    SparePartReservation,
+    SparePartStockRollup,
+    SparePartTransaction,
+    stock_crossings,
+    VersionConflict,
+)
+from nautobot_spare_parts.signals import stock_changed
+
+STOCK_TRANSACTION_TYPES = ("check_in", "check_out", "adjustment")
+RESERVATION_TRANSACTION_TYPES = ("allocation", "deallocation")
+
+# Expired reservations released per database transaction by release_expired_reservations().
+DEFAULT_SWEEP_BATCH_SIZE = 500
+
+
+class StockMovement:
+    """A requested change to the stock levels of one inventory record.
+
+    ``inventory`` may be a SparePartInventory instance or its primary key. ``quantity`` is the signed change as
+    recorded on the ledger (negative for check-outs and deallocations). With ``expected_versions``, the movement
+    fails with VersionConflict unless the record is at one of those versions when it is locked.
+    """
+
+    def __init__(
+        self, inventory, transaction_type, quantity, reason, related_device=None, notes="", expected_versions=None
+    ):
+        """Store the requested movement."""
+        self.inventory = inventory
+        self.transaction_type = transaction_type
+        self.quantity = quantity
+        self.reason = reason
+        self.related_device = related_device
+        self.notes = notes or ""
+        self.expected_versions = expected_versions
+
+    @property
+    def inventory_id(self):
+        """Primary key of the targeted inventory record."""
+        return getattr(self.inventory, "pk", self.inventory)
+
+
+class StockTransfer:
+    """A requested move of ``quantity`` units from one inventory record to another location.
+
+    ``source`` may be a SparePartInventory instance or its primary key; ``destination_location`` may be a Location
+    or its primary key.
+    """
+
+    def __init__(self, source, destination_location, quantity, reason, notes=""):
+        """Store the requested transfer."""
+        self.source = source
+        self.destination_location = destination_location
+        self.quantity = quantity
+        self.reason = reason
+        self.notes = notes or ""
+
+    @property
+    def source_id(self):
+        """Primary key of the source inventory record."""
+        return getattr(self.source, "pk", self.source)
+
+    @property
+    def destination_location_id(self):
+        """Primary key of the destination location."""
+        return getattr(self.destination_location, "pk", self.destination_location)
+
+
+class StockMovementResult:
+    """Outcome of one StockMovement or StockTransfer.
+
+    Either ``transaction`` holds the ledger row written for it (for transfers, the debit row, with the credit row
+    in ``destination_transaction``) or ``error`` holds the validation error.
+    """
+
+    def __init__(self, movement, transaction=None, error=None, destination_transaction=None):
+        """Store the outcome."""
+        self.movement = movement
+        self.transaction = transaction
+        self.destination_transaction = destination_transaction
+        self.error = error
+
+    @property
+    def ok(self):
+        """Whether the movement was valid."""
+        return self.error is None
+
+
+class StockMovementError(ValidationError):
+    """Raised when an all-or-nothing batch contains an invalid movement; nothing from the batch was written."""
+
+    def __init__(self, results):
+        """Collect the per-item errors, prefixed with the item index."""
+        self.results = results
+        super().__init__(
+            [
+                f"Item {index}: {'; '.join(result.error.messages)}"
+                for index, result in enumerate(results)
+                if result.error is not None
+            ]
+        )
+
+
+def validate_movement(inventory, transaction_type, quantity):
+    """Validate a movement against the current stock levels of ``inventory``.
+
+    ``quantity`` is the signed change as recorded on the ledger. Returns ``(field, quantity_before,
+    quantity_after)`` for the counter the movement affects.
+    """
+    on_hand = inventory.quantity_on_hand
+    reserved = inventory.quantity_reserved
+
+    if transaction_type == "allocation":
+        if quantity <= 0:
+            raise ValidationError("Allocation quantity must be positive")
+        if on_hand - reserved < quantity:
+            raise ValidationError(f"Cannot allocate {quantity} units. Only {on_hand - reserved} available.")
+        return "quantity_reserved", reserved, reserved + quantity
+
+    if transaction_type == "deallocation":
+        if quantity >= 0:
+            raise ValidationError("Deallocation quantity must be positive")
+        if reserved < -quantity:
+            raise ValidationError(f"Cannot deallocate {-quantity} units. Only {reserved} reserved.")
+        return "quantity_reserved", reserved, reserved + quantity
+
+    if transaction_type in STOCK_TRANSACTION_TYPES or transaction_type == "transfer":
+        new_quantity = on_hand + quantity
+        if new_quantity < 0:
+            raise ValidationError(f"Cannot adjust stock by {quantity}. Would result in negative inventory.")
+        if new_quantity < reserved:
+            raise ValidationError(f"Cannot adjust stock by {quantity}. {reserved} units are reserved at this location.")
+        return "quantity_on_hand", on_hand, new_quantity
+
+    raise ValidationError("Invalid transaction type for stock adjustment")
+
+
+class _StockBatch:
+    """Inventory rows locked for one database transaction, plus the changes and ledger rows pending against them."""
+
+    def __init__(self, queryset, inventory_ids):
+        """Lock the given inventory records in primary-key order."""
+        self.locked = {
+            inventory.pk: inventory
+            for inventory in queryset.select_for_update().filter(pk__in=inventory_ids).order_by("pk")
+        }
+        self.now = timezone.now()
+        self.changed = {}
+        self.original = {}
+        self.ledger = []
+
+    def move(self, inventory, transaction_type, quantity, reason, user=None, related_device=None, notes="", **extra):
+        """Validate and apply one movement in memory, returning the pending ledger row."""
+        field, quantity_before, quantity_after = validate_movement(inventory, transaction_type, quantity)
+        self.original.setdefault(inventory.pk, (inventory.quantity_on_hand, inventory.quantity_reserved))
+        setattr(inventory, field, quantity_after)
+        inventory.refresh_stock_state()
+        inventory.last_updated = self.now
+        self.changed[inventory.pk] = inventory
+
+        txn = SparePartTransaction(
+            spare_part_inventory=inventory,
+            transaction_type=transaction_type,
+            quantity=quantity,
+            quantity_before=quantity_before,
+            quantity_after=quantity_after,
+            user=user,
+            reason=reason,
+            related_device=related_device,
+            notes=notes or "",
+            **extra,
+        )
+        txn.refresh_search_document()
+        self.ledger.append(txn)
+        return txn
+
+    def write(self):
+        """Write the changed inventory rows, the ledger rows, the usage and rollup totals and the stock indexes.
+
+        ``stock_changed`` is sent once the transaction commits.
+        """
+        if not self.ledger:
+            return
+        # The rows are locked, so their versions can be moved on in memory.
+        for inventory in self.changed.values():
+            inventory.version += 1
+        SparePartInventory.objects.bulk_update(
+            self.changed.values(),
+            [
+                "quantity_on_hand",
+                "quantity_reserved",
+                *SparePartInventory.STOCK_STATE_FIELDS,
+                "last_updated",
+                "version",
+            ],
+        )
+        SparePartTransaction.objects.bulk_create(self.ledger)
+        SparePartDailyUsage.record(self.ledger)
+        changes = [(inventory, *self.original[pk]) for pk, inventory in self.changed.items()]
+        SparePartStockRollup.apply_changes(changes, max(txn.timestamp for txn in self.ledger))
+        SparePartCompatibility.apply_changes(changes)
+        crossed = {inventory.spare_part_type_id for inventory in stock_crossings(changes)}
+        if crossed:
+            invalidate_stock_trees(crossed)
+
+        inventories = list(self.changed.values())
+        ledger = self.ledger
+        transaction.on_commit(
+            lambda: stock_changed.send(sender=SparePartInventory, inventories=inventories, transactions=ledger)
+        )
+
+
+def apply_stock_movements(movements, user=None, atomic=True, queryset=None):
+    """Apply a batch of StockMovements in a single database transaction.
+
+    All affected inventory rows are locked up front in primary-key order, so concurrent batches touching
+    overlapping records queue behind each other instead of deadlocking. Movements are applied in the order
+    given (later movements see the effect of earlier ones on the same record), then the inventory rows are
+    written with one bulk ``UPDATE`` and the ledger rows with one bulk ``INSERT``.
+
+    With ``atomic=True`` any invalid movement raises StockMovementError and nothing is written; otherwise
+    invalid movements are skipped and the valid ones applied. ``queryset`` limits which inventory records may be
+    touched (e.g. one restricted to the requesting user's permissions). Returns one StockMovementResult per
+    movement, in order.
+    """
+    if queryset is None:
+        queryset = SparePartInventory.objects.all()
+
+    results = []
+    with transaction.atomic():
+        batch = _StockBatch(queryset, {movement.inventory_id for movement in movements})
+
+        for movement in movements:
+            inventory = batch.locked.get(movement.inventory_id)
+            if inventory is None:
+                results.append(StockMovementResult(movement, error=ValidationError("Inventory record not found")))
+                continue
+            if movement.expected_versions is not None and inventory.version not in movement.expected_versions:
+                results.append(StockMovementResult(movement, error=VersionConflict(inventory, inventory.version)))
+                continue
+            try:
+                txn = batch.move(
+                    inventory,
+                    movement.transaction_type,
+                    movement.quantity,
+                    movement.reason,
+                    user=user,
+                    related_device=movement.related_device,
+                    notes=movement.notes,
+                )
+            except ValidationError as err:
+                results.append(StockMovementResult(movement, error=err))
+                continue
+            results.append(StockMovementResult(movement, transaction=txn))
+
+        if atomic and any(result.error is not None for result in results):
+            raise StockMovementError(results)
+        batch.write()
+
+    return results
+
+
+def _get_destination_inventories(keys, create_missing):
+    """Map ``(spare_part_type_id, location_id)`` keys to inventory primary keys, creating missing records."""
+    destinations = {}
+    if keys:
+        type_ids = {type_id for type_id, _ in keys}
+        location_ids = {location_id for _, location_id in keys}
+        for pk, type_id, location_id in SparePartInventory.objects.filter(
+            spare_part_type_id__in=type_ids, location_id__in=location_ids
+        ).values_list("pk", "spare_part_type_id", "location_id"):
+            if (type_id, location_id) in keys:
+                destinations[(type_id, location_id)] = pk
+
+    if create_missing:
+        missing = keys - destinations.keys()
+        existing_locations = set(
+            Location.objects.filter(pk__in={location_id for _, location_id in missing}).values_list("pk", flat=True)
+        )
+        for type_id, location_id in sorted(missing, key=str):
+            if location_id not in existing_locations:
+                continue
+            inventory, _ = SparePartInventory.objects.get_or_create(spare_part_type_id=type_id, location_id=location_id)
+            destinations[(type_id, location_id)] = inventory.pk
+    return destinations
+
+
+def apply_stock_transfers(transfers, user=None, atomic=True, queryset=None, create_missing=True):
+    """Move stock between locations for a batch of StockTransfers in a single database transaction.
+
+    Each transfer debits its source inventory and credits the inventory for the same SparePartType at the
+    destination location, creating that record first if ``create_missing`` is set (the new, empty record is kept
+    even if the transfer itself then fails). Both sides are written as ``transfer`` ledger rows; the credit row's
+    ``transfer_source`` points at the debit row. Source and destination rows are locked together in primary-key
+    order, so two opposite transfers running concurrently cannot deadlock. ``atomic`` and ``queryset`` behave as
+    for apply_stock_movements(); results carry the debit row as ``transaction`` and the credit row as
+    ``destination_transaction``.
+    """
+    if queryset is None:
+        queryset = SparePartInventory.objects.all()
+
+    # Missing destination records are created before the stock rows are locked: creating one updates its part type
+    # rollup, and taking that rollup lock ahead of the inventory locks would invert the engine's lock order.
+    source_types = dict(
+        queryset.filter(pk__in={transfer.source_id for transfer in transfers}).values_list("pk", "spare_part_type_id")
+    )
+    destinations = _get_destination_inventories(
+        {
+            (source_types[transfer.source_id], transfer.destination_location_id)
+            for transfer in transfers
+            if transfer.source_id in source_types
+        },
+        create_missing,
+    )
+
+    results = []
+    with transaction.atomic():
+        batch = _StockBatch(queryset, set(source_types) | set(destinations.values()))
+
+        for transfer in transfers:
+            source = batch.locked.get(transfer.source_id)
+            if source is None:
+                results.append(StockMovementResult(transfer, error=ValidationError("Source inventory not found")))
+                continue
+            destination = batch.locked.get(
+                destinations.get((source.spare_part_type_id, transfer.destination_location_id))
+            )
+            if destination is None:
+                results.append(StockMovementResult(transfer, error=ValidationError("Destination inventory not found")))
+                continue
+            if destination.pk == source.pk:
+                results.append(
+                    StockMovementResult(transfer, error=ValidationError("Source and destination locations must differ"))
+                )
+                continue
+            if transfer.quantity <= 0:
+                results.append(
+                    StockMovementResult(transfer, error=ValidationError("Transfer quantity must be positive"))
+                )
+                continue
+            try:
+                debit = batch.move(
+                    source, "transfer", -transfer.quantity, transfer.reason, user=user, notes=transfer.notes
+                )
+            except ValidationError as err:
+                results.append(StockMovementResult(transfer, error=err))
+                continue
+            credit = batch.move(
+                destination,
+                "transfer",
+                transfer.quantity,
+                transfer.reason,
+                user=user,
+                notes=transfer.notes,
+                transfer_source=debit,
+            )
+            results.append(StockMovementResult(transfer, transaction=debit, destination_transaction=credit))
+
+        if atomic and any(result.error is not None for result in results):
+            raise StockMovementError(results)
+        batch.write()
+
+    return results
+
+
+def transfer_stock(
+    source, destination_location, quantity, reason, user=None, notes="", queryset=None, create_missing=True
+):
+    """Transfer ``quantity`` units from ``source`` to ``destination_location`` and return both ledger rows.
+
+    The in-memory ``source`` is refreshed with its new levels. Returns ``(debit, credit)``. ``queryset`` and
+    ``create_missing`` are as for apply_stock_transfers().
+    """
+    transfer = StockTransfer(source, destination_location, quantity, reason, notes=notes)
+    try:
+        (result,) = apply_stock_transfers([transfer], user=user, queryset=queryset, create_missing=create_missing)
+    except StockMovementError as err:
+        raise err.results[0].error from None
+
+    locked = result.transaction.spare_part_inventory
+    source.quantity_on_hand = locked.quantity_on_hand
+    source.quantity_reserved = locked.quantity_reserved
+    source.last_updated = locked.last_updated
+    source.version = locked.version
+    return result.transaction, result.destination_transaction
+
+
+def apply_stock_movement(
+    inventory,
+    transaction_type,
+    quantity,
+    reason,
+    user=None,
+    related_device=None,
+    notes="",
+    expected_versions=None,
+):
+    """Apply a single stock movement to ``inventory`` and return the new ``SparePartTransaction``.
+
+    The row is read with ``SELECT ... FOR UPDATE`` so the before/after values recorded on the ledger are the
+    authoritative database values, not whatever happened to be loaded in memory. On success the in-memory
+    ``inventory`` is refreshed with the new levels and version. ``expected_versions`` is as for StockMovement.
+    """
+    movement = StockMovement(
+        inventory,
+        transaction_type,
+        quantity,
+        reason,
+        related_device=related_device,
+        notes=notes,
+        expected_versions=expected_versions,
+    )
+    try:
+        (result,) = apply_stock_movements([movement], user=user)
+    except StockMovementError as err:
+        raise err.results[0].error from None
+
+    _refresh_inventory(inventory, result.transaction.spare_part_inventory)
+    return result.transaction
+
+
+def _refresh_inventory(inventory, locked):
+    """Copy the new levels and version of the ``locked`` copy of a record to the caller's ``inventory``."""
+    if not isinstance(inventory, SparePartInventory) or inventory is locked:
+        return
+    inventory.quantity_on_hand = locked.quantity_on_hand
+    inventory.quantity_reserved = locked.quantity_reserved
+    inventory.last_updated = locked.last_updated
+    inventory.version = locked.version
+    inventory.refresh_stock_state()
+    inventory._loaded_is_low_stock = locked.is_low_stock
+
+
+def reserve_stock(inventory, quantity, holder, expires, user=None, notes="", queryset=None, reason=""):
+    """Reserve ``quantity`` units of ``inventory`` for ``holder`` until ``expires`` and return the reservation.
+
+    The units are allocated on the ledger in the same database transaction that creates the SparePartReservation.
+    With ``expires`` None the reservation is open-ended: it holds its units until it is used or released.
+    ``inventory`` may be an instance (refreshed with its new levels) or its primary key; ``queryset`` behaves as for
+    apply_stock_movements(). ``reason`` goes on the ledger, "Reserved for <holder>" by default.
+    """
+    if queryset is None:
+        queryset = SparePartInventory.objects.all()
+    if expires is not None and expires <= timezone.now():
+        raise ValidationError("Reservation expiry must be in the future")
+    inventory_id = getattr(inventory, "pk", inventory)
+
+    with transaction.atomic():
+        batch = _StockBatch(queryset, {inventory_id})
+        locked = batch.locked.get(inventory_id)
+        if locked is None:
+            raise ValidationError("Inventory record not found")
+        batch.move(locked, "allocation", quantity, reason or f"Reserved for {holder}", user=user, notes=notes)
+        reservation = SparePartReservation.objects.create(
+            spare_part_inventory=locked,
+            quantity=quantity,
+            holder=holder,
+            expires=expires,
+            user=user,
+            notes=notes or "",
+        )
+        batch.write()
+    _refresh_inventory(inventory, locked)
+    return reservation
+
+
+def release_reserved_units(inventory, quantity, reason, user=None, notes="", queryset=None):
+    """Deallocate ``quantity`` reserved units of ``inventory``, drawing down its active reservations first.
+
+    Open-ended reservations go first, most recent first, then the others by latest expiry. A reservation left
+    with no units is closed as released; a partly drawn one keeps the rest. Units beyond those of the reservations
+    come from the units reserved directly (edit form, import). One deallocation goes on the ledger and is returned.
+    ``inventory`` and ``queryset`` are as for reserve_stock().
+    """
+    if queryset is None:
+        queryset = SparePartInventory.objects.all()
+    inventory_id = getattr(inventory, "pk", inventory)
+
+    with transaction.atomic():
+        batch = _StockBatch(queryset, {inventory_id})
+        locked = batch.locked.get(inventory_id)
+        if locked is None:
+            raise ValidationError("Inventory record not found")
+        txn = batch.move(locked, "deallocation", -quantity, reason, user=user, notes=notes)
+
+        drawn = []
+        remaining = quantity
+        reservations = (
+            SparePartReservation.objects.select_for_update()
+            .filter(spare_part_inventory=locked, status="active")
+            .order_by(F("expires").desc(nulls_first=True), "-created", "pk")
+        )
+        for reservation in reservations:
+            if not remaining:
+                break
+            if reservation.quantity <= remaining:
+                remaining -= reservation.quantity
+                reservation.status = "released"
+                reservation.closed = batch.now
+            else:
+                reservation.quantity -= remaining
+                remaining = 0
+            drawn.append(reservation)
+        SparePartReservation.objects.bulk_update(drawn, ["quantity", "status", "closed"])
+        batch.write()
+    _refresh_inventory(inventory, locked)
+    return txn
+
+
+def extend_reservation(reservation, expires):
+    """Move the expiry of an active reservation to ``expires``; the in-memory ``reservation`` is updated."""
+    if expires <= timezone.now():
+        raise ValidationError("Reservation expiry must be in the future")
+    with transaction.atomic():
+        locked = SparePartReservation.objects.select_for_update().get(pk=reservation.pk)
+        if not locked.is_active:
+            raise ValidationError(f"Reservation is already {locked.get_status_display().lower()}")
+        locked.expires = expires
+        locked.save(update_fields=["expires"])
+    reservation.expires = expires
+    return reservation
+
+
+def _lock_reservations(reservations, queryset):
+    """Lock the inventory rows, then the still active reservations among ``reservations``, in primary-key order.
+
+    Returns ``(batch, reservations)``. Reservations whose inventory record isn't in ``queryset`` are left out.
+    """
+    reservation_ids = {getattr(reservation, "pk", reservation) for reservation in reservations}
+    active = SparePartReservation.objects.filter(pk__in=reservation_ids, status="active")
+    batch = _StockBatch(queryset, set(active.values_list("spare_part_inventory", flat=True)))
+    locked = [
+        reservation
+        for reservation in active.select_for_update().order_by("pk")
+        if reservation.spare_part_inventory_id in batch.locked
+    ]
+    return batch, locked
+
+
+def _deallocate_reservation(batch, reservation, reason, user=None):
+    """Deallocate the units of ``reservation`` in ``batch``."""
+    inventory = batch.locked[reservation.spare_part_inventory_id]
+    # The reserved count can have been lowered directly (edit form, import); only what is left can be released.
+    units = min(reservation.quantity, inventory.quantity_reserved)
+    if units:
+        batch.move(inventory, "deallocation", -units, reason, user=user)
+
+
+def release_reservations(reservations, status="released", reason="", user=None, queryset=None):
+    """Close the active reservations among ``reservations`` (instances or primary keys) and deallocate their units.
+
+    ``status`` is "released" or "expired". Everything is written in one database transaction, with a deallocation
+    on the ledger per reservation. ``queryset`` behaves as for apply_stock_movements(). Returns the reservations
+    closed.
+    """
+    if queryset is None:
+        queryset = SparePartInventory.objects.all()
+    with transaction.atomic():
+        batch, closed = _lock_reservations(reservations, queryset)
+        for reservation in closed:
+            _deallocate_reservation(
+                batch, reservation, reason or f"Reservation for {reservation.holder} {status}", user=user
+            )
+            reservation.status = status
+            reservation.closed = batch.now
+        SparePartReservation.objects.bulk_update(closed, ["status", "closed"])
+        batch.write()
+    return closed
+
+
+def consume_reservation(reservation, quantity=None, reason="", user=None, related_device=None, notes="", queryset=None):
+    """Check out the units of an active reservation and close it as consumed, in one database transaction.
+
+    The reservation's units are deallocated and ``quantity`` of them (all by default) checked out; any left over go
+    back to available stock. ``queryset`` behaves as for apply_stock_movements(). Returns the check-out ledger row.
+    """
+    if queryset is None:
+        queryset = SparePartInventory.objects.all()
+    with transaction.atomic():
+        batch, locked = _lock_reservations([reservation], queryset)
+        if not locked:
+            raise ValidationError("Reservation is not active or its inventory record was not found")
+        (locked,) = locked
+        if quantity is None:
+            quantity = locked.quantity
+        if not 0 < quantity <= locked.quantity:
+            raise ValidationError(f"Can only check out 1 to {locked.quantity} units of this reservation")
+
+        reason = reason or f"Used for {locked.holder}"
+        _deallocate_reservation(batch, locked, reason, user=user)
+        txn = batch.move(
+            batch.locked[locked.spare_part_inventory_id],
+            "check_out",
+            -quantity,
+            reason,
+            user=user,
+            related_device=related_device,
+            notes=notes,
+        )
+        locked.status = "consumed"
+        locked.closed = batch.now
+        locked.save(update_fields=["status", "closed"])
+        batch.write()
+
+    reservation.status = locked.status
+    reservation.closed = locked.closed
+    return txn
+
+
+def release_expired_reservations(now=None, batch_size=DEFAULT_SWEEP_BATCH_SIZE, user=None):
+    """Release every active reservation that has expired by ``now``, one batch per database transaction.
+
+    Returns the number of reservations released.
+    """
+    if now is None:
+        now = timezone.now()
+    total = 0
+    while True:
+        expired = list(
+            SparePartReservation.objects.filter(status="active", expires__lte=now)
+            .order_by("expires")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not expired:
+            break
+        released = release_reservations(expired, status="expired", user=user)
+        if not released:
+            break
+        total += len(released)
+    return total
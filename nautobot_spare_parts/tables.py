@@ -18,7 +18,17 @@ class SparePartTypeTable(BaseTable):
     total_quantity = tables.Column(
         accessor="get_total_quantity",
         verbose_name="Total Qty",
-        orderable=False,
+        order_by=("total_quantity",),
+    )
+    total_available = tables.Column(
+        accessor="stock_totals__total_available",
+        verbose_name="Available",
+        order_by=("total_available",),
+    )
+    location_count = tables.Column(
+        accessor="stock_totals__location_count",
+        verbose_name="Locations",
+        order_by=("location_count",),
     )
     tags = TagColumn(url_name="plugins:nautobot_spare_parts:spareparttype_list")
     actions = ButtonsColumn(SparePartType)
@@ -34,6 +44,8 @@ class SparePartTypeTable(BaseTable):
             "part_number",
             "unit_cost",
             "total_quantity",
+            "total_available",
+            "location_count",
             "tags",
             "actions",
         )
@@ -59,13 +71,11 @@ class SparePartInventoryTable(BaseTable):
     quantity_available = tables.Column(
         accessor="quantity_available",
         verbose_name="Available",
-        orderable=False,
     )
     minimum_quantity = tables.Column(verbose_name="Min Qty")
     is_low_stock = BooleanColumn(
         accessor="is_low_stock",
         verbose_name="Low Stock",
-        orderable=False,
     )
     storage_location_detail = tables.Column(verbose_name="Storage Detail")
     tags = TagColumn(url_name="plugins:nautobot_spare_parts:sparepartinventory_list")
@@ -148,14 +158,12 @@ class LowStockTable(BaseTable):
     quantity_available = tables.Column(
         accessor="quantity_available",
         verbose_name="Available",
-        orderable=False,
     )
     minimum_quantity = tables.Column(verbose_name="Min Qty")
     reorder_quantity = tables.Column(verbose_name="Reorder Qty")
     needs_reorder = BooleanColumn(
         accessor="needs_reorder",
         verbose_name="Needs Reorder",
-        orderable=False,
     )
     actions = ButtonsColumn(SparePartInventory)
 
@@ -3,6 +3,12 @@
 from django.urls import reverse
 from nautobot.apps.ui import TemplateExtension
 
+from nautobot_spare_parts.compatibility import find_compatible_stock
+from nautobot_spare_parts.models import SparePartInventory
+
+# Records at other locations listed in the device page panel.
+DEVICE_PANEL_ELSEWHERE_LIMIT = 5
+
 
 class SparePartInventoryButtons(TemplateExtension):
     """Add check-in/check-out buttons to SparePartInventory detail view."""
@@ -14,6 +20,7 @@ class SparePartInventoryButtons(TemplateExtension):
         obj = self.context["object"]
         check_in_url = reverse("plugins:nautobot_spare_parts:sparepartinventory_checkin", args=[obj.pk])
         check_out_url = reverse("plugins:nautobot_spare_parts:sparepartinventory_checkout", args=[obj.pk])
+        transfer_url = reverse("plugins:nautobot_spare_parts:sparepartinventory_transfer", args=[obj.pk])
 
         return f"""
         <a href="{check_in_url}" class="btn btn-success">
@@ -22,7 +29,28 @@ class SparePartInventoryButtons(TemplateExtension):
         <a href="{check_out_url}" class="btn btn-warning">
             <i class="mdi mdi-minus"></i> Check Out
         </a>
+        <a href="{transfer_url}" class="btn btn-info">
+            <i class="mdi mdi-swap-horizontal"></i> Transfer
+        </a>
         """
 
 
-template_extensions = [SparePartInventoryButtons]
+class DeviceCompatibleSpareParts(TemplateExtension):
+    """Add the compatible spare parts in stock to the Device detail view."""
+
+    model = "dcim.device"
+
+    def right_page(self):
+        """List the compatible stock at the device's location, then elsewhere."""
+        user = self.context["request"].user
+        if not user.has_perm("nautobot_spare_parts.view_sparepartinventory"):
+            return ""
+        result = find_compatible_stock(
+            [self.context["object"]],
+            inventories=SparePartInventory.objects.restrict(user, "view"),
+            elsewhere_limit=DEVICE_PANEL_ELSEWHERE_LIMIT,
+        )[0]
+        return self.render("nautobot_spare_parts/device_compatible_stock.html", extra_context={"result": result})
+
+
+template_extensions = [SparePartInventoryButtons, DeviceCompatibleSpareParts]
@@ -0,0 +1 @@
+"""Unit tests for nautobot_spare_parts."""
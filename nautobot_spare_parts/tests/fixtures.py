@@ -0,0 +1,40 @@
+"""Test data shared by the Spare Parts Inventory tests."""
+
+from django.contrib.contenttypes.models import ContentType
+from django.utils.text import slugify
+from nautobot.dcim.models import Device, Location, LocationType
+from nautobot.extras.models import Role, Status
+
+from nautobot_spare_parts.models import SparePartInventory, SparePartType
+
+
+def create_locations(count, prefix="Site"):
+    """Create ``count`` top-level locations named "<prefix> 0", "<prefix> 1", ..."""
+    location_type, _ = LocationType.objects.get_or_create(name="Site")
+    status, _ = Status.objects.get_or_create(name="Active")
+    status.content_types.add(ContentType.objects.get_for_model(Location))
+    return [
+        Location.objects.create(name=f"{prefix} {index}", location_type=location_type, status=status)
+        for index in range(count)
+    ]
+
+
+def create_spare_part_type(name, category="ram"):
+    """Create a part type."""
+    return SparePartType.objects.create(name=name, slug=slugify(name), category=category)
+
+
+def create_inventory(spare_part_type, location, **levels):
+    """Create an inventory record; ``levels`` sets its quantities."""
+    return SparePartInventory.objects.create(spare_part_type=spare_part_type, location=location, **levels)
+
+
+def create_device(name, device_type, location):
+    """Create a device of ``device_type`` at ``location``."""
+    device_content_type = ContentType.objects.get_for_model(Device)
+    location.location_type.content_types.add(device_content_type)
+    role, _ = Role.objects.get_or_create(name="Server")
+    role.content_types.add(device_content_type)
+    status, _ = Status.objects.get_or_create(name="Active")
+    status.content_types.add(device_content_type)
+    return Device.objects.create(name=name, device_type=device_type, role=role, location=location, status=status)
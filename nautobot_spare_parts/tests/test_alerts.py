@@ -0,0 +1,139 @@
+"""Tests for the low stock alert dispatcher."""
+
+from types import SimpleNamespace
+import uuid
+
+from nautobot.apps.testing import TestCase
+
+from nautobot_spare_parts import alerts
+from nautobot_spare_parts.stock import apply_stock_movement
+from nautobot_spare_parts.tests import fixtures
+
+
+def make_alert(inventory_id, low):
+    """Return an alert for an inventory record that has gone low (or recovered)."""
+    return alerts.LowStockAlert(
+        SimpleNamespace(
+            pk=inventory_id,
+            spare_part_type="Fan module",
+            location="Site 0",
+            is_low_stock=low,
+            quantity_available=0 if low else 5,
+            minimum_quantity=1,
+            reorder_quantity=4,
+            needs_reorder=low,
+        )
+    )
+
+
+class FailingBackend(alerts.AlertBackend):
+    """A backend whose deliveries always fail."""
+
+    def send(self, alerts):
+        """Fail."""
+        raise ConnectionError("Webhook unreachable")
+
+
+class AlertDispatcherTestCase(TestCase):
+    """Coalescing and delivery, with the window flushed by hand."""
+
+    def setUp(self):
+        """Create a dispatcher delivering to memory with a window long enough never to fire in a test."""
+        super().setUp()
+        self.backend = alerts.MemoryBackend()
+        self.dispatcher = alerts.AlertDispatcher(backends=[self.backend], window=3600)
+
+    def tearDown(self):
+        """Stop the dispatcher's timer."""
+        self.dispatcher.configure(backends=[], window=0)
+        super().tearDown()
+
+    def test_alerts_are_held_until_the_window_closes(self):
+        self.dispatcher.enqueue(make_alert(uuid.uuid4(), low=True))
+
+        self.assertEqual(self.backend.alerts, [])
+        self.assertEqual(len(self.dispatcher.flush()), 1)
+        self.assertEqual(len(self.backend.batches), 1)
+
+    def test_alerts_for_one_record_are_coalesced(self):
+        inventory_id = uuid.uuid4()
+        self.dispatcher.enqueue(make_alert(inventory_id, low=True))
+        self.dispatcher.enqueue(make_alert(inventory_id, low=True))
+        self.dispatcher.enqueue(make_alert(uuid.uuid4(), low=True))
+
+        self.dispatcher.flush()
+
+        self.assertEqual(len(self.backend.alerts), 2)
+
+    def test_a_record_that_goes_low_and_recovers_within_the_window_sends_nothing(self):
+        inventory_id = uuid.uuid4()
+        self.dispatcher.enqueue(make_alert(inventory_id, low=True))
+        self.dispatcher.enqueue(make_alert(inventory_id, low=False))
+
+        self.assertEqual(self.dispatcher.flush(), [])
+        self.assertEqual(self.backend.batches, [])
+
+    def test_a_failing_backend_does_not_stop_the_others(self):
+        self.dispatcher.configure(backends=[FailingBackend(), self.backend], window=3600)
+        self.dispatcher.enqueue(make_alert(uuid.uuid4(), low=True))
+
+        with self.assertLogs(alerts.logger, "ERROR"):
+            self.dispatcher.flush()
+
+        self.assertEqual(len(self.backend.alerts), 1)
+
+    def test_no_window_delivers_at_once(self):
+        self.dispatcher.configure(backends=[self.backend], window=0)
+
+        self.dispatcher.enqueue(make_alert(uuid.uuid4(), low=True))
+
+        self.assertEqual(len(self.backend.alerts), 1)
+
+
+class LowStockTransitionTestCase(TestCase):
+    """Saves and stock movements alert only when a record crosses its minimum stock level."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a record two units above its minimum."""
+        (location,) = fixtures.create_locations(1)
+        spare_part_type = fixtures.create_spare_part_type("40mm fan module", category="fan")
+        cls.inventory = fixtures.create_inventory(spare_part_type, location, quantity_on_hand=5, minimum_quantity=3)
+
+    def setUp(self):
+        """Deliver alerts to memory as soon as they are queued."""
+        super().setUp()
+        self.backend = alerts.MemoryBackend()
+        alerts.dispatcher.configure(backends=[self.backend], window=0)
+
+    def tearDown(self):
+        """Go back to the configured alert backends."""
+        alerts.dispatcher.configure()
+        super().tearDown()
+
+    def check_out(self, quantity):
+        """Check out ``quantity`` units, running the callbacks queued for the commit."""
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_stock_movement(self.inventory, "check_out", -quantity, "Used")
+
+    def test_only_crossings_alert(self):
+        self.check_out(1)
+        self.assertEqual(self.backend.alerts, [])
+
+        self.check_out(1)
+        self.check_out(1)
+        self.assertEqual([alert.state for alert in self.backend.alerts], [alerts.LOW])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_stock_movement(self.inventory, "check_in", 4, "Delivery")
+        self.assertEqual([alert.state for alert in self.backend.alerts], [alerts.LOW, alerts.RECOVERED])
+
+    def test_saves_alert_on_crossings_only(self):
+        self.inventory.minimum_quantity = 10
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inventory.save()
+        self.inventory.notes = "Still low"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.inventory.save()
+
+        self.assertEqual([alert.state for alert in self.backend.alerts], [alerts.LOW])
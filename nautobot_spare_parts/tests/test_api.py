@@ -0,0 +1,439 @@
+"""Tests for the Spare Parts Inventory REST API."""
+
+import base64
+from datetime import timedelta
+import json
+import time
+from unittest import mock
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+from nautobot.apps.testing import APITestCase
+from nautobot.dcim.models import DeviceType, Manufacturer
+from nautobot.extras.models import Tag
+from nautobot.users.models import ObjectPermission
+
+from nautobot_spare_parts.models import SparePartInventory, SparePartTransaction, SparePartType
+from nautobot_spare_parts.stock import apply_stock_movement
+from nautobot_spare_parts.tests import fixtures
+from nautobot_spare_parts.utils import CACHE_KEY_PREFIX
+
+INVENTORY_PERMISSIONS = (
+    "nautobot_spare_parts.view_sparepartinventory",
+    "nautobot_spare_parts.add_sparepartinventory",
+    "nautobot_spare_parts.change_sparepartinventory",
+)
+
+# Where the time of the last stock change is kept (see utils.mark_changed).
+CHANGE_TIME_KEY = f"{CACHE_KEY_PREFIX}:stock:changed"
+
+
+def api_url(name, **kwargs):
+    """Return the URL of one of the plugin's API views."""
+    return reverse(f"plugins-api:nautobot_spare_parts-api:{name}", kwargs=kwargs or None)
+
+
+def add_constrained_permission(user, model, actions, constraints):
+    """Give ``user`` the ``actions`` on the ``model`` records matching ``constraints``."""
+    permission = ObjectPermission.objects.create(
+        name=f"{model.__name__} {'/'.join(actions)} {constraints}", actions=actions, constraints=constraints
+    )
+    permission.object_types.add(ContentType.objects.get_for_model(model))
+    permission.users.add(user)
+    return permission
+
+
+class BulkStockMovementAPITestCase(APITestCase):
+    """POST spare-part-inventory/bulk-movements/."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a part type stocked at two locations."""
+        cls.locations = fixtures.create_locations(2)
+        cls.spare_part_type = fixtures.create_spare_part_type("100G QSFP28 LR4", category="transceiver")
+        cls.inventories = [
+            fixtures.create_inventory(cls.spare_part_type, location, quantity_on_hand=5) for location in cls.locations
+        ]
+
+    def post_movements(self, movements, **options):
+        """POST the movements and return the response."""
+        return self.client.post(
+            api_url("sparepartinventory-bulk-movements"),
+            {"movements": movements, **options},
+            format="json",
+            **self.header,
+        )
+
+    def movement(self, inventory, quantity, transaction_type="check_out"):
+        """Return one request item."""
+        return {
+            "inventory": str(inventory.pk),
+            "transaction_type": transaction_type,
+            "quantity": quantity,
+            "reason": "Optics swap",
+        }
+
+    def test_atomic_request_with_an_invalid_item_changes_nothing(self):
+        self.add_permissions(*INVENTORY_PERMISSIONS)
+
+        response = self.post_movements([self.movement(self.inventories[0], 2), self.movement(self.inventories[1], 9)])
+
+        self.assertHttpStatus(response, 400)
+        self.assertEqual(response.data["status"], "error")
+        self.assertEqual([result["status"] for result in response.data["results"]], ["not_applied", "error"])
+        self.assertFalse(SparePartTransaction.objects.exists())
+        self.assertEqual(set(SparePartInventory.objects.values_list("quantity_on_hand", flat=True)), {5})
+
+    def test_best_effort_request_applies_the_valid_items(self):
+        self.add_permissions(*INVENTORY_PERMISSIONS)
+
+        response = self.post_movements(
+            [self.movement(self.inventories[0], 2), self.movement(self.inventories[1], 9)], atomic=False
+        )
+
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["status"], "partial")
+        self.assertEqual((response.data["applied"], response.data["failed"]), (1, 1))
+        first, second = response.data["results"]
+        self.assertEqual((first["quantity_before"], first["quantity_after"]), (5, 3))
+        self.assertEqual(second["status"], "error")
+        self.inventories[0].refresh_from_db()
+        self.assertEqual(self.inventories[0].quantity_on_hand, 3)
+
+    def test_items_the_user_may_not_change_are_not_found(self):
+        self.add_permissions(
+            "nautobot_spare_parts.view_sparepartinventory", "nautobot_spare_parts.add_sparepartinventory"
+        )
+        add_constrained_permission(
+            self.user, SparePartInventory, ["change"], {"location_id": str(self.locations[0].pk)}
+        )
+
+        response = self.post_movements(
+            [self.movement(self.inventories[0], 1), self.movement(self.inventories[1], 1)], atomic=False
+        )
+
+        self.assertHttpStatus(response, 200)
+        self.assertEqual([result["status"] for result in response.data["results"]], ["success", "error"])
+        self.assertEqual(response.data["results"][1]["message"], "Inventory record not found")
+        self.inventories[1].refresh_from_db()
+        self.assertEqual(self.inventories[1].quantity_on_hand, 5)
+
+
+class TransferAPITestCase(APITestCase):
+    """POST spare-part-inventory/<id>/transfer/."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a part type stocked at two locations."""
+        cls.locations = fixtures.create_locations(2)
+        cls.spare_part_type = fixtures.create_spare_part_type("800W PSU", category="psu")
+        cls.source, cls.destination = [
+            fixtures.create_inventory(cls.spare_part_type, location, quantity_on_hand=5) for location in cls.locations
+        ]
+
+    def transfer(self, quantity=2):
+        """Transfer ``quantity`` units from the source to the destination location."""
+        return self.client.post(
+            api_url("sparepartinventory-transfer", pk=self.source.pk),
+            {"destination_location": str(self.locations[1].pk), "quantity": quantity, "reason": "Rebalance"},
+            format="json",
+            **self.header,
+        )
+
+    def test_transfer_credits_the_destination(self):
+        self.add_permissions(*INVENTORY_PERMISSIONS, "dcim.view_location")
+
+        response = self.transfer()
+
+        self.assertHttpStatus(response, 200)
+        self.source.refresh_from_db()
+        self.destination.refresh_from_db()
+        self.assertEqual((self.source.quantity_on_hand, self.destination.quantity_on_hand), (3, 7))
+        debit, credit = SparePartTransaction.objects.order_by("quantity")
+        self.assertEqual(credit.transfer_source, debit)
+
+    def test_transfer_into_a_record_the_user_may_not_change_is_refused(self):
+        self.add_permissions(
+            "nautobot_spare_parts.view_sparepartinventory",
+            "nautobot_spare_parts.add_sparepartinventory",
+            "dcim.view_location",
+        )
+        add_constrained_permission(
+            self.user, SparePartInventory, ["change"], {"location_id": str(self.locations[0].pk)}
+        )
+
+        response = self.transfer()
+
+        self.assertHttpStatus(response, 400)
+        self.assertIn("Destination inventory not found", response.data["message"])
+        self.source.refresh_from_db()
+        self.destination.refresh_from_db()
+        self.assertEqual((self.source.quantity_on_hand, self.destination.quantity_on_hand), (5, 5))
+        self.assertFalse(SparePartTransaction.objects.exists())
+
+
+class ListQueryCountAPITestCase(APITestCase):
+    """The list endpoints load related objects in a fixed number of queries, however many rows they return."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create the shared related objects; the rows themselves are added by the tests."""
+        cls.manufacturer = Manufacturer.objects.create(name="Acme")
+        cls.tag = Tag.objects.create(name="Critical spares")
+        cls.tag.content_types.add(
+            ContentType.objects.get_for_model(SparePartType), ContentType.objects.get_for_model(SparePartInventory)
+        )
+
+    def setUp(self):
+        """Start numbering the rows from zero."""
+        super().setUp()
+        self.created = 0
+
+    def add_rows(self, count):
+        """Add ``count`` part types, each with a device type, a tag and stock at a location of its own."""
+        for location in fixtures.create_locations(count, prefix=f"Batch {self.created}"):
+            self.created += 1
+            spare_part_type = fixtures.create_spare_part_type(f"Part {self.created}")
+            spare_part_type.manufacturer = self.manufacturer
+            spare_part_type.save()
+            spare_part_type.compatible_device_types.add(
+                DeviceType.objects.create(manufacturer=self.manufacturer, model=f"Chassis {self.created}")
+            )
+            spare_part_type.tags.add(self.tag)
+            fixtures.create_inventory(spare_part_type, location, quantity_on_hand=2).tags.add(self.tag)
+
+    def assertConstantQueries(self, url, **params):
+        """Check that listing ``url`` takes the same number of queries for N and 2N rows."""
+        self.add_permissions(
+            "nautobot_spare_parts.view_spareparttype",
+            "nautobot_spare_parts.view_sparepartinventory",
+            "dcim.view_location",
+        )
+        self.add_rows(3)
+        # The first request also loads the user's permissions and the content types, which are then cached
+        self.assertHttpStatus(self.client.get(url, params, **self.header), 200)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params, **self.header)
+        self.assertEqual(len(response.data["results"]), 3)
+
+        self.add_rows(3)
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get(url, params, **self.header)
+        self.assertEqual(len(response.data["results"]), 6)
+
+    def test_spare_part_type_list(self):
+        self.assertConstantQueries(api_url("spareparttype-list"))
+
+    def test_spare_part_type_flat_list(self):
+        self.assertConstantQueries(api_url("spareparttype-list"), flat="true")
+
+    def test_inventory_list(self):
+        self.assertConstantQueries(api_url("sparepartinventory-list"))
+
+    def test_inventory_flat_list(self):
+        self.assertConstantQueries(api_url("sparepartinventory-list"), flat="true")
+
+
+class KeysetPaginationAPITestCase(APITestCase):
+    """GET spare-part-transactions/?cursor=."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Record seven check ins, a minute apart."""
+        (location,) = fixtures.create_locations(1)
+        inventory = fixtures.create_inventory(
+            fixtures.create_spare_part_type("2m DAC cable", category="cable"), location
+        )
+        start = timezone.now() - timedelta(hours=1)
+        for minute in range(7):
+            txn = apply_stock_movement(inventory, "check_in", 1, "Delivery")
+            SparePartTransaction.objects.filter(pk=txn.pk).update(timestamp=start + timedelta(minutes=minute))
+
+    def setUp(self):
+        """Allow viewing the ledger."""
+        super().setUp()
+        self.add_permissions("nautobot_spare_parts.view_spareparttransaction")
+
+    def read_pages(self, **params):
+        """Follow the ``next`` links from the first page of ``params``; return the IDs on each page."""
+        pages = []
+        response = self.client.get(api_url("spareparttransaction-list"), {"cursor": "", **params}, **self.header)
+        while True:
+            self.assertHttpStatus(response, 200)
+            self.assertNotIn("count", response.data)
+            pages.append([result["id"] for result in response.data["results"]])
+            if response.data["next"] is None:
+                return pages
+            response = self.client.get(response.data["next"], **self.header)
+
+    def ordered_ids(self, *ordering):
+        """Return the transaction IDs (as strings) in ``ordering``."""
+        return [str(pk) for pk in SparePartTransaction.objects.order_by(*ordering).values_list("pk", flat=True)]
+
+    def test_next_links_page_through_the_ledger(self):
+        newest_first = self.read_pages(limit=3)
+        oldest_first = self.read_pages(limit=3, ascending="true")
+
+        self.assertEqual([len(page) for page in newest_first], [3, 3, 1])
+        self.assertEqual(sum(newest_first, []), self.ordered_ids("-timestamp", "-id"))
+        self.assertEqual(sum(oldest_first, []), self.ordered_ids("timestamp", "id"))
+
+    def test_transactions_with_the_same_timestamp_are_split_by_id(self):
+        SparePartTransaction.objects.update(timestamp=timezone.now() - timedelta(minutes=5))
+
+        pages = self.read_pages(limit=2)
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+        self.assertEqual(sum(pages, []), self.ordered_ids("-id"))
+
+    def test_malformed_cursor_is_not_found(self):
+        def encode(data):
+            return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+        cursors = [
+            "not-a-cursor",
+            encode({"ascending": True}),
+            encode([True, [timezone.now().isoformat()]]),
+            encode([True, [None, None]]),
+            encode([True, ["yesterday", str(SparePartTransaction.objects.first().pk)]]),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get(api_url("spareparttransaction-list"), {"cursor": cursor}, **self.header)
+                self.assertHttpStatus(response, 404)
+
+
+class IfMatchAPITestCase(APITestCase):
+    """Writes to an inventory record with ``If-Match`` only apply while the record is at the version sent."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a record with five units on hand."""
+        (location,) = fixtures.create_locations(1)
+        spare_part_type = fixtures.create_spare_part_type("1.2TB SAS HDD", category="hdd")
+        cls.inventory = fixtures.create_inventory(spare_part_type, location, quantity_on_hand=5)
+
+    def setUp(self):
+        """Allow the user to view and change inventory records."""
+        super().setUp()
+        self.add_permissions(*INVENTORY_PERMISSIONS)
+        self.url = api_url("sparepartinventory-detail", pk=self.inventory.pk)
+
+    def patch(self, data, **headers):
+        """PATCH the record and return the response."""
+        return self.client.patch(self.url, data, format="json", **self.header, **headers)
+
+    def check_out(self, **headers):
+        """Check out one unit and return the response."""
+        return self.client.post(
+            api_url("sparepartinventory-check-out", pk=self.inventory.pk),
+            {"quantity": 1, "reason": "Failed drive"},
+            format="json",
+            **self.header,
+            **headers,
+        )
+
+    def test_detail_etag_starts_with_the_version(self):
+        response = self.client.get(self.url, **self.header)
+
+        self.assertHttpStatus(response, 200)
+        self.assertTrue(response["ETag"].startswith(f'"{self.inventory.version}-'))
+
+    def test_update_from_the_detail_etag_succeeds(self):
+        etag = self.client.get(self.url, **self.header)["ETag"]
+
+        response = self.patch({"notes": "Top shelf"}, HTTP_IF_MATCH=etag)
+
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response["ETag"], f'"{self.inventory.version + 1}"')
+
+    def test_stale_update_is_refused(self):
+        response = self.patch({"notes": "Top shelf"}, HTTP_IF_MATCH=f'"{self.inventory.version + 1}"')
+
+        self.assertHttpStatus(response, 412)
+        self.inventory.refresh_from_db()
+        self.assertEqual((self.inventory.notes, self.inventory.version), ("", 1))
+
+    def test_stale_check_out_is_refused(self):
+        response = self.check_out(HTTP_IF_MATCH=f'"{self.inventory.version + 1}"')
+
+        self.assertHttpStatus(response, 412)
+        self.assertEqual(response.data["status"], "error")
+        self.assertFalse(SparePartTransaction.objects.exists())
+
+        response = self.check_out()
+
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response["ETag"], f'"{self.inventory.version + 1}"')
+
+
+class ConditionalGetAPITestCase(APITestCase):
+    """GET spare-part-inventory/ with ``If-None-Match`` and ``If-Modified-Since``."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a record, last changed a day ago."""
+        (location,) = fixtures.create_locations(1)
+        spare_part_type = fixtures.create_spare_part_type("2.5in drive caddy", category="other")
+        cls.inventory = fixtures.create_inventory(spare_part_type, location, quantity_on_hand=3)
+        cls.changed = timezone.now() - timedelta(days=1)
+        SparePartInventory.objects.update(last_updated=cls.changed)
+
+    def setUp(self):
+        """Allow the user to view inventory records and record the last stock change a day ago."""
+        super().setUp()
+        self.add_permissions("nautobot_spare_parts.view_sparepartinventory")
+        cache.set(CHANGE_TIME_KEY, self.changed, timeout=None)
+        self.url = api_url("sparepartinventory-list")
+
+    def get(self, **headers):
+        """List the records and return the response."""
+        return self.client.get(self.url, **self.header, **headers)
+
+    def test_unchanged_list_is_not_modified(self):
+        etag = self.get()["ETag"]
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertHttpStatus(response, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+    def test_stock_movement_changes_the_etag(self):
+        etag = self.get()["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            apply_stock_movement(self.inventory, "check_in", 1, "Delivery")
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertHttpStatus(response, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        last_modified = self.get()["Last-Modified"]
+        self.assertEqual(last_modified, http_date(self.changed.timestamp()))
+
+        self.assertHttpStatus(self.get(HTTP_IF_MODIFIED_SINCE=last_modified), 304)
+
+    def test_missing_change_time_never_gives_not_modified(self):
+        later = http_date(time.time() + 3600)
+        self.assertHttpStatus(self.get(HTTP_IF_MODIFIED_SINCE=later), 304)
+
+        cache.delete(CHANGE_TIME_KEY)
+
+        self.assertHttpStatus(self.get(HTTP_IF_MODIFIED_SINCE=later), 200)
+
+    def test_change_in_the_current_second_has_no_last_modified(self):
+        now = timezone.now()
+        cache.set(CHANGE_TIME_KEY, now, timeout=None)
+
+        with mock.patch.object(timezone, "now", return_value=now):
+            response = self.get(HTTP_IF_MODIFIED_SINCE=http_date(now.timestamp()))
+
+        self.assertHttpStatus(response, 200)
+        self.assertNotIn("Last-Modified", response)
@@ -0,0 +1,57 @@
+"""Tests for archiving old ledger transactions."""
+
+from datetime import timedelta
+
+from django.utils import timezone
+from nautobot.apps.testing import TestCase
+
+from nautobot_spare_parts.archive import archive_batch, archive_transactions
+from nautobot_spare_parts.models import SparePartStockCheckpoint, SparePartTransaction, SparePartTransactionArchive
+from nautobot_spare_parts.stock import apply_stock_movement, transfer_stock
+from nautobot_spare_parts.tests import fixtures
+
+
+class ArchiveTestCase(TestCase):
+    """Old transactions move to the archive, and the two halves of a transfer always move together."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Receive stock and transfer some of it away four times, all a week ago but the last transfer's arrival."""
+        cls.locations = fixtures.create_locations(2)
+        spare_part_type = fixtures.create_spare_part_type("1.92TB NVMe SSD", category="ssd")
+        inventory = fixtures.create_inventory(spare_part_type, cls.locations[0])
+        cls.delivery = apply_stock_movement(inventory, "check_in", 10, "Delivery")
+        cls.transfers = [transfer_stock(inventory, cls.locations[1], 1, "Rebalance") for _ in range(4)]
+
+        SparePartTransaction.objects.update(timestamp=timezone.now() - timedelta(days=7))
+        cls.late_arrival = cls.transfers[-1][1]
+        SparePartTransaction.objects.filter(pk=cls.late_arrival.pk).update(timestamp=timezone.now())
+        cls.cutoff = timezone.now() - timedelta(days=1)
+
+    def assertTransfersArchivedInPairs(self):
+        """Check that no transfer has one half live and the other archived."""
+        archived = set(SparePartTransactionArchive.objects.values_list("pk", flat=True))
+        for debit, credit in self.transfers:
+            self.assertEqual(debit.pk in archived, credit.pk in archived)
+
+    def test_transfer_halves_are_archived_together(self):
+        batches = 0
+        while archive_batch(self.cutoff, batch_size=1):
+            batches += 1
+            self.assertTransfersArchivedInPairs()
+
+        # One batch for the delivery and one for each transfer that arrived before the cutoff
+        self.assertEqual(batches, 4)
+        live = {self.transfers[-1][0].pk, self.late_arrival.pk}
+        self.assertEqual(set(SparePartTransaction.objects.values_list("pk", flat=True)), live)
+        self.assertEqual(SparePartTransactionArchive.objects.count(), 7)
+        for debit, credit in self.transfers[:-1]:
+            self.assertEqual(SparePartTransactionArchive.objects.get(pk=credit.pk).transfer_source, debit.pk)
+
+    def test_archive_transactions_records_the_carry_forward_checkpoint(self):
+        self.assertEqual(archive_transactions(self.cutoff, batch_size=3), 7)
+
+        self.assertTrue(SparePartStockCheckpoint.objects.filter(timestamp=self.cutoff).exists())
+        self.assertEqual(SparePartTransaction.objects.count(), 2)
+        self.assertTransfersArchivedInPairs()
+        self.assertEqual(archive_transactions(self.cutoff), 0)
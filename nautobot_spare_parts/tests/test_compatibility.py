@@ -0,0 +1,143 @@
+"""Tests for the compatibility index and the compatible spares finder."""
+
+import uuid
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from nautobot.apps.testing import APITestCase, TestCase
+from nautobot.dcim.models import DeviceType, Manufacturer
+
+from nautobot_spare_parts.models import SparePartCompatibility, SparePartInventory
+from nautobot_spare_parts.stock import apply_stock_movement
+from nautobot_spare_parts.tests import fixtures
+from nautobot_spare_parts.tests.test_api import add_constrained_permission, api_url
+
+
+class CompatibilityIndexTestCase(TestCase):
+    """The index follows stock running out and coming back, record moves and compatible device type changes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Stock a DIMM fitting one server model and a PSU fitting two; one DIMM record is out of stock."""
+        cls.locations = fixtures.create_locations(3)
+        manufacturer = Manufacturer.objects.create(name="Dell")
+        cls.r650 = DeviceType.objects.create(manufacturer=manufacturer, model="PowerEdge R650")
+        cls.r750 = DeviceType.objects.create(manufacturer=manufacturer, model="PowerEdge R750")
+        cls.dimm = fixtures.create_spare_part_type("32GB DDR4 RDIMM")
+        cls.dimm.compatible_device_types.add(cls.r650)
+        cls.psu = fixtures.create_spare_part_type("1400W PSU", category="psu")
+        cls.psu.compatible_device_types.add(cls.r650, cls.r750)
+        cls.dimm_stocked = fixtures.create_inventory(cls.dimm, cls.locations[0], quantity_on_hand=3)
+        cls.dimm_empty = fixtures.create_inventory(cls.dimm, cls.locations[1])
+        cls.psu_stocked = fixtures.create_inventory(cls.psu, cls.locations[1], quantity_on_hand=2)
+
+    def entries(self):
+        """Return the index as a set of ``(device type ID, inventory ID, location ID)``."""
+        return set(SparePartCompatibility.objects.values_list("device_type", "spare_part_inventory", "location"))
+
+    def assertIndexed(self, *expected):
+        """Check the index holds the ``(device type, inventory)`` pairs given, as a full rebuild would."""
+        entries = self.entries()
+        self.assertEqual(
+            entries,
+            {(device_type.pk, inventory.pk, inventory.location_id) for device_type, inventory in expected},
+        )
+        SparePartCompatibility.rebuild()
+        self.assertEqual(self.entries(), entries)
+
+    def test_in_stock_records_are_indexed(self):
+        self.assertIndexed((self.r650, self.dimm_stocked), (self.r650, self.psu_stocked), (self.r750, self.psu_stocked))
+
+    def test_running_out_and_restocking_update_the_index(self):
+        apply_stock_movement(self.dimm_stocked, "check_out", -3, "Used")
+        apply_stock_movement(self.dimm_empty, "check_in", 1, "Delivery")
+
+        self.assertIndexed((self.r650, self.dimm_empty), (self.r650, self.psu_stocked), (self.r750, self.psu_stocked))
+
+    def test_saves_that_leave_the_index_alone_do_not_rebuild_it(self):
+        table = SparePartCompatibility._meta.db_table
+        inventory = SparePartInventory.objects.get(pk=self.dimm_stocked.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            inventory.notes = "Anti-static bags"
+            inventory.save()
+            inventory.storage_location_detail = "Shelf 2"
+            inventory.save(update_fields=["storage_location_detail"])
+            inventory.quantity_on_hand = 2
+            inventory.save()
+
+        self.assertFalse([query["sql"] for query in queries if table in query["sql"]])
+
+    def test_saves_emptying_or_moving_a_record_reindex_it(self):
+        inventory = SparePartInventory.objects.get(pk=self.psu_stocked.pk)
+        inventory.location = self.locations[2]
+        inventory.save()
+        self.assertIndexed((self.r650, self.dimm_stocked), (self.r650, inventory), (self.r750, inventory))
+
+        inventory.quantity_reserved = 2
+        inventory.save()
+        self.assertIndexed((self.r650, self.dimm_stocked))
+
+    def test_compatible_device_type_changes_update_the_index(self):
+        self.psu.compatible_device_types.remove(self.r650)
+        self.assertIndexed((self.r650, self.dimm_stocked), (self.r750, self.psu_stocked))
+
+        self.r650.compatible_spare_parts.clear()
+        self.assertIndexed((self.r750, self.psu_stocked))
+
+
+class CompatibleStockAPITestCase(APITestCase):
+    """GET/POST spare-part-inventory/compatible/."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Stock a fan fitting a switch model at three locations and put a switch at the first."""
+        cls.locations = fixtures.create_locations(3)
+        device_type = DeviceType.objects.create(
+            manufacturer=Manufacturer.objects.create(name="Arista"), model="DCS-7050SX3"
+        )
+        fan = fixtures.create_spare_part_type("Fan tray, front-to-back", category="fan")
+        fan.compatible_device_types.add(device_type)
+        cls.inventories = [
+            fixtures.create_inventory(fan, location, quantity_on_hand=quantity)
+            for location, quantity in zip(cls.locations, (2, 5, 1))
+        ]
+        cls.device = fixtures.create_device("leaf-01", device_type, cls.locations[0])
+
+    def inventory_ids(self, results):
+        """Return the inventory record IDs of ``results``."""
+        return [result["inventory"] for result in results]
+
+    def test_local_records_come_first_then_the_best_stocked(self):
+        self.add_permissions("nautobot_spare_parts.view_sparepartinventory", "dcim.view_device")
+
+        response = self.client.get(
+            api_url("sparepartinventory-compatible"), {"device": str(self.device.pk)}, **self.header
+        )
+
+        self.assertHttpStatus(response, 200)
+        (result,) = response.data["results"]
+        self.assertEqual(self.inventory_ids(result["local"]), [str(self.inventories[0].pk)])
+        self.assertEqual(
+            self.inventory_ids(result["elsewhere"]), [str(self.inventories[1].pk), str(self.inventories[2].pk)]
+        )
+
+    def test_unknown_devices_and_records_the_user_may_not_view_are_left_out(self):
+        # POSTing to the list endpoint needs the add permission
+        self.add_permissions("nautobot_spare_parts.add_sparepartinventory", "dcim.view_device")
+        add_constrained_permission(self.user, SparePartInventory, ["view"], {"location_id": str(self.locations[2].pk)})
+        missing = str(uuid.uuid4())
+
+        response = self.client.post(
+            api_url("sparepartinventory-compatible"),
+            {"devices": [str(self.device.pk), missing], "elsewhere_limit": 5},
+            format="json",
+            **self.header,
+        )
+
+        self.assertHttpStatus(response, 200)
+        self.assertEqual(response.data["not_found"], [missing])
+        (result,) = response.data["results"]
+        self.assertEqual(
+            (result["local"], self.inventory_ids(result["elsewhere"])), ([], [str(self.inventories[2].pk)])
+        )
@@ -0,0 +1,79 @@
+"""Tests for demand forecasting."""
+
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock, skipIf
+
+from django.test import override_settings
+from django.utils import timezone
+from nautobot.apps.testing import run_job_for_testing, TestCase
+from nautobot.extras.choices import JobResultStatusChoices
+from nautobot.extras.models import Job
+
+from nautobot_spare_parts import forecasting
+from nautobot_spare_parts.models import SparePartDailyUsage, SparePartForecast
+from nautobot_spare_parts.tests import fixtures
+
+
+@skipIf(forecasting.numpy is None, "Forecasting needs NumPy")
+class ForecastDemandTestCase(TestCase):
+    """The forecast over several chunks of locations matches the forecast over one."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Stock a part type at three locations, each with four weeks of check-outs."""
+        spare_part_type = fixtures.create_spare_part_type("Redundant PSU 1100W", category="psu")
+        today = timezone.localdate()
+        for index, location in enumerate(fixtures.create_locations(3)):
+            inventory = fixtures.create_inventory(spare_part_type, location, quantity_on_hand=20)
+            SparePartDailyUsage.objects.bulk_create(
+                SparePartDailyUsage(
+                    spare_part_inventory=inventory,
+                    date=today - timedelta(days=day),
+                    transaction_type="check_out",
+                    transaction_count=1,
+                    units_out=(day + index) % 3,
+                )
+                for day in range(1, 29)
+            )
+
+    def forecasts(self):
+        """Return the stored forecasts by inventory record."""
+        return {
+            forecast.spare_part_inventory_id: (
+                forecast.daily_usage,
+                forecast.safety_stock,
+                forecast.recommended_minimum_quantity,
+                forecast.recommended_reorder_quantity,
+                forecast.projected_stockout,
+            )
+            for forecast in SparePartForecast.objects.all()
+        }
+
+    def run_job(self):
+        """Run the Forecast Demand job over four weeks of history, one location per chunk, and check it succeeds."""
+        job = Job.objects.get(module_name="nautobot_spare_parts.jobs", job_class_name="ForecastDemand")
+        with mock.patch.object(forecasting, "MIN_CHUNK_SIZE", 1):
+            job_result = run_job_for_testing(job, history_days=28)
+        self.assertEqual(job_result.status, JobResultStatusChoices.STATUS_SUCCESS)
+
+    def test_job_over_several_chunks_matches_a_single_chunk(self):
+        forecasting.forecast_demand(history_days=28)
+        expected = self.forecasts()
+
+        self.run_job()
+
+        self.assertEqual(len(expected), 3)
+        self.assertEqual(self.forecasts(), expected)
+
+    @override_settings(PLUGINS_CONFIG={"nautobot_spare_parts": {"forecast_workers": 4}})
+    def test_daemonic_worker_works_through_the_chunks_itself(self):
+        forecasting.forecast_demand(history_days=28)
+        expected = self.forecasts()
+
+        with mock.patch.object(
+            forecasting.multiprocessing, "current_process", return_value=SimpleNamespace(daemon=True)
+        ), mock.patch.object(forecasting, "ProcessPoolExecutor", side_effect=AssertionError("Pool started")):
+            self.run_job()
+
+        self.assertEqual(self.forecasts(), expected)
@@ -0,0 +1,105 @@
+"""Tests for the nearest available stock search."""
+
+import math
+import random
+
+from django.contrib.contenttypes.models import ContentType
+from nautobot.apps.testing import TestCase
+from nautobot.dcim.models import Location, LocationType
+from nautobot.extras.models import Status
+
+from nautobot_spare_parts import geo
+from nautobot_spare_parts.models import SparePartInventory
+from nautobot_spare_parts.tests import fixtures
+from nautobot_spare_parts.utils import bump_cache_version
+
+
+def great_circle_km(first, second):
+    """Return the haversine distance in kilometres between two ``(latitude, longitude)`` points in degrees."""
+    latitude1, longitude1, latitude2, longitude2 = map(math.radians, (*first, *second))
+    haversine = (
+        math.sin((latitude2 - latitude1) / 2) ** 2
+        + math.cos(latitude1) * math.cos(latitude2) * math.sin((longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * geo.EARTH_RADIUS_KM * math.asin(math.sqrt(haversine))
+
+
+class KDTreeTestCase(TestCase):
+    """The tree ranks points as a brute-force great-circle ranking does."""
+
+    def test_nearest_matches_a_brute_force_ranking(self):
+        generator = random.Random(20261017)
+        places = [(generator.uniform(-90, 90), generator.uniform(-180, 180)) for _ in range(500)]
+        tree = geo.KDTree((geo.unit_vector(*place), index) for index, place in enumerate(places))
+        self.assertEqual(len(tree), 500)
+
+        for origin in [(generator.uniform(-90, 90), generator.uniform(-180, 180)) for _ in range(20)]:
+            for count in (1, 7, 500, 600):
+                with self.subTest(origin=origin, count=count):
+                    found = tree.nearest(geo.unit_vector(*origin), count)
+                    expected = sorted(range(len(places)), key=lambda index: great_circle_km(origin, places[index]))
+                    self.assertEqual([index for _, index in found], expected[:count])
+                    for distance, index in found:
+                        self.assertAlmostEqual(
+                            geo.chord_to_km(distance), great_circle_km(origin, places[index]), places=3
+                        )
+
+    def test_empty_tree_and_no_count(self):
+        self.assertEqual(geo.KDTree([]).nearest(geo.unit_vector(0, 0), 3), [])
+        self.assertEqual(geo.KDTree([(geo.unit_vector(0, 0), "a")]).nearest(geo.unit_vector(0, 0), 0), [])
+
+
+class NearestStockTestCase(TestCase):
+    """Nearest-stock queries over locations in the database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Stock a part type at six sites a degree of longitude apart along the equator, with a room in the third."""
+        cls.sites = fixtures.create_locations(6)
+        for degrees, site in enumerate(cls.sites):
+            site.latitude, site.longitude = 0, degrees
+            site.save()
+        cls.spare_part_type = fixtures.create_spare_part_type("10G SFP+ LR", category="transceiver")
+        cls.inventories = [
+            fixtures.create_inventory(cls.spare_part_type, site, quantity_on_hand=2) for site in cls.sites
+        ]
+
+        site_type = cls.sites[0].location_type
+        room_type = LocationType.objects.create(name="Room", parent=site_type)
+        status = Status.objects.get(name="Active")
+        status.content_types.add(ContentType.objects.get_for_model(Location))
+        cls.room = Location.objects.create(name="Cage 12", location_type=room_type, parent=cls.sites[2], status=status)
+
+    def setUp(self):
+        """Have the coordinates and trees loaded afresh (the version bumps of saves only happen on commit)."""
+        super().setUp()
+        bump_cache_version("locations")
+
+    def test_locations_without_coordinates_use_their_ancestors(self):
+        points = geo.location_points()
+
+        self.assertEqual(points[self.room.pk], points[self.sites[2].pk])
+        self.assertEqual(geo.location_point(self.room), (self.sites[2].latitude, self.sites[2].longitude))
+
+    def test_nearest_stock_is_ordered_by_distance(self):
+        found = geo.nearest_stock(self.spare_part_type.pk, 0, 2.4, count=3)
+
+        self.assertEqual([inventory.pk for inventory, _ in found], [self.inventories[index].pk for index in (2, 3, 1)])
+        self.assertAlmostEqual(found[0][1], great_circle_km((0, 2.4), (0, 2)), places=3)
+
+    def test_records_the_user_may_not_see_make_room_for_further_ones(self):
+        visible = SparePartInventory.objects.exclude(pk__in=[inventory.pk for inventory in self.inventories[:3]])
+
+        found = geo.nearest_stock(self.spare_part_type.pk, 0, 0, count=2, inventories=visible)
+
+        self.assertEqual([inventory.pk for inventory, _ in found], [self.inventories[3].pk, self.inventories[4].pk])
+        self.assertAlmostEqual(found[0][1], great_circle_km((0, 0), (0, 3)), places=3)
+
+    def test_records_emptied_since_the_tree_was_built_are_left_out(self):
+        geo.nearest_stock(self.spare_part_type.pk, 0, 0, count=1)
+        self.inventories[0].quantity_reserved = 2
+        self.inventories[0].save()
+
+        found = geo.nearest_stock(self.spare_part_type.pk, 0, 0, count=1)
+
+        self.assertEqual(found[0][0].pk, self.inventories[1].pk)
@@ -0,0 +1,225 @@
+"""Tests for the bulk CSV importer and the bulk import view."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from nautobot.apps.testing import TestCase
+from nautobot.dcim.models import DeviceType, Manufacturer
+
+from nautobot_spare_parts.importer import import_spare_part_inventory, import_spare_part_types, read_csv
+from nautobot_spare_parts.models import (
+    SparePartCompatibility,
+    SparePartInventory,
+    SparePartStockRollup,
+    SparePartTransaction,
+    SparePartType,
+)
+from nautobot_spare_parts.tests import fixtures
+
+
+class ImportSparePartTypesTestCase(TestCase):
+    """Part type rows create new types or update the ones with the same manufacturer and part number."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a manufacturer with two device types and one existing part type."""
+        cls.manufacturer = Manufacturer.objects.create(name="Juniper")
+        cls.mx204 = DeviceType.objects.create(manufacturer=cls.manufacturer, model="MX204")
+        cls.qfx5120 = DeviceType.objects.create(manufacturer=cls.manufacturer, model="QFX5120-48Y")
+        cls.existing = SparePartType.objects.create(
+            name="PSU", slug="jnp-psu-650w", manufacturer=cls.manufacturer, part_number="JPSU-650W-AC-AFO"
+        )
+
+    def test_mixed_create_and_update(self):
+        result = import_spare_part_types(
+            read_csv(
+                "Name,Manufacturer,Part_Number,Category,Unit_Cost,Compatible_Device_Types\n"
+                "650W AC PSU,Juniper,JPSU-650W-AC-AFO,psu,,MX204|QFX5120-48Y\n"
+                f"100G QSFP28 LR4,{self.manufacturer.pk},QSFP-100G-LR4,transceiver,850.00,MX204\n"
+            )
+        )
+
+        self.assertEqual((result.errors, result.created, result.updated, result.applied), ([], 1, 1, True))
+        self.existing.refresh_from_db()
+        self.assertEqual(
+            (self.existing.name, self.existing.slug, self.existing.category), ("650W AC PSU", "jnp-psu-650w", "psu")
+        )
+        self.assertEqual(set(self.existing.compatible_device_types.all()), {self.mx204, self.qfx5120})
+        created = SparePartType.objects.get(part_number="QSFP-100G-LR4")
+        self.assertEqual((created.slug, str(created.unit_cost)), ("100g-qsfp28-lr4-qsfp-100g-lr4", "850.00"))
+        self.assertEqual(list(created.compatible_device_types.all()), [self.mx204])
+        self.assertIn("qsfp-100g-lr4", created.search_document.lower())
+        self.assertTrue(SparePartStockRollup.objects.filter(spare_part_type=created).exists())
+
+    def test_invalid_rows_are_reported(self):
+        csv_data = (
+            "name,manufacturer,part_number,category,compatible_device_types\n"
+            "SFP+ SR,Juniper,SFPP-10GE-SR,transceiver,\n"
+            "SFP+ LR,Cisco,SFP-10G-LR,transceiver,\n"
+            "SFP+ SR again,Juniper,SFPP-10GE-SR,transceiver,\n"
+            "Fan tray,Juniper,JNP-FAN,fan,MX960\n"
+            "Mystery part,,,gizmo,\n"
+        )
+
+        result = import_spare_part_types(read_csv(csv_data))
+
+        self.assertFalse(result.applied)
+        self.assertEqual([error["row"] for error in result.errors], [2, 3, 4, 5])
+        self.assertEqual(result.errors[0]["errors"], {"__all__": ["Manufacturer 'Cisco' not found"]})
+        self.assertEqual(result.errors[1]["errors"], {"__all__": ["Duplicate of row 1"]})
+        self.assertEqual(result.errors[2]["errors"], {"__all__": ["Device type 'MX960' not found"]})
+        self.assertIn("category", result.errors[3]["errors"])
+        self.assertFalse(SparePartType.objects.exclude(pk=self.existing.pk).exists())
+
+        result = import_spare_part_types(read_csv(csv_data), atomic=False)
+
+        self.assertEqual((result.created, len(result.errors), result.applied), (1, 4, True))
+        self.assertTrue(SparePartType.objects.filter(part_number="SFPP-10GE-SR").exists())
+
+
+class ImportSparePartInventoryTestCase(TestCase):
+    """Inventory rows create or update records, record the quantity changes and keep the rollups in step."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create two locations, a part type fitting one device type and one existing record."""
+        cls.locations = fixtures.create_locations(2)
+        manufacturer = Manufacturer.objects.create(name="Samsung")
+        cls.device_type = DeviceType.objects.create(manufacturer=manufacturer, model="SuperServer 1029U")
+        cls.spare_part_type = SparePartType.objects.create(
+            name="32GB DDR4 RDIMM", slug="samsung-32gb-ddr4", manufacturer=manufacturer, part_number="M393A4K40DB3"
+        )
+        cls.spare_part_type.compatible_device_types.add(cls.device_type)
+        cls.existing = fixtures.create_inventory(cls.spare_part_type, cls.locations[0], quantity_on_hand=4)
+
+    def csv_rows(self, count):
+        """Return CSV data for ``count`` new records, each at a location of its own."""
+        locations = fixtures.create_locations(count, prefix=f"Import {count}")
+        lines = [f"samsung-32gb-ddr4,{location.name},{index + 1}" for index, location in enumerate(locations)]
+        return "spare_part_type,location,quantity_on_hand\n" + "\n".join(lines)
+
+    def test_mixed_create_and_update(self):
+        result = import_spare_part_inventory(
+            read_csv(
+                "spare_part_type,manufacturer,part_number,location,quantity_on_hand,quantity_reserved,notes\n"
+                f"samsung-32gb-ddr4,,,{self.locations[0].name},10,3,\n"
+                f",Samsung,M393A4K40DB3,{self.locations[1].pk},6,,Cold aisle cabinet\n"
+            ),
+            user=self.user,
+        )
+
+        self.assertEqual((result.errors, result.created, result.updated), ([], 1, 1))
+        self.existing.refresh_from_db()
+        self.assertEqual(
+            (self.existing.quantity_on_hand, self.existing.quantity_reserved, self.existing.quantity_available),
+            (10, 3, 7),
+        )
+        self.assertEqual(self.existing.version, 2)
+        created = SparePartInventory.objects.get(location=self.locations[1])
+        self.assertEqual((created.quantity_on_hand, created.notes), (6, "Cold aisle cabinet"))
+        self.assertEqual(
+            set(
+                SparePartTransaction.objects.values_list(
+                    "spare_part_inventory", "transaction_type", "quantity", "quantity_before", "quantity_after", "user"
+                )
+            ),
+            {
+                (self.existing.pk, "adjustment", 6, 4, 10, self.user.pk),
+                (self.existing.pk, "allocation", 3, 0, 3, self.user.pk),
+                (created.pk, "adjustment", 6, 0, 6, self.user.pk),
+            },
+        )
+        self.assertEqual(
+            SparePartTransaction.objects.get(spare_part_inventory=created).reason, "Opening balance (bulk import)"
+        )
+        self.assertEqual(SparePartStockRollup.verify([self.spare_part_type.pk]), [])
+        self.assertEqual(SparePartStockRollup.objects.get(spare_part_type=self.spare_part_type).total_on_hand, 16)
+        self.assertEqual(
+            set(SparePartCompatibility.objects.values_list("spare_part_inventory", flat=True)),
+            {self.existing.pk, created.pk},
+        )
+
+    def test_invalid_rows_are_reported(self):
+        csv_data = (
+            "spare_part_type,location,quantity_on_hand,quantity_reserved\n"
+            f"samsung-32gb-ddr4,{self.locations[1].name},5,\n"
+            "samsung-32gb-ddr4,Nowhere,5,\n"
+            f"samsung-32gb-ddr4,{self.locations[1].name},2,\n"
+            f"samsung-32gb-ddr4,{self.locations[0].name},2,3\n"
+            f"unknown-part,{self.locations[0].name},1,\n"
+        )
+
+        result = import_spare_part_inventory(read_csv(csv_data), dry_run=True)
+
+        self.assertEqual((result.created, result.updated, result.applied), (1, 0, False))
+        self.assertEqual(
+            {error["row"]: error["errors"] for error in result.errors},
+            {
+                2: {"__all__": ["Location 'Nowhere' not found"]},
+                3: {"__all__": ["Duplicate of row 1"]},
+                4: {"quantity_reserved": ["Reserved quantity cannot exceed quantity on hand"]},
+                5: {"__all__": ["Spare part type 'unknown-part' not found"]},
+            },
+        )
+
+        for options in ({"dry_run": True, "atomic": False}, {"atomic": True}):
+            with self.subTest(**options):
+                result = import_spare_part_inventory(read_csv(csv_data), **options)
+                self.assertFalse(result.applied)
+                self.assertEqual(SparePartInventory.objects.count(), 1)
+                self.assertFalse(SparePartTransaction.objects.exists())
+
+        result = import_spare_part_inventory(read_csv(csv_data), atomic=False)
+
+        self.assertEqual((result.created, len(result.errors), result.applied), (1, 4, True))
+        self.assertEqual(SparePartInventory.objects.get(location=self.locations[1]).quantity_on_hand, 5)
+        self.existing.refresh_from_db()
+        self.assertEqual((self.existing.quantity_on_hand, self.existing.quantity_reserved), (4, 0))
+        self.assertEqual(SparePartStockRollup.verify([self.spare_part_type.pk]), [])
+
+    def test_queries_do_not_grow_with_the_rows_of_a_batch(self):
+        query_counts = []
+        for count in (5, 10):
+            csv_data = self.csv_rows(count)
+            with CaptureQueriesContext(connection) as queries:
+                result = import_spare_part_inventory(read_csv(csv_data))
+            self.assertEqual((result.errors, result.created), ([], count))
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[0], query_counts[1])
+
+
+class BulkImportViewTestCase(TestCase):
+    """Each kind of import needs only its own add and change permissions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a location and a part type to import stock of."""
+        (cls.location,) = fixtures.create_locations(1)
+        cls.spare_part_type = fixtures.create_spare_part_type("Cat6 patch cable 2m", category="cable")
+
+    def post(self, import_type, csv_data):
+        """Post ``csv_data`` to the import form."""
+        return self.client.post(
+            reverse("plugins:nautobot_spare_parts:bulk_import"),
+            {"import_type": import_type, "csv_data": csv_data, "atomic": "on"},
+        )
+
+    def test_import_needs_the_permissions_of_its_kind_only(self):
+        self.assertHttpStatus(self.client.get(reverse("plugins:nautobot_spare_parts:bulk_import")), 403)
+        self.add_permissions(
+            "nautobot_spare_parts.add_sparepartinventory", "nautobot_spare_parts.change_sparepartinventory"
+        )
+
+        response = self.post(
+            "spare_part_inventory", f"spare_part_type,location\ncat6-patch-cable-2m,{self.location.name}\n"
+        )
+
+        self.assertHttpStatus(response, 200)
+        self.assertTrue(SparePartInventory.objects.filter(location=self.location).exists())
+
+        response = self.post("spare_part_types", "name,category\nCat6 patch cable 3m,cable\n")
+
+        self.assertHttpStatus(response, 200)
+        self.assertIn("import_type", response.context["form"].errors)
+        self.assertFalse(SparePartType.objects.filter(name="Cat6 patch cable 3m").exists())
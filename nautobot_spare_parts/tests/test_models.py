@@ -0,0 +1,111 @@
+"""Tests for the Spare Parts Inventory models."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from nautobot.apps.testing import TestCase
+
+from nautobot_spare_parts.forms import SparePartInventoryForm
+from nautobot_spare_parts.models import SparePartInventory, SparePartStockRollup, VersionConflict
+from nautobot_spare_parts.stock import apply_stock_movement
+from nautobot_spare_parts.tests import fixtures
+
+
+class StockRollupTestCase(TestCase):
+    """The per-part-type rollups follow inventory records being created, edited and deleted."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create two part types, the first stocked at two locations."""
+        cls.locations = fixtures.create_locations(3)
+        cls.dimm = fixtures.create_spare_part_type("32GB DDR4 DIMM")
+        cls.ssd = fixtures.create_spare_part_type("3.84TB NVMe SSD", category="ssd")
+        cls.inventories = [
+            fixtures.create_inventory(cls.dimm, location, quantity_on_hand=4, minimum_quantity=2)
+            for location in cls.locations[:2]
+        ]
+
+    def assertRollup(self, spare_part_type, **expected):
+        """Check the stored rollup of ``spare_part_type`` and that it matches a recount."""
+        rollup = SparePartStockRollup.objects.get(spare_part_type=spare_part_type)
+        self.assertEqual({field: getattr(rollup, field) for field in expected}, expected)
+        self.assertEqual(SparePartStockRollup.verify([spare_part_type.pk]), [])
+
+    def test_created_records_are_added(self):
+        self.assertRollup(self.dimm, total_on_hand=8, stocked_location_count=2, low_stock_location_count=0)
+        self.assertRollup(self.ssd, total_on_hand=0, stocked_location_count=0)
+
+    def test_edits_apply_their_difference_without_a_recount(self):
+        inventory = self.inventories[0]
+        inventory.quantity_on_hand = 1
+        inventory.quantity_reserved = 1
+
+        with CaptureQueriesContext(connection) as queries:
+            inventory.save()
+
+        self.assertFalse([query["sql"] for query in queries if "SUM(" in query["sql"].upper()])
+        self.assertRollup(self.dimm, total_on_hand=5, total_reserved=1, total_available=4, low_stock_location_count=1)
+
+    def test_edit_of_other_fields_leaves_the_stored_levels(self):
+        stale = SparePartInventory.objects.get(pk=self.inventories[0].pk)
+        SparePartInventory.objects.filter(pk=stale.pk).update(quantity_on_hand=9)
+        SparePartStockRollup.rebuild([self.dimm.pk])
+        stale.notes = "Top shelf"
+
+        stale.save(update_fields=["notes"])
+
+        self.assertRollup(self.dimm, total_on_hand=13)
+
+    def test_moving_a_record_to_another_part_type_moves_its_stock(self):
+        inventory = self.inventories[0]
+        inventory.spare_part_type = self.ssd
+        inventory.save()
+
+        self.assertRollup(self.dimm, total_on_hand=4, stocked_location_count=1)
+        self.assertRollup(self.ssd, total_on_hand=4, stocked_location_count=1)
+
+    def test_deleted_records_are_taken_off(self):
+        self.inventories[0].delete()
+        self.assertRollup(self.dimm, total_on_hand=4, stocked_location_count=1)
+
+        SparePartInventory.objects.filter(spare_part_type=self.dimm).delete()
+        self.assertRollup(self.dimm, total_on_hand=0, stocked_location_count=0)
+
+
+class VersionCheckTestCase(TestCase):
+    """Edits made from a copy of an inventory record are refused once the record has moved on."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a record."""
+        (location,) = fixtures.create_locations(1)
+        spare_part_type = fixtures.create_spare_part_type("64GB DDR5 DIMM")
+        cls.inventory = fixtures.create_inventory(spare_part_type, location, quantity_on_hand=4)
+
+    def test_save_at_an_unexpected_version_is_refused(self):
+        self.inventory.notes = "Top shelf"
+        self.inventory.expected_versions = {self.inventory.version + 1}
+
+        with self.assertRaises(VersionConflict) as context:
+            self.inventory.save()
+
+        self.assertEqual(context.exception.version, 1)
+        self.assertEqual(SparePartInventory.objects.get(pk=self.inventory.pk).notes, "")
+
+    def test_form_rendered_before_a_change_is_invalid(self):
+        form = SparePartInventoryForm(instance=self.inventory)
+        data = {
+            "spare_part_type": self.inventory.spare_part_type_id,
+            "location": self.inventory.location_id,
+            "quantity_on_hand": 4,
+            "quantity_reserved": 0,
+            "minimum_quantity": 0,
+            "reorder_quantity": 0,
+            "notes": "Top shelf",
+            "expected_version": form.fields["expected_version"].initial,
+        }
+        apply_stock_movement(self.inventory, "check_in", 1, "Delivery")
+
+        form = SparePartInventoryForm(data, instance=SparePartInventory.objects.get(pk=self.inventory.pk))
+
+        self.assertFalse(form.is_valid())
+        self.assertIn("changed by someone else", form.non_field_errors()[0])
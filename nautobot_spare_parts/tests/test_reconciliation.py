@@ -0,0 +1,98 @@
+"""Tests for ledger reconciliation."""
+
+from unittest import mock
+
+from nautobot.apps.testing import TestCase
+
+from nautobot_spare_parts.models import (
+    SparePartDailyUsage,
+    SparePartInventory,
+    SparePartStockRollup,
+    SparePartTransaction,
+)
+from nautobot_spare_parts.reconciliation import CORRECTION_REASON, LedgerDiscrepancy, reconcile_ledger
+from nautobot_spare_parts.signals import stock_changed
+from nautobot_spare_parts.stock import apply_stock_movement
+from nautobot_spare_parts.tests import fixtures
+
+
+class ReconcileLedgerTestCase(TestCase):
+    """Breaks in the ledger chains are reported, and balance mismatches fixed with corrective transactions."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Stock two records through the stock engine, then change their levels behind the ledger's back."""
+        locations = fixtures.create_locations(2)
+        spare_part_type = fixtures.create_spare_part_type("Cat6a patch cable 1m", category="cable")
+        cls.inventories = [fixtures.create_inventory(spare_part_type, location) for location in locations]
+        for inventory in cls.inventories:
+            apply_stock_movement(inventory, "check_in", 10, "Delivery")
+        cls.inventories[1].allocate(4, "CHG-2001")
+
+        SparePartInventory.objects.filter(pk=cls.inventories[0].pk).update(quantity_on_hand=12)
+        SparePartInventory.objects.filter(pk=cls.inventories[1].pk).update(quantity_reserved=1)
+
+    def balance_mismatches(self, result):
+        """Return the balance discrepancies of ``result`` as ``(inventory ID, field, expected, actual)``."""
+        return {
+            (discrepancy.inventory_id, discrepancy.field, discrepancy.expected, discrepancy.actual)
+            for discrepancy in result.discrepancies
+            if discrepancy.kind == LedgerDiscrepancy.BALANCE
+        }
+
+    def test_balance_mismatches_are_reported(self):
+        result = reconcile_ledger()
+
+        self.assertEqual((result.inventory_count, result.transaction_count), (2, 3))
+        self.assertEqual(
+            self.balance_mismatches(result),
+            {
+                (self.inventories[0].pk, "quantity_on_hand", 12, 10),
+                (self.inventories[1].pk, "quantity_reserved", 1, 4),
+            },
+        )
+        self.assertEqual(result.corrections, [])
+        self.assertEqual(SparePartTransaction.objects.count(), 3)
+
+    def test_fix_records_corrections_like_stock_movements(self):
+        receiver = mock.Mock()
+        stock_changed.connect(receiver, weak=False)
+        self.addCleanup(stock_changed.disconnect, receiver)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = reconcile_ledger(fix=True, user=self.user)
+
+        corrections = SparePartTransaction.objects.filter(reason=CORRECTION_REASON)
+        self.assertEqual(
+            set(corrections.values_list("spare_part_inventory", "transaction_type", "quantity", "user")),
+            {
+                (self.inventories[0].pk, "adjustment", 2, self.user.pk),
+                (self.inventories[1].pk, "deallocation", -3, self.user.pk),
+            },
+        )
+        self.assertEqual(len(result.corrections), 2)
+        self.assertEqual(SparePartDailyUsage.objects.get(transaction_type="deallocation").units_out, 3)
+        rollup = SparePartStockRollup.objects.get(spare_part_type=self.inventories[0].spare_part_type)
+        self.assertEqual(rollup.last_movement, max(txn.timestamp for txn in corrections))
+
+        receiver.assert_called_once()
+        kwargs = receiver.call_args.kwargs
+        self.assertEqual(
+            {inventory.pk for inventory in kwargs["inventories"]}, {inventory.pk for inventory in self.inventories}
+        )
+        self.assertEqual({txn.pk for txn in kwargs["transactions"]}, {txn.pk for txn in corrections})
+
+        self.assertTrue(reconcile_ledger().ok)
+
+    def test_broken_chains_are_reported_but_not_fixed(self):
+        delivery = SparePartTransaction.objects.get(
+            spare_part_inventory=self.inventories[0], transaction_type="check_in"
+        )
+        SparePartTransaction.objects.filter(pk=delivery.pk).update(quantity_after=11)
+
+        result = reconcile_ledger(fix=True)
+
+        kinds = {(discrepancy.kind, tuple(discrepancy.transaction_ids)) for discrepancy in result.discrepancies}
+        self.assertIn((LedgerDiscrepancy.ARITHMETIC, (delivery.pk,)), kinds)
+        delivery.refresh_from_db()
+        self.assertEqual((delivery.quantity_before, delivery.quantity, delivery.quantity_after), (0, 10, 11))
@@ -0,0 +1,98 @@
+"""Tests for stock reservations and the inventory allocate()/deallocate() methods built on them."""
+
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db.models import Sum
+from django.utils import timezone
+from nautobot.apps.testing import TestCase
+
+from nautobot_spare_parts.models import SparePartReservation, SparePartStockRollup, SparePartTransaction
+from nautobot_spare_parts.stock import consume_reservation, release_expired_reservations, reserve_stock
+from nautobot_spare_parts.tests import fixtures
+
+
+class ReservationTestCase(TestCase):
+    """Reserved units are held by reservations, so ``quantity_reserved`` is the sum of the active ones."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a record with ten units on hand."""
+        (location,) = fixtures.create_locations(1)
+        cls.spare_part_type = fixtures.create_spare_part_type("25G SFP28 SR", category="transceiver")
+        cls.inventory = fixtures.create_inventory(cls.spare_part_type, location, quantity_on_hand=10)
+
+    def assertReservedMatchesReservations(self):
+        """Check that the record's reserved count is the sum of its active reservations."""
+        self.inventory.refresh_from_db()
+        active = SparePartReservation.objects.filter(spare_part_inventory=self.inventory, status="active")
+        self.assertEqual(self.inventory.quantity_reserved, active.aggregate(total=Sum("quantity"))["total"] or 0)
+        self.assertEqual(SparePartStockRollup.verify([self.spare_part_type.pk]), [])
+
+    def test_allocate_makes_an_open_ended_reservation(self):
+        self.inventory.allocate(3, "CHG-1001 spine refresh")
+
+        reservation = SparePartReservation.objects.get()
+        self.assertEqual(
+            (reservation.quantity, reservation.holder, reservation.expires), (3, "CHG-1001 spine refresh", None)
+        )
+        self.assertEqual((self.inventory.quantity_reserved, self.inventory.quantity_available), (3, 7))
+        self.assertEqual(SparePartTransaction.objects.get().transaction_type, "allocation")
+        self.assertReservedMatchesReservations()
+
+    def test_reservations_cannot_expire_in_the_past(self):
+        with self.assertRaisesMessage(ValidationError, "Reservation expiry must be in the future"):
+            reserve_stock(self.inventory, 1, "CHG-1002", timezone.now() - timedelta(minutes=1))
+
+        self.assertFalse(SparePartReservation.objects.exists())
+
+    def test_sweeper_releases_expired_reservations_only(self):
+        expiring = reserve_stock(self.inventory, 2, "CHG-1003", timezone.now() + timedelta(hours=1))
+        self.inventory.allocate(3, "CHG-1004")
+        SparePartReservation.objects.filter(pk=expiring.pk).update(expires=timezone.now() - timedelta(minutes=1))
+
+        self.assertEqual(release_expired_reservations(), 1)
+
+        expiring.refresh_from_db()
+        self.assertEqual(expiring.status, "expired")
+        self.assertEqual(SparePartReservation.objects.get(status="active").holder, "CHG-1004")
+        self.assertEqual(release_expired_reservations(), 0)
+        self.assertReservedMatchesReservations()
+
+    def test_deallocate_draws_down_open_ended_reservations_first(self):
+        expiring = reserve_stock(self.inventory, 2, "CHG-1005", timezone.now() + timedelta(hours=1))
+        self.inventory.allocate(3, "CHG-1006")
+        open_ended = SparePartReservation.objects.get(expires__isnull=True)
+
+        self.inventory.deallocate(4, "Smaller change")
+
+        open_ended.refresh_from_db()
+        expiring.refresh_from_db()
+        self.assertEqual(open_ended.status, "released")
+        self.assertEqual((expiring.status, expiring.quantity), ("active", 1))
+        self.assertEqual(SparePartTransaction.objects.filter(transaction_type="deallocation").count(), 1)
+        self.assertReservedMatchesReservations()
+
+    def test_deallocate_past_the_reservations_takes_directly_reserved_units(self):
+        self.inventory.allocate(2, "CHG-1007")
+        self.inventory.quantity_reserved = 5
+        self.inventory.save()
+
+        self.inventory.deallocate(4, "Returned to stock")
+
+        self.assertEqual(self.inventory.quantity_reserved, 1)
+        self.assertEqual(SparePartReservation.objects.get().status, "released")
+        with self.assertRaisesMessage(ValidationError, "Only 1 reserved"):
+            self.inventory.deallocate(2, "More than is reserved")
+
+    def test_consuming_a_reservation_checks_out_its_units(self):
+        self.inventory.allocate(3, "CHG-1008")
+        reservation = SparePartReservation.objects.get()
+
+        txn = consume_reservation(reservation, quantity=2)
+
+        self.assertEqual((txn.transaction_type, txn.quantity), ("check_out", -2))
+        self.assertEqual(reservation.status, "consumed")
+        self.inventory.refresh_from_db()
+        self.assertEqual((self.inventory.quantity_on_hand, self.inventory.quantity_available), (8, 8))
+        self.assertReservedMatchesReservations()
@@ -0,0 +1,84 @@
+"""Tests for the search backend of the ``q`` filters."""
+
+from nautobot.apps.testing import TestCase
+from nautobot.dcim.models import Manufacturer
+
+from nautobot_spare_parts.models import SparePartInventory, SparePartTransaction, SparePartType
+from nautobot_spare_parts.search import refresh_search_documents, search_queryset, term_condition
+from nautobot_spare_parts.stock import apply_stock_movement
+from nautobot_spare_parts.tests import fixtures
+
+
+class SearchTestCase(TestCase):
+    """Searches match every term in a record's own or related document and rank part number matches first."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create part types matching "FAN-7050" in different ways, stock two of them and move some stock."""
+        cls.manufacturer = Manufacturer.objects.create(name="Arista")
+        cls.locations = fixtures.create_locations(2)
+
+        def create_type(name, part_number, category="fan"):
+            return SparePartType.objects.create(
+                name=name,
+                slug=part_number.lower(),
+                manufacturer=cls.manufacturer,
+                part_number=part_number,
+                category=category,
+            )
+
+        # Ranked "FAN-7050": an exact part number, a part number prefix, a name prefix, a match elsewhere in the name
+        cls.ranked_types = [
+            create_type("Zeta fan tray", "FAN-7050"),
+            create_type("Yotta fan tray, reverse airflow", "FAN-7050-R"),
+            create_type("FAN-7050 blanking plate", "BLK-7050"),
+            create_type("Alpha bracket for FAN-7050", "BRK-7050"),
+        ]
+        cls.psu = create_type("Power supply 500W", "PWR-500AC-F", category="psu")
+        cls.fan_inventory = fixtures.create_inventory(cls.ranked_types[0], cls.locations[0], quantity_on_hand=3)
+        cls.psu_inventory = fixtures.create_inventory(cls.psu, cls.locations[1], quantity_on_hand=2)
+        cls.fan_transaction = apply_stock_movement(cls.fan_inventory, "check_out", -1, "Failed fan in rack 12")
+        cls.psu_transaction = apply_stock_movement(cls.psu_inventory, "check_out", -1, "Failed PSU")
+
+    def search(self, queryset, value):
+        """Return the primary keys of the records of ``queryset`` matching ``value``, in order."""
+        return list(search_queryset(queryset, value).values_list("pk", flat=True))
+
+    def test_part_types_are_ranked(self):
+        self.assertEqual(self.search(SparePartType.objects.all(), "FAN-7050"), [part.pk for part in self.ranked_types])
+        # Part numbers are also searchable without their separators
+        self.assertEqual(
+            set(self.search(SparePartType.objects.all(), "fan7050")), {self.ranked_types[0].pk, self.ranked_types[1].pk}
+        )
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.search(SparePartType.objects.all(), "arista 500w"), [self.psu.pk])
+        self.assertEqual(self.search(SparePartType.objects.all(), "arista juniper"), [])
+        self.assertEqual(search_queryset(SparePartType.objects.all(), "  ").count(), 5)
+
+    def test_records_match_through_the_records_they_belong_to(self):
+        self.assertEqual(self.search(SparePartInventory.objects.all(), "fan-7050"), [self.fan_inventory.pk])
+        self.assertEqual(self.search(SparePartInventory.objects.all(), "pwr-500ac site"), [self.psu_inventory.pk])
+        self.assertEqual(self.search(SparePartTransaction.objects.all(), "pwr-500ac"), [self.psu_transaction.pk])
+        self.assertEqual(self.search(SparePartTransaction.objects.all(), "rack 12"), [self.fan_transaction.pk])
+        self.assertEqual(
+            set(SparePartTransaction.objects.filter(term_condition(SparePartTransaction, "failed"))),
+            {self.fan_transaction, self.psu_transaction},
+        )
+
+    def test_refresh_rewrites_only_stale_documents(self):
+        SparePartType.objects.filter(pk=self.psu.pk).update(search_document="")
+
+        self.assertEqual(refresh_search_documents(SparePartType.objects.select_related("manufacturer")), 1)
+        self.assertEqual(self.search(SparePartType.objects.all(), "pwr-500ac-f"), [self.psu.pk])
+        self.assertEqual(refresh_search_documents(SparePartType.objects.select_related("manufacturer")), 0)
+
+    def test_renamed_manufacturer_and_location_are_found(self):
+        self.manufacturer.name = "Arista Networks"
+        self.manufacturer.save()
+        self.locations[1].name = "AMS1 cage 4"
+        self.locations[1].save()
+
+        self.assertEqual(len(self.search(SparePartType.objects.all(), "networks")), 5)
+        self.assertEqual(self.search(SparePartInventory.objects.all(), "ams1"), [self.psu_inventory.pk])
+        self.assertEqual(self.search(SparePartTransaction.objects.all(), "cage"), [self.psu_transaction.pk])
@@ -0,0 +1,200 @@
+"""Tests for the stock mutation engine."""
+
+import threading
+from unittest import skipUnless
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from nautobot.apps.testing import TestCase, TransactionTestCase
+
+from nautobot_spare_parts import alerts
+from nautobot_spare_parts.models import SparePartInventory, SparePartStockRollup, SparePartTransaction
+from nautobot_spare_parts.stock import apply_stock_movement, apply_stock_movements, StockMovement
+from nautobot_spare_parts.tests import fixtures
+
+
+class StockMovementTestCase(TestCase):
+    """Single movements: levels, ledger, rollup and validation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a part type stocked at six locations."""
+        cls.locations = fixtures.create_locations(6)
+        cls.spare_part_type = fixtures.create_spare_part_type("16GB DDR4 DIMM")
+        cls.inventories = [
+            fixtures.create_inventory(cls.spare_part_type, location, quantity_on_hand=10, minimum_quantity=2)
+            for location in cls.locations
+        ]
+        cls.inventory = cls.inventories[0]
+
+    def test_check_out_updates_levels_ledger_and_rollup(self):
+        txn = apply_stock_movement(self.inventory, "check_out", -3, "Replace failed DIMM")
+
+        self.assertEqual(self.inventory.quantity_on_hand, 7)
+        self.inventory.refresh_from_db()
+        self.assertEqual(self.inventory.quantity_on_hand, 7)
+        self.assertEqual(self.inventory.quantity_available, 7)
+        self.assertEqual(self.inventory.version, 2)
+
+        txn = SparePartTransaction.objects.get(pk=txn.pk)
+        self.assertEqual(txn.transaction_type, "check_out")
+        self.assertEqual((txn.quantity, txn.quantity_before, txn.quantity_after), (-3, 10, 7))
+
+        rollup = SparePartStockRollup.objects.get(spare_part_type=self.spare_part_type)
+        self.assertEqual(rollup.total_on_hand, 57)
+        self.assertEqual(SparePartStockRollup.verify([self.spare_part_type.pk]), [])
+
+    def test_ledger_chain_follows_the_stored_levels_not_a_stale_copy(self):
+        stale = SparePartInventory.objects.get(pk=self.inventory.pk)
+        apply_stock_movement(self.inventory, "check_out", -4, "First")
+        txn = apply_stock_movement(stale, "check_out", -4, "Second, from a copy loaded before the first")
+
+        self.assertEqual((txn.quantity_before, txn.quantity_after), (6, 2))
+        self.assertEqual(stale.quantity_on_hand, 2)
+
+    def test_invalid_movements_write_nothing(self):
+        cases = [
+            ("check_out", -11, "Would result in negative inventory"),
+            ("allocation", 11, "Only 10 available"),
+            ("deallocation", -1, "Only 0 reserved"),
+            ("relocation", 1, "Invalid transaction type"),
+        ]
+        for transaction_type, quantity, message in cases:
+            with self.subTest(transaction_type=transaction_type, quantity=quantity):
+                with self.assertRaisesMessage(ValidationError, message):
+                    apply_stock_movement(self.inventory, transaction_type, quantity, "Invalid")
+
+        self.inventory.refresh_from_db()
+        self.assertEqual((self.inventory.quantity_on_hand, self.inventory.quantity_reserved), (10, 0))
+        self.assertEqual(self.inventory.version, 1)
+        self.assertFalse(SparePartTransaction.objects.exists())
+        self.assertEqual(SparePartStockRollup.verify([self.spare_part_type.pk]), [])
+
+    def test_check_out_cannot_take_reserved_units(self):
+        apply_stock_movement(self.inventory, "allocation", 8, "Held for CHG-1")
+
+        with self.assertRaisesMessage(ValidationError, "8 units are reserved at this location"):
+            apply_stock_movement(self.inventory, "check_out", -3, "Too many")
+
+    def test_atomic_batch_with_an_invalid_movement_writes_nothing(self):
+        movements = [
+            StockMovement(self.inventories[0], "check_out", -1, "Valid"),
+            StockMovement(self.inventories[1], "check_out", -20, "Invalid"),
+        ]
+
+        with self.assertRaises(ValidationError) as context:
+            apply_stock_movements(movements)
+
+        self.assertEqual(
+            context.exception.messages, ["Item 1: Cannot adjust stock by -20. Would result in negative inventory."]
+        )
+        self.assertFalse(SparePartTransaction.objects.exists())
+        self.assertEqual(set(SparePartInventory.objects.values_list("quantity_on_hand", flat=True)), {10})
+
+    def test_best_effort_batch_applies_the_valid_movements(self):
+        movements = [
+            StockMovement(self.inventories[0], "check_out", -1, "Valid"),
+            StockMovement(self.inventories[1], "check_out", -20, "Invalid"),
+            StockMovement(self.inventories[0], "check_out", -2, "Sees the first movement"),
+        ]
+
+        results = apply_stock_movements(movements, atomic=False)
+
+        self.assertEqual([result.ok for result in results], [True, False, True])
+        self.assertEqual((results[2].transaction.quantity_before, results[2].transaction.quantity_after), (9, 7))
+        self.assertEqual(SparePartTransaction.objects.count(), 2)
+        self.assertEqual(SparePartStockRollup.verify([self.spare_part_type.pk]), [])
+
+    def test_batch_outside_the_queryset_is_not_found(self):
+        queryset = SparePartInventory.objects.exclude(pk=self.inventories[1].pk)
+        movements = [
+            StockMovement(self.inventories[0], "check_in", 1, "Allowed"),
+            StockMovement(self.inventories[1], "check_in", 1, "Not allowed"),
+        ]
+
+        results = apply_stock_movements(movements, atomic=False, queryset=queryset)
+
+        self.assertTrue(results[0].ok)
+        self.assertEqual(results[1].error.messages, ["Inventory record not found"])
+        self.inventories[1].refresh_from_db()
+        self.assertEqual(self.inventories[1].quantity_on_hand, 10)
+
+    def test_batch_writes_take_the_same_queries_for_two_and_four_records(self):
+        def count_queries(inventories):
+            movements = [StockMovement(inventory, "check_out", -1, "Batch") for inventory in inventories]
+            with CaptureQueriesContext(connection) as queries:
+                apply_stock_movements(movements)
+            return len(queries)
+
+        # Different records each time, so both batches start new daily usage buckets
+        self.assertEqual(count_queries(self.inventories[:2]), count_queries(self.inventories[2:]))
+
+
+@skipUnless(connection.vendor == "postgresql", "Row locks need PostgreSQL")
+class ConcurrentStockMovementTestCase(TransactionTestCase):
+    """Movements from several connections at once."""
+
+    def setUp(self):
+        """Create a record and keep alerts from the movements in memory."""
+        super().setUp()
+        (location,) = fixtures.create_locations(1)
+        self.spare_part_type = fixtures.create_spare_part_type("1.92TB SATA SSD", category="ssd")
+        self.inventory = fixtures.create_inventory(self.spare_part_type, location, quantity_on_hand=100)
+        alerts.dispatcher.configure(backends=[alerts.MemoryBackend()], window=0)
+
+    def tearDown(self):
+        """Go back to the configured alert backends."""
+        alerts.dispatcher.configure()
+        super().tearDown()
+
+    def run_concurrently(self, target, threads=4):
+        """Run ``target`` in ``threads`` threads, each with its own database connection, and re-raise any error."""
+        errors = []
+
+        def run():
+            try:
+                target()
+            except Exception as err:  # Reported in the test thread
+                errors.append(err)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=run) for _ in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        if errors:
+            raise errors[0]
+
+    def test_concurrent_movements_lose_no_updates(self):
+        def check_out_five():
+            for _ in range(5):
+                apply_stock_movement(SparePartInventory.objects.get(pk=self.inventory.pk), "check_out", -1, "Used")
+
+        self.run_concurrently(check_out_five)
+
+        self.inventory.refresh_from_db()
+        self.assertEqual(self.inventory.quantity_on_hand, 80)
+        self.assertEqual(self.inventory.version, 21)
+        ledger = SparePartTransaction.objects.filter(spare_part_inventory=self.inventory).order_by("-quantity_before")
+        self.assertEqual([txn.quantity_before for txn in ledger], list(range(100, 80, -1)))
+        self.assertEqual(SparePartStockRollup.verify([self.spare_part_type.pk]), [])
+
+    def test_concurrent_check_outs_cannot_oversell(self):
+        SparePartInventory.objects.filter(pk=self.inventory.pk).update(quantity_on_hand=3, quantity_available=3)
+        SparePartStockRollup.rebuild([self.spare_part_type.pk])
+        refused = []
+
+        def check_out_one():
+            try:
+                apply_stock_movement(SparePartInventory.objects.get(pk=self.inventory.pk), "check_out", -1, "Used")
+            except ValidationError:
+                refused.append(True)
+
+        self.run_concurrently(check_out_one, threads=5)
+
+        self.inventory.refresh_from_db()
+        self.assertEqual(self.inventory.quantity_on_hand, 0)
+        self.assertEqual(len(refused), 2)
@@ -25,6 +25,31 @@ urlpatterns = [
         views.CheckOutView.as_view(),
         name="sparepartinventory_checkout",
     ),
+    path(
+        "spare-part-inventory/<uuid:pk>/transfer/",
+        views.TransferView.as_view(),
+        name="sparepartinventory_transfer",
+    ),
+    path(
+        "spare-part-transactions/export/",
+        views.SparePartTransactionExportView.as_view(),
+        name="spareparttransaction_export",
+    ),
+    path(
+        "import/",
+        views.BulkImportView.as_view(),
+        name="bulk_import",
+    ),
+    path(
+        "stock-as-of/",
+        views.StockAsOfView.as_view(),
+        name="stock_as_of",
+    ),
+    path(
+        "compatible-stock/",
+        views.CompatibleStockView.as_view(),
+        name="compatible_stock",
+    ),
     path(
         "low-stock/",
         views.LowStockDashboardView.as_view(),
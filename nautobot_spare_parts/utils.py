@@ -1,8 +1,20 @@
 """Utility functions for Nautobot Spare Parts plugin."""
 
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.http import QueryDict
+from django.utils import timezone
+from django_filters import RangeFilter
 from packaging import version
 import nautobot
 
+from nautobot_spare_parts import NautobotSparePartsConfig
+
+CACHE_KEY_PREFIX = "nautobot_spare_parts"
+
 
 def get_nautobot_version():
     """Get the current Nautobot version."""
@@ -17,3 +29,67 @@ def is_nautobot_2_3_or_newer():
 def is_nautobot_3_0_or_newer():
     """Check if Nautobot version is 3.0 or newer."""
     return get_nautobot_version() >= version.parse("3.0.0")
+
+
+def get_plugin_setting(name):
+    """Return a setting from PLUGINS_CONFIG, falling back to the plugin's default."""
+    plugin_config = settings.PLUGINS_CONFIG.get("nautobot_spare_parts", {})
+    return plugin_config.get(name, NautobotSparePartsConfig.default_settings.get(name))
+
+
+def get_cache_version(name):
+    """Return the current version of a named group of cache entries.
+
+    Cache keys built with this version are invalidated all at once by bump_cache_version(), without having to
+    know or delete the individual keys.
+    """
+    return cache.get_or_set(f"{CACHE_KEY_PREFIX}:{name}:version", time.time_ns, timeout=None)
+
+
+def bump_cache_version(name):
+    """Invalidate every cache entry keyed on the named version."""
+    key = f"{CACHE_KEY_PREFIX}:{name}:version"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_change_time(name):
+    """Return when a named group of records last changed, as recorded by mark_changed(), or None if not known.
+
+    If the record has been dropped from the cache (or never made), None is returned and the current time recorded
+    in its place, so a lost record reads as a change rather than hiding one.
+    """
+    key = f"{CACHE_KEY_PREFIX}:{name}:changed"
+    changed = cache.get(key)
+    if changed is None:
+        cache.add(key, timezone.now(), timeout=None)
+    return changed
+
+
+def mark_changed(name):
+    """Record that a named group of records has just changed."""
+    cache.set(f"{CACHE_KEY_PREFIX}:{name}:changed", timezone.now(), timeout=None)
+
+
+def apply_filterset(filterset_class, queryset, params):
+    """Filter ``queryset`` with the filters of ``filterset_class`` found in the QueryDict ``params``.
+
+    Parameters that aren't filters (pagination, sorting, options of the calling view) are ignored rather than
+    rejected. Raises ValidationError if a filter value is invalid.
+    """
+    names = set()
+    for name, filter_ in filterset_class.base_filters.items():
+        names.add(name)
+        if isinstance(filter_, RangeFilter):
+            names.update(f"{name}_{suffix}" for suffix in ("after", "before", "min", "max"))
+
+    data = QueryDict(mutable=True)
+    for name in params:
+        if name in names:
+            data.setlist(name, params.getlist(name))
+    filterset = filterset_class(data, queryset=queryset)
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    return filterset.qs
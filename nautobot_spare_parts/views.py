@@ -1,25 +1,45 @@
 """Views for Spare Parts Inventory plugin."""
 
+import io
+
 from django.contrib import messages
 from django.contrib.auth.mixins import PermissionRequiredMixin
-from django.db.models import F
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, Q
+from django.http import HttpResponseBadRequest, QueryDict
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.views.generic import View
+from django_tables2 import RequestConfig
 
 from nautobot.apps.views import (
     NautobotUIViewSet,
     ObjectDetailViewMixin,
 )
-
-from nautobot_spare_parts import filters, forms, tables
+from nautobot.core.views.paginator import EnhancedPaginator, get_paginate_count
+from nautobot.dcim.models import Device, Location
+
+from nautobot_spare_parts import filters, forms, query_plans, tables
+from nautobot_spare_parts.checkpoints import get_stock_report
+from nautobot_spare_parts.compatibility import find_compatible_stock, resolve_devices
+from nautobot_spare_parts.export import filter_ledger, streaming_ledger_response
+from nautobot_spare_parts.hierarchy import stock_by_location
+from nautobot_spare_parts.importer import (
+    IMPORT_PERMISSIONS,
+    import_spare_part_inventory,
+    import_spare_part_types,
+    read_csv,
+)
 from nautobot_spare_parts.models import SparePartInventory, SparePartTransaction, SparePartType
+from nautobot_spare_parts.stock import transfer_stock
+from nautobot_spare_parts.utils import apply_filterset, CACHE_KEY_PREFIX, get_cache_version, get_plugin_setting
 
 
 class SparePartTypeUIViewSet(NautobotUIViewSet):
     """ViewSet for SparePartType."""
 
-    queryset = SparePartType.objects.all()
+    queryset = query_plans.apply_plan(SparePartType.objects.with_stock_totals(), query_plans.SPARE_PART_TYPE_TABLE)
     filterset_class = filters.SparePartTypeFilterSet
     filterset_form_class = forms.SparePartTypeFilterForm
     form_class = forms.SparePartTypeForm
@@ -35,17 +55,18 @@ class SparePartTypeUIViewSet(NautobotUIViewSet):
             context["inventory_records"] = SparePartInventory.objects.filter(
                 spare_part_type=instance
             ).select_related("location")
+            # Stock of this part type rolled up over the location tree
+            context["stock_by_location"] = stock_by_location(
+                SparePartInventory.objects.restrict(request.user, "view").filter(spare_part_type=instance),
+                locations=Location.objects.restrict(request.user, "view"),
+            )
         return context
 
 
 class SparePartInventoryUIViewSet(NautobotUIViewSet):
     """ViewSet for SparePartInventory."""
 
-    queryset = SparePartInventory.objects.select_related(
-        "spare_part_type",
-        "spare_part_type__manufacturer",
-        "location",
-    )
+    queryset = query_plans.apply_plan(SparePartInventory.objects.all(), query_plans.INVENTORY_TABLE)
     filterset_class = filters.SparePartInventoryFilterSet
     filterset_form_class = forms.SparePartInventoryFilterForm
     form_class = forms.SparePartInventoryForm
@@ -59,6 +80,8 @@ class SparePartInventoryUIViewSet(NautobotUIViewSet):
         if instance:
             # Add recent transactions for this inventory
             context["recent_transactions"] = instance.transactions.all()[:20]
+            # Add the reservations holding its reserved units
+            context["active_reservations"] = instance.reservations.filter(status="active").select_related("user")
 
             # Add Check In and Check Out button URLs
             context["check_in_url"] = reverse(
@@ -69,19 +92,17 @@ class SparePartInventoryUIViewSet(NautobotUIViewSet):
                 "plugins:nautobot_spare_parts:sparepartinventory_checkout",
                 kwargs={"pk": instance.pk}
             )
+            context["transfer_url"] = reverse(
+                "plugins:nautobot_spare_parts:sparepartinventory_transfer",
+                kwargs={"pk": instance.pk}
+            )
         return context
 
 
 class SparePartTransactionUIViewSet(NautobotUIViewSet):
     """ViewSet for SparePartTransaction (read-only)."""
 
-    queryset = SparePartTransaction.objects.select_related(
-        "spare_part_inventory",
-        "spare_part_inventory__spare_part_type",
-        "spare_part_inventory__location",
-        "user",
-        "related_device",
-    )
+    queryset = query_plans.apply_plan(SparePartTransaction.objects.all(), query_plans.TRANSACTION_TABLE)
     filterset_class = filters.SparePartTransactionFilterSet
     filterset_form_class = None
     form_class = None
@@ -92,6 +113,132 @@ class SparePartTransactionUIViewSet(NautobotUIViewSet):
     action_buttons = ("export",)
 
 
+class SparePartTransactionExportView(PermissionRequiredMixin, View):
+    """Stream the transaction ledger as CSV or NDJSON, honouring the list view's filters."""
+
+    permission_required = "nautobot_spare_parts.view_spareparttransaction"
+
+    def get(self, request):
+        """Stream the filtered ledger."""
+        queryset = SparePartTransaction.objects.restrict(request.user, "view")
+        try:
+            queryset = filter_ledger(queryset, request.GET)
+            return streaming_ledger_response(queryset, request.GET.get("export_format", "csv"))
+        except ValidationError as err:
+            return HttpResponseBadRequest("; ".join(err.messages))
+
+
+class StockAsOfView(PermissionRequiredMixin, View):
+    """Report of the stock held at a point in the past."""
+
+    permission_required = "nautobot_spare_parts.view_sparepartinventory"
+    template_name = "nautobot_spare_parts/stock_as_of.html"
+
+    def get(self, request):
+        """Display the report form and, once a time is given, the stock held then."""
+        form = forms.StockAsOfForm(request.GET or None)
+        report = None
+        if form.is_valid():
+            queryset = SparePartInventory.objects.restrict(request.user, "view")
+            queryset = apply_filterset(filters.SparePartInventoryFilterSet, queryset, request.GET)
+            report = get_stock_report(form.cleaned_data["as_of"], queryset)
+
+        return render(
+            request,
+            self.template_name,
+            {
+                "form": form,
+                "report": report,
+                "total_on_hand": sum(row["quantity_on_hand"] for row in report or []),
+                "total_reserved": sum(row["quantity_reserved"] for row in report or []),
+            },
+        )
+
+
+class CompatibleStockView(PermissionRequiredMixin, View):
+    """Find the spare parts in stock that fit a list of devices."""
+
+    permission_required = ("dcim.view_device", "nautobot_spare_parts.view_sparepartinventory")
+    template_name = "nautobot_spare_parts/compatible_stock.html"
+
+    def get(self, request):
+        """Display the device list form, filled in from ``?device=`` if given."""
+        initial = {"devices": "\n".join(request.GET.getlist("device"))}
+        return render(request, self.template_name, {"form": forms.CompatibleStockForm(initial=initial)})
+
+    def post(self, request):
+        """Look up the devices and show the compatible stock for each."""
+        form = forms.CompatibleStockForm(request.POST)
+        results = unresolved = None
+        if form.is_valid():
+            devices, unresolved = resolve_devices(
+                Device.objects.restrict(request.user, "view"), form.cleaned_data["devices"]
+            )
+            results = find_compatible_stock(
+                devices,
+                inventories=SparePartInventory.objects.restrict(request.user, "view"),
+                elsewhere_limit=form.cleaned_data["elsewhere_limit"],
+            )
+        return render(
+            request,
+            self.template_name,
+            {"form": form, "results": results, "unresolved": unresolved},
+        )
+
+
+class BulkImportView(PermissionRequiredMixin, View):
+    """View for bulk importing spare part types or inventory records from CSV.
+
+    Users may open the form if they can run either kind of import; each import needs only its own permissions.
+    """
+
+    template_name = "nautobot_spare_parts/bulk_import.html"
+
+    def has_permission(self):
+        """Return True if the user may add and change part types, or add and change inventory records."""
+        return any(self.request.user.has_perms(permissions) for permissions in IMPORT_PERMISSIONS.values())
+
+    def get(self, request):
+        """Display the import form."""
+        return render(request, self.template_name, {"form": forms.BulkImportForm()})
+
+    def post(self, request):
+        """Run the import and show its result."""
+        form = forms.BulkImportForm(request.POST, request.FILES)
+        result = None
+
+        if form.is_valid() and not request.user.has_perms(IMPORT_PERMISSIONS[form.cleaned_data["import_type"]]):
+            form.add_error("import_type", "You do not have permission to add and change these objects")
+
+        if form.is_valid():
+            csv_file = form.cleaned_data.get("csv_file")
+            if csv_file:
+                source = io.TextIOWrapper(csv_file.file, encoding="utf-8-sig")
+            else:
+                source = form.cleaned_data["csv_data"]
+            options = {"dry_run": form.cleaned_data["dry_run"], "atomic": form.cleaned_data["atomic"]}
+
+            try:
+                if form.cleaned_data["import_type"] == "spare_part_types":
+                    result = import_spare_part_types(read_csv(source), **options)
+                else:
+                    result = import_spare_part_inventory(read_csv(source), user=request.user, **options)
+            except (ValidationError, UnicodeDecodeError) as e:
+                messages.error(request, f"Error reading CSV data: {str(e)}")
+            else:
+                if result.applied:
+                    messages.success(request, f"Imported {result.created} new and {result.updated} updated records")
+                elif result.dry_run and result.ok:
+                    messages.info(
+                        request,
+                        f"Dry run: {result.created} records would be created and {result.updated} updated",
+                    )
+                else:
+                    messages.error(request, f"Nothing was imported: {len(result.errors)} invalid row(s)")
+
+        return render(request, self.template_name, {"form": form, "result": result})
+
+
 class CheckInView(PermissionRequiredMixin, View):
     """View for checking in spare parts (adding stock)."""
 
@@ -127,12 +274,8 @@ class CheckInView(PermissionRequiredMixin, View):
                     transaction_type="check_in",
                     reason=reason,
                     user=request.user,
+                    notes=notes,
                 )
-                if notes:
-                    # Add notes to the most recent transaction
-                    transaction = inventory.transactions.first()
-                    transaction.notes = notes
-                    transaction.save()
 
                 messages.success(
                     request,
@@ -190,12 +333,8 @@ class CheckOutView(PermissionRequiredMixin, View):
                     reason=reason,
                     user=request.user,
                     related_device=related_device,
+                    notes=notes,
                 )
-                if notes:
-                    # Add notes to the most recent transaction
-                    transaction = inventory.transactions.first()
-                    transaction.notes = notes
-                    transaction.save()
 
                 messages.success(
                     request,
@@ -216,6 +355,99 @@ class CheckOutView(PermissionRequiredMixin, View):
         )
 
 
+class TransferView(PermissionRequiredMixin, View):
+    """View for transferring spare parts to another location."""
+
+    permission_required = "nautobot_spare_parts.change_sparepartinventory"
+
+    def get(self, request, pk):
+        """Display transfer form."""
+        inventory = get_object_or_404(SparePartInventory, pk=pk)
+        form = forms.TransferForm()
+        return render(
+            request,
+            "nautobot_spare_parts/sparepartinventory_transfer.html",
+            {
+                "inventory": inventory,
+                "form": form,
+                "action": "Transfer",
+            },
+        )
+
+    def post(self, request, pk):
+        """Process transfer form."""
+        inventory = get_object_or_404(SparePartInventory, pk=pk)
+        form = forms.TransferForm(request.POST)
+
+        if form.is_valid():
+            quantity = form.cleaned_data["quantity"]
+            destination_location = form.cleaned_data["destination_location"]
+
+            try:
+                transfer_stock(
+                    inventory,
+                    destination_location,
+                    quantity,
+                    form.cleaned_data["reason"],
+                    user=request.user,
+                    notes=form.cleaned_data.get("notes", ""),
+                    queryset=SparePartInventory.objects.restrict(request.user, "change"),
+                    create_missing=request.user.has_perm("nautobot_spare_parts.add_sparepartinventory"),
+                )
+
+                messages.success(
+                    request,
+                    f"Transferred {quantity} units of {inventory.spare_part_type} to {destination_location}",
+                )
+                return redirect(inventory.get_absolute_url())
+            except Exception as e:
+                messages.error(request, f"Error transferring inventory: {str(e)}")
+
+        return render(
+            request,
+            "nautobot_spare_parts/sparepartinventory_transfer.html",
+            {
+                "inventory": inventory,
+                "form": form,
+                "action": "Transfer",
+            },
+        )
+
+
+def get_low_stock_summary(queryset, cache_key):
+    """Return low stock counts per category plus overall totals for ``queryset``.
+
+    The counts come from one grouped aggregate query and are cached for ``low_stock_summary_cache_timeout``
+    seconds under ``cache_key``; any stock movement or inventory edit invalidates them.
+    """
+    cache_key = f"{CACHE_KEY_PREFIX}:low_stock_summary:{get_cache_version('low_stock_summary')}:{cache_key}"
+    summary = cache.get(cache_key)
+    if summary is None:
+        rows = (
+            queryset.order_by()
+            .values("spare_part_type__category")
+            .annotate(
+                low_stock=Count("pk"),
+                needs_reorder=Count("pk", filter=Q(needs_reorder=True)),
+                out_of_stock=Count("pk", filter=Q(quantity_available__lte=0)),
+            )
+        )
+        categories = dict(SparePartType.CATEGORY_CHOICES)
+        summary = {
+            "categories": [],
+            "low_stock": 0,
+            "needs_reorder": 0,
+            "out_of_stock": 0,
+        }
+        for row in sorted(rows, key=lambda row: row["spare_part_type__category"]):
+            row["category"] = categories.get(row.pop("spare_part_type__category"))
+            summary["categories"].append(row)
+            for key in ("low_stock", "needs_reorder", "out_of_stock"):
+                summary[key] += row[key]
+        cache.set(cache_key, summary, get_plugin_setting("low_stock_summary_cache_timeout"))
+    return summary
+
+
 class LowStockDashboardView(PermissionRequiredMixin, View):
     """Dashboard view for low stock items."""
 
@@ -224,20 +456,34 @@ class LowStockDashboardView(PermissionRequiredMixin, View):
 
     def get(self, request):
         """Display low stock dashboard."""
-        # Filter where quantity_available <= minimum_quantity
-        queryset = SparePartInventory.objects.select_related(
-            "spare_part_type",
-            "spare_part_type__manufacturer",
-            "location",
-        ).filter(
-            quantity_on_hand__lte=F("minimum_quantity") + F("quantity_reserved")
+        filter_params = QueryDict(mutable=True)
+        for name in forms.LowStockFilterForm.base_fields:
+            if name in request.GET:
+                filter_params.setlist(name, request.GET.getlist(name))
+        filter_form = forms.LowStockFilterForm(filter_params)
+
+        queryset = query_plans.apply_plan(
+            SparePartInventory.objects.restrict(request.user, "view").filter(is_low_stock=True),
+            query_plans.BRIEF_INVENTORY,
         )
+        queryset = filters.SparePartInventoryFilterSet(filter_params, queryset=queryset).qs
+
+        summary = get_low_stock_summary(queryset, f"{request.user.pk}:{filter_params.urlencode()}")
+
+        table = tables.LowStockTable(queryset, user=request.user)
+        paginate = {
+            "paginator_class": EnhancedPaginator,
+            "per_page": get_paginate_count(request),
+        }
+        RequestConfig(request, paginate).configure(table)
 
         return render(
             request,
             self.template_name,
             {
-                "low_stock_items": queryset,
-                "low_stock_count": queryset.count(),
+                "table": table,
+                "filter_form": filter_form,
+                "summary": summary,
+                "low_stock_count": summary["low_stock"],
             },
         )